@@ -1,7 +1,13 @@
 import pandas as pd
+import numpy as np
 import json
+import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.render import first_rows, format_column, group_bounds, group_values, join_groups, render_lines, sort_groups
+
 def generate_prompts():
     base_dir = Path(".")
     processed_file = base_dir / "processed_data" / "exp1.csv"
@@ -23,35 +29,40 @@ def generate_prompts():
     prompts = []
 
     # 3. Group by participant
-    for p_id, group in df.groupby("participant_id"):
-        group = group.sort_values("trial_id")
-        
-        prompt_text = instructions
-        rt_list = []  # Initialize empty list for this specific participant
+    df = sort_groups(df, ["participant_id"], ["trial_id"])
+    bounds = group_bounds(df, ["participant_id"])
+
+    # 4. Build trial-by-trial data, one response slot at a time
+    slots = []
+    rt_columns = []
+    rt_given = []
+    for i in range(1, 21):
+        resp = df[f'response{i}']
+        given = resp.notna().to_numpy() & (resp.astype(str).str.strip() != "").to_numpy()
+        stripped = [value.strip() for value in format_column(resp)]
+        slots.append([f"<<{value}>>" if ok else "" for value, ok in zip(stripped, given.tolist())])
+
+        # Store RT if it exists and a response was given
+        rt_val = df.get(f'first_key_RT{i}')  # Using your specific RT column name
+        if rt_val is None:
+            rt_val = pd.Series(np.nan, index=df.index)
+        rt_columns.append(rt_val.to_numpy(dtype=float))
+        rt_given.append(given & rt_val.notna().to_numpy())
 
-        # 4. Build trial-by-trial data
-        for _, row in group.iterrows():
-            trial_str = f"Trial {row['trial_id'] + 1}:\n"
-            trial_str += f"  Stimulus: '{row['stimulus']}'\n"
-            
-            responses = []
-            # We can collect responses AND RTs in the same loop for efficiency
-            for i in range(1, 21):
-                resp = row[f'response{i}']
-                rt_val = row.get(f'first_key_RT{i}') # Using your specific RT column name
+    resp_strings = [", ".join(filter(None, responses)) for responses in zip(*slots)]
+    lines = render_lines("{stimulus}. You enter {responses}.\n", stimulus=df["stimulus"], responses=resp_strings)
 
-                if pd.notna(resp) and str(resp).strip() != "":
-                    responses.append(f"<<{str(resp).strip()}>>")
-                    
-                    # Store RT if it exists and a response was given
-                    if pd.notna(rt_val):
-                        rt_list.append(float(rt_val))
-            
-            resp_string = ", ".join(responses)
-            trial_line = f"{row['stimulus']}. You enter {resp_string}.\n"
-            prompt_text += trial_line
+    # RTs in trial order, then response order within a trial
+    rt_given = np.column_stack(rt_given)
+    rt_all = np.column_stack(rt_columns)[rt_given]
+    rt_bounds = np.append(0, np.cumsum(rt_given.sum(axis=1)))[bounds]
 
-        # 5. Create JSONL entry (Indented to be inside the participant loop, but outside the trial loop)
+    # 5. Create JSONL entries
+    for p_id, prompt_text, rt_list in zip(
+        first_rows(df, bounds)["participant_id"],
+        join_groups(lines, bounds, prefix=instructions),
+        group_values(rt_all, rt_bounds),
+    ):
         entry = {
             "text": prompt_text.strip(),
             "experiment": "word_association_exp1",
@@ -1,12 +1,16 @@
 import pandas as pd
 import jsonlines
-import random
+import os
+import sys
 import string
 import zipfile
 import chardet
 
-def random_letters(n):
-    return ''.join(random.sample(string.ascii_uppercase, n))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import participant_keys
+
+def random_letters(participant_id, n):
+    return ''.join(participant_keys('FilipovicDurdevicFeldman2024_bialphabeticVLD.csv', participant_id, n, string.ascii_uppercase))
 
 with open('processed_data/exp1.csv', 'rb') as f:
     result = chardet.detect(f.read())
@@ -37,7 +41,7 @@ for participant_id in participants:
     rt_list = []
 
     # Generate two choice options
-    choices = random_letters(2)
+    choices = random_letters(participant_id, 2)
 
     # Remap button responses
     df_part.loc[df_part['response'] == '1', 'response'] = choices[0]
@@ -1,13 +1,18 @@
 import pandas as pd
 import jsonlines
-import random
+import os
+import sys
 import string
 import zipfile
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import participant_keys
 
-# Randomize choice options: function to draw n random letters from the alphabet without replacement
-def random_letters(n):
-    return ''.join(random.sample(string.ascii_uppercase, n))
+
+# Randomize choice options: function to draw n random letters from the alphabet without replacement,
+# the same ones for a participant on every run
+def random_letters(participant_id, n):
+    return ''.join(participant_keys('Prekovicetal2016_backwardVLD', participant_id, n, string.ascii_uppercase))
 
 
 # load data
@@ -36,7 +41,7 @@ for participant_id in participants:
     rt_list = []
 
     # generate two choice options
-    choices = random_letters(2)
+    choices = random_letters(participant_id, 2)
 
     # Update response column using loc
     df_participant_id.loc[df_participant_id["response"] == "1.0", "response"] = choices[0]
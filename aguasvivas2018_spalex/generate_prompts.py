@@ -1,48 +1,61 @@
+import argparse
 import pandas as pd
-import json
-import zipfile
+import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+from psychling.render import choose, first_rows, group_bounds, group_values, join_groups, render_lines, sort_groups
+from psychling.shards import add_workers_argument, write_shards
+
 ROOT = Path(__file__).parent
 EXP1_FILE = ROOT / "processed_data" / "exp1.csv"
-PROMPTS_FILE = ROOT / "prompts.jsonl"
 PROMPTS_ZIP = ROOT / "prompts.jsonl.zip"
 EXPERIMENT_NAME = "aguasvivas2018_spalex"
 
-df = pd.read_csv(EXP1_FILE, encoding="utf-8")
-
-def make_prompt(participant_df):
-    participant_df = participant_df.sort_values("trial")
-    lines = [
-        'In this task, you will see Spanish letter strings one at a time. '
-        'If the string is a real Spanish word, press "word". '
-        'If it is not a real Spanish word, press "nonword".',
-        ""
-    ]
-    for _, row in participant_df.iterrows():
-        stim     = str(row["stimulus"])
-        label    = str(row["condition"])
-        acc      = int(row["correct"])
-        response = label if acc == 1 else ("nonword" if label == "word" else "word")
-        feedback = "Correct." if acc == 1 else "Incorrect."
-        lines.append(
-            f'Trial {int(row["trial"]) + 1}: The letter string is {stim}. '
-            f'You press <<{response}>>. {feedback}'
-        )
-    return "\n".join(lines)
-
-with open(PROMPTS_FILE, "w", encoding="utf-8") as f:
-    for pid, subdf in df.groupby("participant", sort=True):
-        subdf = subdf.sort_values("trial")
+INSTRUCTION = (
+    'In this task, you will see Spanish letter strings one at a time. '
+    'If the string is a real Spanish word, press "word". '
+    'If it is not a real Spanish word, press "nonword".'
+)
+
+def make_prompts(df, bounds):
+    """One prompt text per participant group of *df* (see sort_groups)."""
+    label = df["condition"].astype(str)
+    correct = df["correct"].astype(int) == 1
+    response = choose(correct, label, choose(label == "word", "nonword", "word"))
+    lines = render_lines(
+        'Trial {trial}: The letter string is {stim}. You press <<{response}>>. {feedback}',
+        trial=df["trial"].astype(int) + 1,
+        stim=df["stimulus"].astype(str),
+        response=response,
+        feedback=choose(correct, "Correct.", "Incorrect."),
+    )
+    return join_groups(lines, bounds, prefix=INSTRUCTION + "\n\n", sep="\n")
+
+def build_prompts(df):
+    """One record per participant of *df* (sorted by participant and trial)."""
+    bounds = group_bounds(df, ["participant"])
+    for pid, text, rt in zip(first_rows(df, bounds)["participant"], make_prompts(df, bounds), group_values(df["rt"], bounds)):
         obj = {
-            "text": make_prompt(subdf),
+            "text": text,
             "experiment": EXPERIMENT_NAME,
             "participant": str(pid),
-            "rt": subdf["rt"].tolist()
+            "rt": rt
         }
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        yield obj
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    # The archive is a few hundred MB, so shards are rendered on all cores by default
+    add_workers_argument(parser, default=0)
+    args = parser.parse_args()
+
+    df = pd.read_csv(EXP1_FILE, encoding="utf-8")
+    df = sort_groups(df, ["participant"], ["trial"])
 
-with zipfile.ZipFile(PROMPTS_ZIP, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-    zf.write(PROMPTS_FILE, arcname="prompts.jsonl")
+    with PromptArchiveWriter(PROMPTS_ZIP) as writer:
+        write_shards(writer, df, ["participant"], build_prompts, workers=args.workers)
 
-print(f"Done. {df["participant"].nunique():,} participants written to {PROMPTS_ZIP}")
+    print(f"Done. {writer.n_records:,} participants written to {PROMPTS_ZIP}")
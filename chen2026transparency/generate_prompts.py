@@ -12,11 +12,16 @@ Each line in the JSONL file contains:
   - "trial_id_end": Global trial ID at the end of this prompt
 """
 import json
-import math
+import os
+import sys
 import zipfile
 from pathlib import Path
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.render import group_bounds, group_positions, split_bounds
+from psychling.templates import Field, PromptTemplate
+
 BASE = Path(__file__).parent
 PROC_DIR = BASE / "processed_data"
 OUT_JSONL = BASE / "prompts.jsonl"
@@ -35,52 +40,53 @@ INSTRUCTION = (
     "如果某个词或者汉字有多种意义，请根据第一反应进行打分。\n\n"
 )
 
-def format_trial(trial_num: int, row: pd.Series) -> str:
-    compound = row["stimulus"]
-    c1 = row["constituent_1"]
-    c2 = row["constituent_2"]
-    r1 = row["constituent_1_contribution"]
-    r2 = row["constituent_2_contribution"]
-    r3 = row["predictability"]
-    return (
-        f'{trial_num}：\n'
-        f'1. "{c1}"为"{compound}"这个词的整体语义贡献了多少？'
-        f'请用0-5之间的整数来回答。\n'
-        f'<<{r1}>>\n'
-        f'2. "{c2}"为"{compound}"这个词的整体语义贡献了多少？'
-        f'请用0-5之间的整数来回答。\n'
-        f'<<{r2}>>\n'
-        f'3. "{compound}"的意思能从"{c1}"和"{c2}"的语义上推测出来吗？'
-        f'请用0-5之间的整数来回答。\n'
-        f'<<{r3}>> \n'
-    )
-
-all_prompts = []
+# One trial per row, followed by a blank line
+TEMPLATE = PromptTemplate(
+    instructions=INSTRUCTION,
+    trial=(
+        '{trial_num}：\n'
+        '1. "{c1}"为"{compound}"这个词的整体语义贡献了多少？'
+        '请用0-5之间的整数来回答。\n'
+        '{r1}\n'
+        '2. "{c2}"为"{compound}"这个词的整体语义贡献了多少？'
+        '请用0-5之间的整数来回答。\n'
+        '{r2}\n'
+        '3. "{compound}"的意思能从"{c1}"和"{c2}"的语义上推测出来吗？'
+        '请用0-5之间的整数来回答。\n'
+        '{r3} \n'
+        '\n'
+    ),
+    fields={
+        "compound": "stimulus",
+        "c1": "constituent_1",
+        "c2": "constituent_2",
+        "r1": Field("constituent_1_contribution", marked=True),
+        "r2": Field("constituent_2_contribution", marked=True),
+        "r3": Field("predictability", marked=True),
+    },
+)
 
-for pid, group in exp1.groupby("participant_id", sort=False):
-    trials_list = list(group.iterrows())
-    n_trials    = len(trials_list)
-    n_chunks    = math.ceil(n_trials / MAX_TRIALS_PER_PROMPT)
+participants = group_bounds(exp1, ["participant_id"])
+chunks = split_bounds(participants, MAX_TRIALS_PER_PROMPT)
+positions = group_positions(participants)
+texts = TEMPLATE.render(exp1, chunks, trial_num=positions + 1)
 
-    for chunk_idx in range(n_chunks):
-        start_idx = chunk_idx * MAX_TRIALS_PER_PROMPT
-        end_idx   = min(start_idx + MAX_TRIALS_PER_PROMPT, n_trials)
-        chunk     = trials_list[start_idx:end_idx]
+pids = exp1["participant_id"].tolist()
+trial_ids = exp1["trial_id"].tolist()
 
-        trial_id_start = chunk[0][1]["trial_id"]
-        trial_id_end   = chunk[-1][1]["trial_id"]
+all_prompts = []
 
-        text = INSTRUCTION
-        for trial_num, (_, row) in enumerate(chunk, start=start_idx + 1):
-            text += format_trial(trial_num, row) + "\n"
+for text, start_idx, end_idx in zip(texts, chunks[:-1].tolist(), chunks[1:].tolist()):
+    pid = pids[start_idx]
+    chunk_idx = positions[start_idx] // MAX_TRIALS_PER_PROMPT
 
-        all_prompts.append({
-            "text":           text,
-            "experiment":     "chen2026transparency",
-            "participant_id": f"{pid}_part{chunk_idx + 1}",
-            "trial_id_start": trial_id_start,
-            "trial_id_end":   trial_id_end,
-        })
+    all_prompts.append({
+        "text":           text,
+        "experiment":     "chen2026transparency",
+        "participant_id": f"{pid}_part{chunk_idx + 1}",
+        "trial_id_start": trial_ids[start_idx],
+        "trial_id_end":   trial_ids[end_idx - 1],
+    })
 
 # Write JSONL
 with open(OUT_JSONL, "w", encoding="utf-8") as f:
@@ -1,11 +1,17 @@
-import json
+import os
+import sys
 from pathlib import Path
 from typing import Optional, Any
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+from psychling.packing import pack_prompts
+
 ## --- Configuration ---
-INPATH = Path("/Users/tikhomirova/PsychLing-101/connel2022_naming/processed_data/exp1.csv")
-OUTPATH = Path("prompts.jsonl")
+BASE_DIR = Path(__file__).resolve().parent
+INPATH = BASE_DIR / "processed_data" / "exp1.csv"
+OUTPATH = BASE_DIR / "prompts.jsonl.zip"
 
 ## --- Data Loading and Initial Preparation ---
 print(f"Loading data from: {INPATH}")
@@ -125,23 +131,23 @@ participants = sorted(df["participant_id"].unique())
 
 print(f"Processing data for {len(participants)} unique participants...")
 
-with OUTPATH.open("w", encoding="utf8") as fo:
+# Sessions longer than the 32K-token budget are split into consecutive parts,
+# each repeating the instructions
+with PromptArchiveWriter(OUTPATH) as writer:
     for pid in participants:
         sub_df = df[df["participant_id"] == pid].sort_values("trial_id")
 
         trials = []
         for idx, row in enumerate(sub_df.itertuples(index=False), start=1):
             desc = format_trial_description_row(pd.Series(row._asdict()))
-            trials.append(f"Trial {idx}:\n{desc}")
-
-        text_body = INSTRUCTION_TEXT + "\n\n".join(trials) + "\n"
-
-        result = {
-            "participant": str(pid),
-            "experiment": "connel2022_naming_exp1",
-            "text": text_body
-        }
+            trials.append(f"Trial {idx}:\n{desc}\n\n")
 
-        fo.write(json.dumps(result, ensure_ascii=False) + "\n")
+        for chunk in pack_prompts(INSTRUCTION_TEXT, trials):
+            writer.write({
+                "participant_id": str(pid),
+                "experiment": "connel2022_naming_exp1",
+                "text": chunk.text,
+                **chunk.metadata(),
+            })
 
-print(f" Successfully wrote {len(participants)} participant records to: {OUTPATH}")
+print(f" Successfully wrote {writer.n_records} prompts for {len(participants)} participants to: {OUTPATH}")
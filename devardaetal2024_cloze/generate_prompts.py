@@ -9,10 +9,15 @@ and wrote the next word they expected to follow.
 """
 
 import json
+import os
+import sys
 import zipfile
 from pathlib import Path
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.render import first_rows, group_bounds, join_groups, render_lines, sort_groups
+
 SCRIPT_DIR = Path(__file__).parent
 PROCESSED_DATA_DIR = SCRIPT_DIR / "processed_data"
 INPATH = PROCESSED_DATA_DIR / "exp1.csv"
@@ -25,6 +30,11 @@ Your task is to continue each sentence by writing what you expect to be the next
 
 """
 
+TRIAL_TEMPLATE = (
+    "Trial {trial_idx}. The sentence is: '{stimulus}'. "
+    "What is the next word you expect to follow? You write: <<{response}>>"
+)
+
 
 def format_trial_description(trial_idx: int, stimulus: str, response: str) -> str:
     """
@@ -38,10 +48,7 @@ def format_trial_description(trial_idx: int, stimulus: str, response: str) -> st
     Returns:
         Formatted trial description string
     """
-    return (
-        f"Trial {trial_idx}. The sentence is: '{stimulus}'. "
-        f"What is the next word you expect to follow? You write: <<{response}>>"
-    )
+    return TRIAL_TEMPLATE.format(trial_idx=trial_idx, stimulus=stimulus, response=response)
 
 
 def print_example_prompts(df: pd.DataFrame, n_participants: int = 2, n_trials: int = 5):
@@ -88,34 +95,33 @@ def main():
     print(f"Processing data for {len(participants)} unique participants...")
     
     records_written = 0
-    
+
+    # Trials of each participant, sorted by presentation order
+    df_sorted = sort_groups(df, ["participant_id"], ["trial_order"])
+    bounds = group_bounds(df_sorted, ["participant_id"])
+
+    # Build trial descriptions (using trial_order for correct presentation sequence)
+    trials = render_lines(
+        TRIAL_TEMPLATE,
+        trial_idx=df_sorted["trial_order"].astype(int) + 1,  # 1-indexed for display
+        stimulus=df_sorted["stimulus"],
+        response=df_sorted["response"].where(df_sorted["response"].notna(), ""),
+    )
+
     with OUTPATH.open("w", encoding="utf8") as fo:
-        for pid in participants:
-            # Get trials for this participant (sorted by presentation order)
-            sub_df = df[df["participant_id"] == pid].sort_values("trial_order")
-            
-            # Build trial descriptions (using trial_order for correct presentation sequence)
-            trials = []
-            for _, row in sub_df.iterrows():
-                desc = format_trial_description(
-                    trial_idx=int(row["trial_order"]) + 1,  # 1-indexed for display
-                    stimulus=str(row["stimulus"]),
-                    response=str(row["response"]) if pd.notna(row["response"]) else ""
-                )
-                trials.append(desc)
-            
+        for first_row, text_body in zip(
+            first_rows(df_sorted, bounds).to_dict("records"),
             # Combine instruction and trials
-            text_body = INSTRUCTION_TEXT + "\n".join(trials) + "\n"
-            
-            # Get optional metadata
-            first_row = sub_df.iloc[0]
-            
+            join_groups(trials, bounds, prefix=INSTRUCTION_TEXT, sep="\n", suffix="\n"),
+        ):
+            pid = first_row["participant_id"]
+
             result = {
                 "participant": str(pid),
                 "experiment": "devardaetal2024_cloze",
                 "text": text_body
             }
-            
+
             # Add optional demographic metadata if available
             if pd.notna(first_row.get("age")):
                 result["age"] = int(first_row["age"])
@@ -127,10 +133,10 @@ def main():
                 result["first_language"] = str(first_row["first_language"])
             if first_row.get("education") and str(first_row["education"]).strip():
                 result["education"] = str(first_row["education"])
-            
+
             fo.write(json.dumps(result, ensure_ascii=False) + "\n")
             records_written += 1
-    
+
     print(f"Successfully wrote {records_written} participant records to: {OUTPATH}")
     
     # Create zip file
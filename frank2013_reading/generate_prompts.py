@@ -1,10 +1,14 @@
-import random
+import os
 import string
+import sys
 import zipfile
 import jsonlines
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import participant_keys
+
 base_dir = Path(__file__).parent.resolve()
 
 MAX_CHARS = 50_000
@@ -39,7 +43,7 @@ def build_prompts(df: pd.DataFrame, instruction: str, exp_name: str) -> list[dic
         rt_list = []
 
         # Randomly assign J/F key mapping per participant
-        yes_key, no_key = random.sample(string.ascii_lowercase, 2)
+        yes_key, no_key = participant_keys(exp_name, int(pid), 2, string.ascii_lowercase)
 
         prompt = instruction.format(yes_key=yes_key, no_key=no_key)
 
@@ -1,11 +1,14 @@
-import zipfile
-import jsonlines
+import os
+import sys
 import pandas as pd
 from pathlib import Path
 
-base_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+from psychling.packing import pack_prompts
+from psychling.render import first_rows, group_bounds, group_values, render_lines, sort_groups
 
-MAX_CHARS = 50_000
+base_dir = Path(__file__).parent.resolve()
 
 INSTRUCTION = (
     "You will read a story word-by-word; press SPACE to reveal the next word. "
@@ -14,48 +17,41 @@ INSTRUCTION = (
 )
 
 
-def build_prompts(df: pd.DataFrame) -> list[dict]:
-    all_prompts = []
-
-    for (pid, item), df_s in df.groupby(["participant_id", "item"]):
-        df_s = df_s.sort_values("word_position")
-        comp = int(df_s["comprehension_correct"].iloc[0])
-
-        story_text = f"Story {int(item)}:\n"
-        for _, row in df_s.iterrows():
-            story_text += f"  Word {int(row['word_position'])}: '{row['word']}' <<{int(row['rt'])}>> ms\n"
-
-        prompt = INSTRUCTION + story_text
-
-        if len(prompt) > MAX_CHARS:
-            cut = prompt[:MAX_CHARS].rfind("\n")
-            prompt = prompt[:cut + 1]
-
-        entry = {
-            "text": prompt,
-            "experiment": "futrell2021_corpus/self_paced_reading",
-            "participant_id": int(pid),
-            "item": int(item),
-            "comprehension_correct": comp,
-            "rt": df_s["rt"].tolist(),
-        }
-        all_prompts.append(entry)
-
-    return all_prompts
+def build_prompts(df: pd.DataFrame):
+    """Yield one prompt entry per participant × story, or several if the
+    story does not fit the token limit."""
+    df = sort_groups(df, ["participant_id", "item"], ["word_position"])
+    bounds = group_bounds(df, ["participant_id", "item"])
+    lines = render_lines(
+        "  Word {position}: '{word}' <<{rt}>> ms\n",
+        position=df["word_position"].astype(int), word=df["word"], rt=df["rt"].astype(int),
+    )
+    firsts = first_rows(df, bounds)
+    story_lines = group_values(lines, bounds)
+    rts = group_values(df["rt"], bounds)
+
+    for pid, item, comp, story, rt in zip(
+        firsts["participant_id"], firsts["item"], firsts["comprehension_correct"], story_lines, rts
+    ):
+        for chunk in pack_prompts(INSTRUCTION + f"Story {int(item)}:\n", story):
+            entry = {
+                "text": chunk.text,
+                "experiment": "futrell2021_corpus/self_paced_reading",
+                "participant_id": int(pid),
+                "item": int(item),
+                "comprehension_correct": int(comp),
+                **chunk.metadata(),
+                "rt": rt[chunk.start:chunk.stop],
+            }
+            yield entry
 
 
 df = pd.read_csv(base_dir / "processed_data" / "exp1.csv")
-all_prompts = build_prompts(df)
-
-jsonl_path = base_dir / "prompts.jsonl"
-with jsonlines.open(jsonl_path, "w") as writer:
-    writer.write_all(all_prompts)
 
 zip_path = base_dir / "prompts.jsonl.zip"
-with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-    zf.write(jsonl_path, "prompts.jsonl")
-jsonl_path.unlink()
+with PromptArchiveWriter(zip_path) as writer:
+    writer.write_all(build_prompts(df))
 
 n_participants = df["participant_id"].nunique()
-print(f"prompts.jsonl.zip: {len(all_prompts)} entries "
+print(f"prompts.jsonl.zip: {writer.n_records} entries "
       f"({n_participants} participants × up to 10 stories)")
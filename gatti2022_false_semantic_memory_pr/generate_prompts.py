@@ -1,10 +1,14 @@
 from pathlib import Path
 import json
+import os
+import sys
 import zipfile
 
-import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import participant_keys
+
 
 DATASET_DIR = Path(__file__).resolve().parent
 INFILE = DATASET_DIR / "processed_data" / "exp1.csv"
@@ -17,9 +21,8 @@ STUDY_INSTRUCTIONS = (
     "Cerca di ricordarle per una successiva prova di memoria."
 )
 
-def randomized_choice_options(num_choices: int):
-    choice_options = list(map(chr, range(65, 91)))
-    return np.random.choice(choice_options, num_choices, replace=False)
+def randomized_choice_options(experiment: str, participant_id, num_choices: int):
+    return participant_keys(experiment, participant_id, num_choices)
 
 
 def recognition_instructions(choice_options) -> str:
@@ -78,10 +81,11 @@ def main():
     with JSONL.open("w", encoding="utf-8") as f:
         for participant_id, pdf in df.groupby("participant_id", sort=True):
             pdf = pdf.sort_values("trial_order").reset_index(drop=True)
-            choice_options = randomized_choice_options(num_choices=2)
+            experiment = str(pdf["experiment"].iloc[0])
+            choice_options = randomized_choice_options(experiment, participant_id, num_choices=2)
             record = {
                 "text": build_prompt(pdf, study_df, choice_options),
-                "experiment": str(pdf["experiment"].iloc[0]),
+                "experiment": experiment,
                 "participant_id": json_scalar(participant_id),
                 "age": json_scalar(pdf["age"].iloc[0]),
                 "gender": json_scalar(pdf["gender"].iloc[0]),
@@ -1,29 +1,50 @@
 from pathlib import Path
 import json
+import os
+import sys
 import zipfile
 
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.groups import TrialGroups
+from psychling.keys import assign_keys
+from psychling.render import group_positions
+from psychling.templates import Field, PromptTemplate
+
 
 DATASET_DIR = Path(__file__).resolve().parent
 INFILE = DATASET_DIR / "processed_data" / "exp1.csv"
 JSONL = DATASET_DIR / "prompts.jsonl"
 ZIPFILE = DATASET_DIR / "prompts.jsonl.zip"
 
-def randomized_choice_options(num_choices: int):
-    choice_options = list(map(chr, range(65, 91)))
-    return np.random.choice(choice_options, num_choices, replace=False)
+def add_choice_options(df: pd.DataFrame, bounds: np.ndarray) -> pd.DataFrame:
+    """*df* with each participant's two response keys (drawn per experiment
+    and participant) in ``nonword_key`` and ``word_key``."""
+    firsts = df.iloc[bounds[:-1]]
+    keys = np.empty((len(firsts), 2), dtype=object)
+    for experiment, rows in firsts.groupby("experiment", sort=False).indices.items():
+        keys[rows] = assign_keys(str(experiment), firsts["participant_id"].iloc[rows], n=2)
+    keys = np.repeat(keys, np.diff(bounds), axis=0)
+    return df.assign(nonword_key=keys[:, 0], word_key=keys[:, 1])
 
 
-def build_instructions(choice_options) -> str:
-    return (
+# Response 1 is a word and 0 a pseudoword, answered with the participant's keys
+TEMPLATE = PromptTemplate(
+    instructions=(
         "Compito di priming semantico. In ogni prova leggerai prima una parola e poi "
         "una seconda sequenza di lettere. Decidi se la seconda sequenza è una parola "
-        f"italiana esistente oppure una pseudoparola. Rispondi {choice_options[1]} per "
-        f"una parola esistente e {choice_options[0]} per una pseudoparola. Rispondi "
-        "nel modo più rapido e accurato possibile."
-    )
+        "italiana esistente oppure una pseudoparola. Rispondi {word_key} per "
+        "una parola esistente e {nonword_key} per una pseudoparola. Rispondi "
+        "nel modo più rapido e accurato possibile.\n"
+    ),
+    trial="Prova {trial}: Leggi prima la parola '{prime}' e poi la sequenza '{target}'. Rispondi {response}.",
+    fields={
+        "response": Field("response", choices=["nonword_key", "word_key"], missing="nessuna risposta", marked=True),
+    },
+    sep="\n",
+)
 
 
 def json_scalar(value):
@@ -34,12 +55,6 @@ def json_scalar(value):
     return value
 
 
-def format_response(value, choice_options):
-    if pd.isna(value):
-        return "nessuna risposta"
-    return choice_options[int(value)]
-
-
 def format_rt_list(values):
     result = []
     for value in values:
@@ -51,30 +66,19 @@ def format_rt_list(values):
     return result
 
 
-def build_prompt(pdf: pd.DataFrame, choice_options) -> str:
-    pdf = pdf.sort_values("trial_order").reset_index(drop=True)
-    lines = [build_instructions(choice_options)]
-
-    for i, row in enumerate(pdf.itertuples(index=False), start=1):
-        lines.append(
-            f"Prova {i}: Leggi prima la parola '{row.prime}' e poi la sequenza "
-            f"'{row.target}'. Rispondi <<{format_response(row.response, choice_options)}>>."
-        )
-
-    return "\n".join(lines)
-
-
 def main():
     df = pd.read_csv(INFILE)
+    groups = TrialGroups(df, ["participant_id"], "trial_order")
+    bounds = groups.bounds
+    trials = add_choice_options(groups.df, bounds)
+    texts = TEMPLATE.render(trials, bounds, trial=group_positions(bounds) + 1)
 
     with JSONL.open("w", encoding="utf-8") as f:
-        for participant_id, pdf in df.groupby("participant_id", sort=True):
-            pdf = pdf.sort_values("trial_order").reset_index(drop=True)
-            choice_options = randomized_choice_options(num_choices=2)
+        for text, pdf in zip(texts, groups):
             record = {
-                "text": build_prompt(pdf, choice_options),
+                "text": text,
                 "experiment": str(pdf["experiment"].iloc[0]),
-                "participant_id": json_scalar(participant_id),
+                "participant_id": json_scalar(pdf["participant_id"].iloc[0]),
                 "age": json_scalar(pdf["age"].iloc[0]),
                 "gender": json_scalar(pdf["gender"].iloc[0]),
                 "hand": json_scalar(pdf["hand"].iloc[0]),
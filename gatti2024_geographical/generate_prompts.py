@@ -1,19 +1,22 @@
 from pathlib import Path
 import json
+import os
+import sys
 import zipfile
 
-import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import participant_keys
+
 
 DATASET_DIR = Path(__file__).resolve().parent
 INPUT_PATH = DATASET_DIR / "processed_data" / "exp1.csv"
 OUTPUT_PATH = DATASET_DIR / "prompts.jsonl"
 ZIP_PATH = DATASET_DIR / "prompts.jsonl.zip"
 
-def randomized_choice_options(num_choices: int):
-    choice_options = list(map(chr, range(65, 91)))
-    return np.random.choice(choice_options, num_choices, replace=False)
+def randomized_choice_options(experiment: str, participant_id, num_choices: int):
+    return participant_keys(experiment, participant_id, num_choices)
 
 
 def build_instructions(choice_options) -> str:
@@ -81,10 +84,11 @@ def main():
     with OUTPUT_PATH.open("w", encoding="utf-8") as f:
         for participant_id, pdf in df.groupby("participant_id", sort=True):
             pdf = pdf.sort_values("trial_order").reset_index(drop=True)
-            choice_options = randomized_choice_options(num_choices=2)
+            experiment = str(pdf["experiment"].iloc[0])
+            choice_options = randomized_choice_options(experiment, participant_id, num_choices=2)
             record = {
                 "text": build_text(pdf, choice_options),
-                "experiment": str(pdf["experiment"].iloc[0]),
+                "experiment": experiment,
                 "participant_id": json_scalar(participant_id),
                 "age": json_scalar(pdf["age"].iloc[0]),
                 "gender": json_scalar(pdf["gender"].iloc[0]),
@@ -1,13 +1,19 @@
 import pandas as pd
 import jsonlines
-import random
+import os
+import sys
 import string
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.groups import TrialGroups
+from psychling.keys import participant_keys
 
-# Randomize choice options: function to draw n random letters from the alphabet without replacement
-def random_letters(n):
-    return ''.join(random.sample(string.ascii_lowercase, n))
+
+# Randomize choice options: function to draw n random letters from the alphabet without replacement,
+# the same ones for a participant on every run
+def random_letters(participant_id, n):
+    return ''.join(participant_keys('guenther2020TS', participant_id, n, string.ascii_lowercase))
 
 # Load data
 base_dir = Path(__file__).parent.resolve()
@@ -20,21 +26,20 @@ df = df.sort_values(by=['participant_id', 'trial_id'])
 # Remap participant IDs to sequential integers starting from 1
 df['participant_id'] = df['participant_id'].map({p: i+1 for i, p in enumerate(df.participant_id.unique())})
 
-# Get unique participants and trial indices
-participants = df['participant_id'].unique()
+# Group trials by participant (sorted by trial order) and get trial indices
+groups = TrialGroups(df, ['participant_id'], 'trial_id')
 trials = range(df['trial_id'].max() + 1)
 
 # Generate individual prompts for each participant
 all_prompts = []
-for participant in participants:
+for df_participant in groups:
     # Get data for current participant
-    df_participant = df[df['participant_id'] == participant]
-    participant = participant.item()
+    participant = df_participant['participant_id'].iloc[0].item()
     age = df_participant['age'].iloc[0].item()
     rt_list = []
     
     # generate two choice options
-    choices = random_letters(2)
+    choices = random_letters(participant, 2)
     
     # Update response column using loc
     df_participant.loc[df_participant["response"] == "c", "response"] = choices[0]
@@ -50,18 +55,16 @@ for participant in participants:
     
     
     # Add each trial's word and response
-    for trial in trials:
-        df_trial = df_participant.loc[df_participant['trial_id'] == trial]
-        if not df_trial.empty:
-            # Extract word and participant's response
-            word = df_trial['stimulus'].iloc[0]
-            response = df_trial['response'].iloc[0]
-            datapoint = f'The word "{word}" appears on the screen. You press <<{response}>>.\n '
-            prompt += datapoint
-            
-            # Store reaction time
-            rt = df_trial['rt'].iloc[0].item()
-            rt_list.append(rt)
+    for df_trial in groups.trials(df_participant, trials).itertuples():
+        # Extract word and participant's response
+        word = df_trial.stimulus
+        response = df_trial.response
+        datapoint = f'The word "{word}" appears on the screen. You press <<{response}>>.\n '
+        prompt += datapoint
+        
+        # Store reaction time
+        rt = df_trial.rt
+        rt_list.append(rt)
             
     prompt += '\n'
     
@@ -1,7 +1,12 @@
 import pandas as pd
 import jsonlines
+import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.groups import TrialGroups
+
 # load data‚
 base_dir = Path(__file__).parent.resolve()
 df = pd.read_csv(base_dir / "processed_data" / "exp1.csv")
@@ -12,8 +17,8 @@ df = df.sort_values(by=['participant_id', 'trial_id'])
 # Remap participant IDs to sequential integers starting from 1
 df['participant_id'] = df['participant_id'].map({p: i+1 for i, p in enumerate(df.participant_id.unique())})
 
-# Get unique participants and trial indices
-participants = df['participant_id'].unique()
+# Group trials by participant (sorted by trial order) and get trial indices
+groups = TrialGroups(df, ['participant_id'], 'trial_id')
 trials = range(df['trial_id'].max() + 1)
 
 # Define experiment instructions shown to participants
@@ -30,24 +35,21 @@ The study will start with two practice trials in which you receive feedback.\n""
 
 # Generate individual prompts for each participant
 all_prompts = []
-for participant in participants:
+for df_participant in groups:
     # Get data for current participant
-    df_participant = df[df['participant_id'] == participant]
-    participant = participant.item()
+    participant = df_participant['participant_id'].iloc[0].item()
     
     # Start with instruction text
     prompt = instruction
     
     # Add each trial's word and response
-    for trial in trials:
-        df_trial = df_participant.loc[df_participant['trial_id'] == trial]
-        if not df_trial.empty:
-            # Extract word and participant's response
-            stimulus = df_trial['stimulus'].iloc[0]
-            best = df_trial['best'].iloc[0]
-            worst = df_trial['worst'].iloc[0]
-            datapoint = f'Which look the most similar? {stimulus}. You choose <<{best}>> as most similar. Which look the least similar? {stimulus}. You choose <<{worst}>> as least similar \n '
-            prompt += datapoint
+    for df_trial in groups.trials(df_participant, trials).itertuples():
+        # Extract word and participant's response
+        stimulus = df_trial.stimulus
+        best = df_trial.best
+        worst = df_trial.worst
+        datapoint = f'Which look the most similar? {stimulus}. You choose <<{best}>> as most similar. Which look the least similar? {stimulus}. You choose <<{worst}>> as least similar \n '
+        prompt += datapoint
             
     prompt += '\n'
     
@@ -1,12 +1,17 @@
 import pandas as pd
 import jsonlines
-import random
+import os
+import sys
 import string
 from pathlib import Path
 
-# Randomize choice options: function to draw n random letters from the alphabet without replacement
-def random_letters(n):
-    return ''.join(random.sample(string.ascii_lowercase, n))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import participant_keys
+
+# Randomize choice options: function to draw n random letters from the alphabet without replacement,
+# the same ones for a participant on every run
+def random_letters(participant_id, n):
+    return ''.join(participant_keys('guenther2023Grammaticality', participant_id, n, string.ascii_lowercase))
 
 
 # load data
@@ -34,7 +39,7 @@ for participant in participants:
     age = df_participant['age'].iloc[0].item()
 
     # generate two choice options
-    choices = random_letters(2)
+    choices = random_letters(participant, 2)
     
     # Update response column using loc
     df_participant.loc[df_participant["response"] == "c", "response"] = choices[0]
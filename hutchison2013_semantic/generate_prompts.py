@@ -1,12 +1,18 @@
-import random
+import argparse
+import os
 import string
-import zipfile
+import sys
 from pathlib import Path
+from typing import Iterator
 
-import jsonlines
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.incremental import IncrementalArchive, add_rebuild_argument
+from psychling.keys import participant_keys
+from psychling.shards import add_workers_argument
+
 
 MAX_CHARS = 50_000 # To limit the size of the prompts
 
@@ -30,27 +36,29 @@ NAMING_INSTRUCTION = (
 )
 
 
-def random_letters(n: int) -> str:
-    return "".join(random.sample(string.ascii_lowercase, n))
-
-
-def generate_ldt_prompts(base_dir: Path) -> list:
-    df = pd.read_csv(base_dir / "processed_data" / "exp1.csv")
+def load_trials(path: Path) -> pd.DataFrame:
+    """Trials sorted by participant and trial, participants renumbered from 1."""
+    df = pd.read_csv(path)
     df = df.sort_values(["participant_id", "trial_id"])
 
     participants = sorted(df["participant_id"].unique())
     id_map = {p: i + 1 for i, p in enumerate(participants)}
     df["participant_id"] = df["participant_id"].map(id_map)
+    return df
 
-    all_prompts = []
-    for new_id, orig_id in enumerate(participants, start=1):
-        df_p = df[df["participant_id"] == new_id].copy()
+
+def ldt_prompts(df: pd.DataFrame) -> Iterator[dict]:
+    """Yield one lexical decision record per participant of *df* (see load_trials)."""
+    for new_id, df_p in df.groupby("participant_id", sort=True):
+        new_id = int(new_id)
 
         age_val = df_p["age"].iloc[0]
         gender_val = df_p["gender"].iloc[0]
 
         # Randomly assign keys per participant
-        yes_key, no_key = random.sample(string.ascii_lowercase, 2)
+        yes_key, no_key = participant_keys(
+            "hutchison2013_semantic/lexical_decision", new_id, 2, string.ascii_lowercase
+        )
 
         instruction = LDT_INSTRUCTION.format(yes_key=yes_key, no_key=no_key)
 
@@ -92,22 +100,13 @@ def generate_ldt_prompts(base_dir: Path) -> list:
         if pd.notna(school_val):
             entry["school"] = str(school_val)
 
-        all_prompts.append(entry)
-
-    return all_prompts
-
-
-def generate_naming_prompts(base_dir: Path) -> list:
-    df = pd.read_csv(base_dir / "processed_data" / "exp2.csv")
-    df = df.sort_values(["participant_id", "trial_id"])
+        yield entry
 
-    participants = sorted(df["participant_id"].unique())
-    id_map = {p: i + 1 for i, p in enumerate(participants)}
-    df["participant_id"] = df["participant_id"].map(id_map)
 
-    all_prompts = []
-    for new_id, orig_id in enumerate(participants, start=1):
-        df_p = df[df["participant_id"] == new_id].copy()
+def naming_prompts(df: pd.DataFrame) -> Iterator[dict]:
+    """Yield one speeded naming record per participant of *df* (see load_trials)."""
+    for new_id, df_p in df.groupby("participant_id", sort=True):
+        new_id = int(new_id)
 
         age_val = df_p["age"].iloc[0]
         gender_val = df_p["gender"].iloc[0]
@@ -150,28 +149,26 @@ def generate_naming_prompts(base_dir: Path) -> list:
         if pd.notna(school_val):
             entry["school"] = str(school_val)
 
-        all_prompts.append(entry)
-
-    return all_prompts
+        yield entry
 
 
 if __name__ == "__main__":
-    base_dir = Path(__file__).parent.resolve()
-
-    print("Generating LDT prompts...")
-    ldt_prompts = generate_ldt_prompts(base_dir)
-    print("Generating naming prompts...")
-    naming_prompts = generate_naming_prompts(base_dir)
-    all_prompts = ldt_prompts + naming_prompts
-
-    jsonl_path = base_dir / "prompts.jsonl"
-    with jsonlines.open(jsonl_path, "w") as writer:
-        writer.write_all(all_prompts)
+    parser = argparse.ArgumentParser()
+    add_workers_argument(parser)
+    add_rebuild_argument(parser)
+    args = parser.parse_args()
 
+    base_dir = Path(__file__).parent.resolve()
     zip_path = base_dir / "prompts.jsonl.zip"
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.write(jsonl_path, "prompts.jsonl")
-
-    jsonl_path.unlink()
 
-    print(f"Done. {len(all_prompts)} prompts ({len(ldt_prompts)} LDT + {len(naming_prompts)} naming).")
+    with IncrementalArchive(zip_path, __file__, rebuild=args.rebuild) as archive:
+        print("Generating LDT prompts...")
+        df = load_trials(base_dir / "processed_data" / "exp1.csv")
+        archive.write_participants(df, ["participant_id"], ldt_prompts, "hutchison2013_semantic/lexical_decision", workers=args.workers)
+        n_ldt = archive.n_records
+        print("Generating naming prompts...")
+        df = load_trials(base_dir / "processed_data" / "exp2.csv")
+        archive.write_participants(df, ["participant_id"], naming_prompts, "hutchison2013_semantic/speeded_naming", workers=args.workers)
+
+    print(f"Done. {archive.n_records} prompts ({n_ldt} LDT + {archive.n_records - n_ldt} naming); "
+          f"{archive.n_rendered} participant(s) rendered, {archive.n_reused} reused.")
@@ -9,27 +9,32 @@ N400 and P600 mean amplitudes (uV) are marked << >> for every word
 in each trial. Comprehension questions are appended after probed
 trials -- no ERP values for the question screen itself.
 
+Sessions longer than the 32K-token budget (cl100k_base tokens) are split
+into consecutive parts, each repeating the instructions.
+
 JSONL fields:
-  text           -- full natural-language prompt
+  text           -- natural-language prompt
   experiment     -- study identifier string
   participant_id -- participant code (e.g. "E01")
+  part, n_parts, trial_start, trial_end -- where the prompt sits in the session
 """
 
-import io
-import json
 import os
-import zipfile
+import sys
 
 import pandas as pd
-import tiktoken
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+from psychling.packing import pack_prompts
+from psychling.tokens import TOKEN_LIMIT
 
 # -- Paths ---------------------------------------------------------------------
-BASE_DIR = r"D:\PsychLing-101\jap2025_erp"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 IN_FILE  = os.path.join(BASE_DIR, "processed_data", "exp1.csv")
-OUT_ZIP  = os.path.join(BASE_DIR, "processed_data", "prompts.jsonl.zip")
+OUT_ZIP  = os.path.join(BASE_DIR, "prompts.jsonl.zip")
 
 EXPERIMENT  = "jap2025_erp"
-TOKEN_LIMIT = 128_000
 
 # -- Task instructions (in Bahasa Indonesia, matching what participants saw) ---
 INSTRUCTIONS = (
@@ -48,11 +53,6 @@ INSTRUCTIONS = (
 df = pd.read_csv(IN_FILE)
 print(f"Loaded {len(df):,} rows | {df['participant_id'].nunique()} participants")
 
-# -- Token counter -------------------------------------------------------------
-enc = tiktoken.get_encoding("cl100k_base")
-def count_tokens(text):
-    return len(enc.encode(text))
-
 # -- Answer map ----------------------------------------------------------------
 ANSWER_MAP = {"y": "ya (yes)", "t": "tidak (no)"}
 
@@ -68,14 +68,14 @@ records      = []
 token_counts = []
 
 for pid, pdata in exp_df.groupby("participant_id"):
-    lines     = [INSTRUCTIONS, ""]
+    trials    = []
     trial_num = 0
 
     for trial_id, tdata in pdata.sort_values(["trial", "position_num"]).groupby("trial"):
         trial_num += 1
         words = tdata.sort_values("position_num")
 
-        lines.append(f"Trial {trial_num}:")
+        lines = [f"Trial {trial_num}:"]
 
         comp_q   = None
         comp_ans = None
@@ -98,50 +98,33 @@ for pid, pdata in exp_df.groupby("participant_id"):
                 f"  [Correct answer: {format_answer(comp_ans)}]"
             )
 
-        lines.append("")
-
-    text  = "\n".join(lines)
-    n_tok = count_tokens(text)
-    token_counts.append(n_tok)
-
-    if n_tok > TOKEN_LIMIT:
-        print(f"  WARNING {pid}: {n_tok:,} tokens exceeds {TOKEN_LIMIT:,} -- truncating...")
-        safe_lines = []
-        running    = 0
-        buffer     = []
-        for line in lines:
-            buffer.append(line)
-            if line == "":
-                block_toks = count_tokens("\n".join(buffer))
-                if running + block_toks > TOKEN_LIMIT:
-                    break
-                safe_lines.extend(buffer)
-                running += block_toks
-                buffer   = []
-        text = "\n".join(safe_lines)
-
-    records.append({
-        "text":           text,
-        "experiment":     EXPERIMENT,
-        "participant_id": pid,
-    })
-
-print(f"\nToken stats across {len(token_counts)} participants:")
+        trials.append("\n".join(lines) + "\n\n")
+
+    chunks = pack_prompts(INSTRUCTIONS + "\n\n", trials)
+    if len(chunks) > 1:
+        print(f"  {pid}: split into {len(chunks)} prompts to stay within {TOKEN_LIMIT:,} tokens")
+
+    for chunk in chunks:
+        token_counts.append(chunk.n_tokens)
+        records.append({
+            "text":           chunk.text,
+            "experiment":     EXPERIMENT,
+            "participant_id": pid,
+            **chunk.metadata(),
+        })
+
+print(f"\nToken stats across {len(token_counts)} prompts:")
 s = pd.Series(token_counts)
 print(f"  min={s.min():,}  median={s.median():,.0f}  max={s.max():,}  "
       f"over_limit={(s > TOKEN_LIMIT).sum()}")
 
 # -- Write prompts.jsonl.zip ---------------------------------------------------
-os.makedirs(os.path.dirname(OUT_ZIP), exist_ok=True)
-jsonl_buf = io.BytesIO()
-for rec in records:
-    jsonl_buf.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
-
-with zipfile.ZipFile(OUT_ZIP, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-    zf.writestr("prompts.jsonl", jsonl_buf.getvalue())
+with PromptArchiveWriter(OUT_ZIP) as writer:
+    writer.write_all(records)
 
-print(f"\nWrote: processed_data/prompts.jsonl.zip")
-print(f"  Participants : {len(records)}")
+print(f"\nWrote: prompts.jsonl.zip")
+print(f"  Participants : {exp_df['participant_id'].nunique()}")
+print(f"  Prompts      : {len(records)}")
 
 # -- Sample output -------------------------------------------------------------
 sample = records[0]["text"].split("\n")[:50]
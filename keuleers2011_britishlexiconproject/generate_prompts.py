@@ -1,10 +1,15 @@
 import pandas as pd
+import numpy as np
 import jsonlines
-import random
 import math
 import os
 import zipfile
 import string
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.keys import assign_keys
+from psychling.render import choose, first_rows, group_bounds, group_values, join_groups, render_lines, sort_groups
 
 def generate_prompts():
     print("Loading preprocessed dataset")
@@ -19,52 +24,47 @@ def generate_prompts():
     )
 
     print("Grouping trials by participant and block")
-    grouped = df.groupby(['participant_id', 'phase_id'])
+    df = sort_groups(df, ['participant_id', 'phase_id'], ['trial_order'])
+    bounds = group_bounds(df, ['participant_id', 'phase_id'])
+    blocks = first_rows(df, bounds)
+
+    # Pick 2 unique, random lowercase letters from the alphabet for every block
+    block_ids = [
+        f"{participant_id}_block_{int(phase_id)}"
+        for participant_id, phase_id in zip(blocks['participant_id'], blocks['phase_id'])
+    ]
+    keys = assign_keys('keuleers2011_britishlexiconproject/exp1', block_ids, n=2, alphabet=string.ascii_lowercase)
+    sizes = np.diff(bounds)
+    word_key = np.repeat(keys[:, 0], sizes)
+    nonword_key = np.repeat(keys[:, 1], sizes)
+
+    # Trials without an RT are left out and not counted
+    answered = df['rt'].notna().to_numpy()
+    answered_before = np.append(0, np.cumsum(answered))
+    trial_counter = answered_before[1:] - np.repeat(answered_before[bounds[:-1]], sizes)
+
+    resp = df['response'].to_numpy()
+    pressed_key = choose(resp == 'W', word_key, choose(resp == 'N', nonword_key, 'timeout'))
+    feedback = choose(df['accuracy'].to_numpy() == 1.0, "Correct.", "Incorrect.")
+
+    datapoints = render_lines(
+        "Trial {trial}: The string is '{stimulus}'. You press <<{pressed_key}>>. {feedback}\n",
+        trial=trial_counter, stimulus=df['stimulus'], pressed_key=pressed_key, feedback=feedback,
+    )
+    datapoints[~answered] = ""
+    rts = df['rt'].to_numpy(dtype=float)[answered]
 
     prompt_count = 0
 
-    for (participant_id, phase_id), group in grouped:
-
-        group = group.sort_values('trial_order')
-
-        # Pick 2 unique, random lowercase letters from the alphabet
-        word_key, nonword_key = random.sample(string.ascii_lowercase, 2)
-
-        individual_prompt = base_instruction.format(word_key=word_key, nonword_key=nonword_key)
-
-        rt_list = []
-        trial_counter = 1
-
-        for _, row in group.iterrows():
-            rt = row['rt']
-
-            if pd.isna(rt):
-                continue
-
-            stimulus = row['stimulus']
-            resp = row['response']
-            acc = row['accuracy']
-
-            if resp == 'W':
-                pressed_key = word_key
-            elif resp == 'N':
-                pressed_key = nonword_key
-            else:
-                pressed_key = 'timeout'
-
-            feedback = "Correct." if acc == 1.0 else "Incorrect."
-
-            rt_list.append(float(rt))
+    for (word, nonword), block_id, trials, rt_list in zip(
+        keys, block_ids, join_groups(datapoints, bounds), group_values(rts, answered_before[bounds]),
+    ):
+        individual_prompt = base_instruction.format(word_key=word, nonword_key=nonword) + trials
 
-            datapoint = f"Trial {trial_counter}: The string is '{stimulus}'. You press <<{pressed_key}>>. {feedback}\n"
-            individual_prompt += datapoint
-            
-            trial_counter += 1
-        
         all_prompts.append({
             'text': individual_prompt,
             'experiment': 'keuleers2011_britishlexiconproject/exp1',
-            'participant_id': f"{participant_id}_block_{int(phase_id)}", 
+            'participant_id': block_id,
             'rt': rt_list
         })
 
@@ -2,7 +2,8 @@
 Generate LLM prompts for Lynott et al. (2020) Lancaster Sensorimotor Norms.
 
 Reads processed_data/exp1.csv (Perception) and exp2.csv (Action) and writes
-prompts.jsonl.zip (one line per participant per chunk of up to MAX_TRIALS_PER_PROMPT trials).
+prompts.jsonl.zip (one line per participant per chunk of trials that fits the
+32K-token limit).
 
 Each prompt represents a session chunk from one participant, starting with the
 original task instructions followed by trial-by-trial data.
@@ -10,18 +11,23 @@ original task instructions followed by trial-by-trial data.
 Human responses are marked with << >> as required by PsychLing-101 format.
 """
 
-import json
-import zipfile
+import os
+import sys
 from pathlib import Path
 
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+from psychling.groups import TrialGroups
+from psychling.packing import pack_prompts
+from psychling.render import group_positions
+from psychling.templates import Field, PromptTemplate
+
 BASE = Path(__file__).parent
 PROC_DIR = BASE / "processed_data"
 OUT_ZIP  = BASE / "prompts.jsonl.zip"
 
-MAX_TRIALS_PER_PROMPT = 100   # max trials per prompt entry
-
 # ── Instructions (verbatim from original Qualtrics survey) ────────────────────
 
 GENERAL_INSTRUCTION = (
@@ -93,151 +99,110 @@ ACTION_DIMS = [
 ]
 
 
-# ── Trial formatting ──────────────────────────────────────────────────────────
-
-def fmt_rating(val) -> str:
-    """Return the rating as an integer string, or 'NA' if missing."""
-    if pd.isna(val):
-        return "NA"
-    return str(int(val))
-
-
-def format_perception_trial(trial_num: int, word: str, row: pd.Series) -> str:
-    """
-    Format one perception trial to mirror the Qualtrics screen:
-
-        Trial 1: To what extent do you experience ACCOUNT (integer from 0 = not at all to 5 = greatly)
-          By hearing:                    <<0>>
-          By tasting:                    <<0>>
-          By feeling through touch:      <<1>>
-          By sensations inside your body:<<0>>
-          By smelling:                   <<0>>
-          By seeing:                     <<2>>
-          Don't know the meaning of this word: <<0>>
-    """
-    lines = [f"Trial {trial_num}: To what extent do you experience {word.upper()} (integer from 0 = not at all to 5 = greatly)"]
-    for col, label in PERCEPTION_DIMS:
-        lines.append(f"  {label}: <<{fmt_rating(row.get(col))}>>" )
-    unknown = row.get("unknown_word", 0)
-    lines.append(f"  Don't know the meaning of this word: <<{fmt_rating(unknown)}>>")
-    return "\n".join(lines) + "\n"
-
-
-def format_action_trial(trial_num: int, word: str, row: pd.Series) -> str:
-    """
-    Format one action trial to mirror the Qualtrics screen:
-
-        Trial 1: To what extent do you experience SHELL by performing an action with the (integer from 0 = not at all to 5 = greatly)
-          foot / leg:           <<0>>
-          hand / arm:           <<4>>
-          head excluding mouth: <<0>>
-          mouth / throat:       <<3>>
-          torso:                <<0>>
-          Don't know the meaning of this word: <<0>>
-    """
-    lines = [
-        f"Trial {trial_num}: To what extent do you experience {word.upper()} "
-        f"by performing an action with the (integer from 0 = not at all to 5 = greatly)"
-    ]
-    for col, label in ACTION_DIMS:
-        lines.append(f"  {label}: <<{fmt_rating(row.get(col))}>>" )
-    unknown = row.get("unknown_word", 0)
-    lines.append(f"  Don't know the meaning of this word: <<{fmt_rating(unknown)}>>")
-    return "\n".join(lines) + "\n"
+# ── Trial templates ───────────────────────────────────────────────────────────
+# Each trial mirrors the Qualtrics screen, e.g. for perception:
+#
+#   Trial 1: To what extent do you experience ACCOUNT (integer from 0 = not at all to 5 = greatly)
+#     By hearing: <<0>>
+#     By tasting: <<0>>
+#     ...
+#     Don't know the meaning of this word: <<0>>
+#
+# Ratings print as integers, or NA if missing.
+
+def rating(column: str) -> Field:
+    return Field(column, cast=int, missing="NA", marked=True)
+
+
+def trial_template(question: str, dims) -> str:
+    return (
+        f"Trial {{trial}}: To what extent do you experience {{word}}{question} "
+        "(integer from 0 = not at all to 5 = greatly)\n"
+        + "".join(f"  {label}: {{{col}}}\n" for col, label in dims)
+        + "  Don't know the meaning of this word: {unknown_word}\n\n"
+    )
+
+
+def prompt_template(instruction: str, question: str, dims) -> PromptTemplate:
+    return PromptTemplate(
+        instructions=instruction,
+        trial=trial_template(question, dims),
+        fields={
+            "word": Field("stimulus", upper=True),
+            "unknown_word": rating("unknown_word"),
+            **{col: rating(col) for col, _ in dims},
+        },
+    )
+
+
+PERCEPTION_TEMPLATE = prompt_template(INSTRUCTION_PERCEPTION, "", PERCEPTION_DIMS)
+ACTION_TEMPLATE = prompt_template(
+    INSTRUCTION_ACTION, " by performing an action with the", ACTION_DIMS
+)
 
 
 # ── Prompt builder ────────────────────────────────────────────────────────────
 
 def build_prompts(
     exp: pd.DataFrame,
-    instruction: str,
-    format_trial_fn,
+    template: PromptTemplate,
     exp_name: str,
-) -> list[dict]:
+):
     """
-    Build prompt entries for one experiment.
+    Yield prompt entries for one experiment.
 
-    One participant's trials are split into chunks of MAX_TRIALS_PER_PROMPT.
-    Each chunk becomes one JSONL entry. The chunk number is appended to the
-    participant_id so entries remain uniquely identifiable:
+    One participant's trials are packed into as few prompts as fit the token
+    limit, trials numbered through the whole session. Each chunk becomes one
+    JSONL entry. The chunk number is appended to the participant_id so entries
+    remain uniquely identifiable:
         participant_id  →  "<pid>_part1", "<pid>_part2", …
     """
-    all_prompts = []
+    groups = TrialGroups(exp, ["participant_id"], "trial_id", sort=False)
+    df, bounds = groups.df, groups.bounds
+    lines = template.trial_lines(df, trial=group_positions(bounds) + 1).tolist()
 
-    for pid, group in exp.groupby("participant_id", sort=False):
-        group = group.sort_values("trial_id").reset_index(drop=True)
-
-        age    = group["age"].iloc[0]
-        gender = group["gender"].iloc[0]
-
-        # Split into chunks of MAX_TRIALS_PER_PROMPT
-        chunks = [
-            group.iloc[i : i + MAX_TRIALS_PER_PROMPT]
-            for i in range(0, len(group), MAX_TRIALS_PER_PROMPT)
-        ]
-
-        for chunk_idx, chunk in enumerate(chunks, start=1):
-            text = instruction
-            local_trial_num = 1          # restart numbering inside each chunk
-
-            for _, row in chunk.iterrows():
-                text += format_trial_fn(local_trial_num, row["stimulus"], row)
-                text += "\n"
-                local_trial_num += 1
+    for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        pid    = df["participant_id"].iat[start]
+        age    = df["age"].iat[start]
+        gender = df["gender"].iat[start]
 
+        for chunk in pack_prompts(template.instructions, lines[start:stop]):
             entry: dict = {
-                "text":           text,
+                "text":           chunk.text,
                 "experiment":     exp_name,
-                "participant":    f"{pid}_part{chunk_idx}",
+                "participant":    f"{pid}_part{chunk.part}",
+                **chunk.metadata(),
             }
             if pd.notna(age):
                 entry["age"] = int(age)
             if pd.notna(gender):
                 entry["gender"] = gender
 
-            all_prompts.append(entry)
-
-    return all_prompts
+            yield entry
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
-all_prompts: list[dict] = []
-
-print("Processing Perception (exp1) …")
-exp1 = pd.read_csv(PROC_DIR / "exp1.csv", dtype={"participant_id": str})
-perception_prompts = build_prompts(
-    exp1,
-    INSTRUCTION_PERCEPTION,
-    format_perception_trial,
-    "lynott2020lancaster/perception",
-)
-all_prompts += perception_prompts
-print(f"  → {len(perception_prompts)} prompt entries "
-      f"({exp1['participant_id'].nunique()} participants)")
-
-print("Processing Action (exp2) …")
-exp2 = pd.read_csv(PROC_DIR / "exp2.csv", dtype={"participant_id": str})
-action_prompts = build_prompts(
-    exp2,
-    INSTRUCTION_ACTION,
-    format_action_trial,
-    "lynott2020lancaster/action",
-)
-all_prompts += action_prompts
-print(f"  → {len(action_prompts)} prompt entries "
-      f"({exp2['participant_id'].nunique()} participants)")
-
-# ── Write JSONL zip ───────────────────────────────────────────────────────────
-
-tmp_jsonl = BASE / "prompts.jsonl"
-with open(tmp_jsonl, "w", encoding="utf-8") as f:
-    for entry in all_prompts:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-
-with zipfile.ZipFile(OUT_ZIP, "w", zipfile.ZIP_DEFLATED) as zf:
-    zf.write(tmp_jsonl, tmp_jsonl.name)
-tmp_jsonl.unlink()
-
-print(f"\nWritten {len(all_prompts)} total prompt entries to {OUT_ZIP.name}")
-print("Done.")
\ No newline at end of file
+with PromptArchiveWriter(OUT_ZIP) as writer:
+    print("Processing Perception (exp1) …")
+    exp1 = pd.read_csv(PROC_DIR / "exp1.csv", dtype={"participant_id": str})
+    writer.write_all(build_prompts(
+        exp1,
+        PERCEPTION_TEMPLATE,
+        "lynott2020lancaster/perception",
+    ))
+    n_perception = writer.n_records
+    print(f"  → {n_perception} prompt entries "
+          f"({exp1['participant_id'].nunique()} participants)")
+
+    print("Processing Action (exp2) …")
+    exp2 = pd.read_csv(PROC_DIR / "exp2.csv", dtype={"participant_id": str})
+    writer.write_all(build_prompts(
+        exp2,
+        ACTION_TEMPLATE,
+        "lynott2020lancaster/action",
+    ))
+    print(f"  → {writer.n_records - n_perception} prompt entries "
+          f"({exp2['participant_id'].nunique()} participants)")
+
+print(f"\nWritten {writer.n_records} total prompt entries to {OUT_ZIP.name}")
@@ -37,7 +37,9 @@ Conventions in ``text`` (see also ``pwi_prompt_examples.md``):
 * Instructions are uniform PWI-style across all studies; original
   per-study instruction texts are intentionally not used.
 * Participants whose session exceeds the 32K-token limit are automatically
-  split into two records (_part1 / _part2) by trial order.
+  split by trial order into as few records as fit it (_part1, _part2, …),
+  each repeating the instructions. Every record carries ``part``,
+  ``n_parts``, ``trial_start`` and ``trial_end``.
 
 Run from the experiment folder::
 
@@ -51,12 +53,17 @@ Then zip the results for the PR::
 from __future__ import annotations
 
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.packing import PromptChunk, pack_prompts
+from psychling.tokens import TOKEN_LIMIT
+
 
 # ---------- paths ----------------------------------------------------------
 
@@ -67,22 +74,6 @@ INPUT_FILE = "exp1.csv"
 OUTPUT_PATH = ROOT / "prompts.jsonl"
 
 
-# ---------- limits ---------------------------------------------------------
-
-# PsychLing-101 hard limit per participant.
-TOKEN_LIMIT = 32_000
-
-# Rough character-to-token heuristic. 0.30 is conservative for English/German
-# text. Replace with `tiktoken` or an Anthropic tokenizer for exact counts.
-TOKENS_PER_CHAR = 0.30
-
-# Experiments whose over-budget participants are split into 3 parts instead
-# of the default 2 (used when ~half still exceeds TOKEN_LIMIT).
-SPLIT_THREE_EXPERIMENTS: frozenset[str] = frozenset({
-    "vieth_2014b_experiment3",
-})
-
-
 # ---------- instruction templates ------------------------------------------
 
 INSTRUCTIONS_OVERT = (
@@ -281,16 +272,21 @@ def _build_instructions(constants: dict[str, Any], task_type: str) -> str:
     )
 
 
-def _build_text(df_part: pd.DataFrame) -> str:
+def _pack_session(df_part: pd.DataFrame) -> list[PromptChunk]:
+    """Instructions and trial lines of one session, packed into prompts.
+
+    Each prompt reads ``<instructions>\\n\\nTrial 1: …\\n\\nTrial 2: …\\n\\n``;
+    the record's text keeps one newline at the end.
+    """
     task_type = str(df_part["naming_condition"].iloc[0]).strip().lower()
     constants = _experiment_constants(df_part)
     instructions = _build_instructions(constants, task_type)
 
-    lines = [instructions, ""]
-    for idx, row in enumerate(df_part.to_dict("records"), start=1):
-        lines.append(_format_trial(row, idx, constants))
-        lines.append("")
-    return "\n".join(lines).rstrip() + "\n"
+    lines = [
+        _format_trial(row, idx, constants) + "\n\n"
+        for idx, row in enumerate(df_part.to_dict("records"), start=1)
+    ]
+    return pack_prompts(instructions + "\n\n", lines)
 
 
 # ---------- record builder -------------------------------------------------
@@ -313,15 +309,19 @@ def _participant_record(
     experiment_id: str,
     participant_id: str,
     df_part: pd.DataFrame,
+    chunk: PromptChunk,
 ) -> dict[str, Any]:
+    if chunk.n_parts > 1:
+        participant_id += f"_part{chunk.part}"
     record: dict[str, Any] = {
-        "text": _build_text(df_part),
+        "text": chunk.text.rstrip() + "\n",
         "experiment": experiment_id,
         "participant_id": participant_id,
+        **chunk.metadata(),
     }
 
     # rt: list of trial-level RTs (None for missing values), in ms.
-    rt_series = df_part["rt"]
+    rt_series = df_part["rt"].iloc[chunk.start:chunk.stop]
     record["rt"] = [
         None if pd.isna(rt) else int(round(float(rt))) for rt in rt_series
     ]
@@ -342,12 +342,6 @@ def _participant_record(
     return record
 
 
-# ---------- token estimation -----------------------------------------------
-
-def _estimate_tokens(text: str) -> int:
-    return int(len(text) * TOKENS_PER_CHAR)
-
-
 # ---------- main pipeline --------------------------------------------------
 
 def _process_language() -> tuple[int, int]:
@@ -378,27 +372,15 @@ def _process_language() -> tuple[int, int]:
         ):
             experiment_id = str(experiment_id)
             participant_id = str(participant_id)
-            record = _participant_record(experiment_id, participant_id, df_part)
-            tokens = _estimate_tokens(record["text"])
-
-            if tokens > TOKEN_LIMIT:
-                # Split session into equal parts by trial order.
-                # Experiments with very long sessions use 3 parts; others 2.
-                n_parts = 3 if experiment_id in SPLIT_THREE_EXPERIMENTS else 2
-                chunk_size = len(df_part) // n_parts
-                for i in range(n_parts):
-                    start = i * chunk_size
-                    end = start + chunk_size if i < n_parts - 1 else len(df_part)
-                    chunk = df_part.iloc[start:end]
-                    r = _participant_record(
-                        experiment_id, participant_id + f"_part{i + 1}", chunk
-                    )
-                    out.write(json.dumps(r, ensure_ascii=False) + "\n")
-                    n_records += 1
-                n_splits += 1
-            else:
+            chunks = _pack_session(df_part)
+            for chunk in chunks:
+                record = _participant_record(
+                    experiment_id, participant_id, df_part, chunk
+                )
                 out.write(json.dumps(record, ensure_ascii=False) + "\n")
                 n_records += 1
+            if len(chunks) > 1:
+                n_splits += 1
 
     print(f"  → {n_records:,} prompts written to {OUTPUT_PATH.name}", end="")
     if n_splits:
@@ -415,7 +397,7 @@ def main() -> None:
     print(f"\nTotal: {n_records:,} prompts")
     if n_splits:
         print(
-            f"  {n_splits:,} participant(s) were split into 2 records "
+            f"  {n_splits:,} participant(s) were split into several records "
             f"due to the {TOKEN_LIMIT:,}-token limit."
         )
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+PsychLing-101 – Columnar store of the processed data
+====================================================
+
+Converts each study's processed_data/exp*.csv into Parquet (see
+psychling/store.py), with CODEBOOK.csv types and dictionary-encoded
+strings, so generators and analyses can read only the columns and row
+groups they need with load_processed(). Files whose CSV has not changed
+since they were converted are skipped.
+
+Usage:
+    python scripts/build_store.py <folder> [<folder2> ...]
+    python scripts/build_store.py --all                # every dataset folder
+    python scripts/build_store.py --all --workers 4    # convert 4 files at a time
+    python scripts/build_store.py --all --out DIR      # default: build/processed/
+    python scripts/build_store.py <folder> --force     # convert even if current
+
+Exit codes:
+    0  – every processed CSV of the requested studies has a current copy
+    1  – one or more CSVs could not be converted
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from psychling.shards import map_ordered
+from psychling.store import (
+    STORE_DIR,
+    all_studies,
+    convert_csv,
+    csv_path,
+    experiments,
+    has_pyarrow,
+    is_current,
+    store_path,
+)
+
+
+def build_one(study: str, exp: str, out_dir: Path, force: bool) -> tuple[bool, str]:
+    """Convert one CSV unless its copy is current; returns whether that
+    worked and a report. Failures are reported rather than raised, so one
+    bad file does not stop the others."""
+    source, path = csv_path(study, exp), store_path(study, exp, out_dir)
+    try:
+        if not force and path.exists() and is_current(source, path):
+            return True, f"{study}/{exp}: up to date"
+        start = time.perf_counter()
+        stats = convert_csv(source, path)
+    except (OSError, ValueError) as exc:
+        return False, f"{study}/{exp}: ERROR {exc}"
+    lines = [
+        f"{study}/{exp}: {stats['rows']:,} rows in {stats['row_groups']} row group(s), "
+        f"{stats['bytes'] / 1e6:,.1f} MB in {time.perf_counter() - start:.1f}s"
+    ]
+    lines += [f"  WARNING {warning}" for warning in stats["warnings"]]
+    return True, "\n".join(lines)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert PsychLing-101 processed CSVs into a columnar Parquet store.",
+    )
+    parser.add_argument("folders", nargs="*", help="dataset folders to convert")
+    parser.add_argument("--all", action="store_true", help="convert every dataset folder")
+    parser.add_argument(
+        "--out", type=Path, default=STORE_DIR, metavar="DIR",
+        help="root of the store (default: build/processed/)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="convert N files at a time in worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="convert files even if their CSV is unchanged"
+    )
+    args = parser.parse_args(argv)
+    if args.all and args.folders:
+        parser.error("folder names cannot be combined with --all")
+    if not args.all and not args.folders:
+        parser.error("give dataset folders or --all")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    return args
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if not has_pyarrow():
+        print("The columnar store needs pyarrow: pip install pyarrow")
+        sys.exit(1)
+    folder_names = all_studies() if args.all else args.folders
+
+    jobs = [(study, exp, args.out, args.force) for study in folder_names for exp in experiments(study)]
+    failed = {name for name in folder_names if not experiments(name)}
+    for name in sorted(failed):
+        print(f"{name}: ERROR no processed_data/exp*.csv")
+    for job, (ok, report) in zip(jobs, map_ordered(build_one, jobs, args.workers)):
+        print(report)
+        if not ok:
+            failed.add(job[0])
+
+    if failed:
+        print(f"\nCould not convert every file of {len(failed)} folder(s): {', '.join(sorted(failed))}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+PsychLing-101 – Inverted index of the stimuli
+=============================================
+
+Maps every normalised stimulus, target_word and prime of each study's
+processed data to the experiments and row ranges it occurs in, and writes
+a memory-mappable index per study (see psychling/stimuli.py), so a word
+can be looked up across the corpus without reading any CSV. Studies whose
+processed CSVs have not changed since they were indexed are skipped.
+
+Usage:
+    python scripts/index_stimuli.py <folder> [<folder2> ...]
+    python scripts/index_stimuli.py --all                # every dataset folder
+    python scripts/index_stimuli.py --all --workers 4    # index 4 studies at a time
+    python scripts/index_stimuli.py --all --out DIR      # default: build/stimuli/
+    python scripts/index_stimuli.py <folder> --force     # rebuild even if current
+    python scripts/index_stimuli.py --lookup table       # where a word occurs
+
+Exit codes:
+    0  – every requested study has a current index
+    1  – one or more studies could not be indexed
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from psychling.shards import map_ordered
+from psychling.stimuli import INDEX_DIR, StimulusIndex, build_study, is_current
+from psychling.store import STORE_DIR, all_studies
+
+
+def index_one(study: str, out_dir: Path, store_dir: Path, force: bool) -> tuple[bool, str]:
+    """Index one study unless its index is current; returns whether that
+    worked and a report."""
+    try:
+        if not force and is_current(study, out_dir / study):
+            return True, f"{study}: up to date"
+        start = time.perf_counter()
+        meta = build_study(study, out_dir / study, store_dir)
+    except (OSError, ValueError) as exc:
+        return False, f"{study}: ERROR {exc}"
+    report = (
+        f"{study}: {meta['n_terms']:,} terms in {meta['n_postings']:,} row ranges "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    if meta["skipped"]:
+        report += f" (skipped Git LFS pointer(s): {', '.join(meta['skipped'])})"
+    return True, report
+
+
+def print_lookup(out_dir: Path, value: str) -> None:
+    start = time.perf_counter()
+    postings = StimulusIndex(out_dir).lookup(value)
+    elapsed = time.perf_counter() - start
+    for study, exp, column, first, stop in postings:
+        print(f"{study}/{exp}\t{column}\trows {first}-{stop - 1}")
+    print(f"{len(postings):,} row range(s) in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Index the stimuli of PsychLing-101 studies.",
+    )
+    parser.add_argument("folders", nargs="*", help="dataset folders to index")
+    parser.add_argument("--all", action="store_true", help="index every dataset folder")
+    parser.add_argument(
+        "--out", type=Path, default=INDEX_DIR, metavar="DIR",
+        help="where the index is written, one directory per study (default: build/stimuli/)",
+    )
+    parser.add_argument(
+        "--store", type=Path, default=STORE_DIR, metavar="DIR",
+        help="columnar store to read current files from (default: build/processed/)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="index N studies at a time in worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild indexes even if their CSVs are unchanged"
+    )
+    parser.add_argument(
+        "--lookup", metavar="WORD", help="print where WORD occurs in the index instead of building it"
+    )
+    args = parser.parse_args(argv)
+    if args.lookup is not None:
+        if args.all or args.folders:
+            parser.error("--lookup cannot be combined with folders or --all")
+        return args
+    if args.all and args.folders:
+        parser.error("folder names cannot be combined with --all")
+    if not args.all and not args.folders:
+        parser.error("give dataset folders, --all or --lookup")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    return args
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.lookup is not None:
+        print_lookup(args.out, args.lookup)
+        sys.exit(0)
+    folder_names = all_studies() if args.all else args.folders
+
+    jobs = [(study, args.out, args.store, args.force) for study in folder_names]
+    failed = []
+    for study, (ok, report) in zip(folder_names, map_ordered(index_one, jobs, args.workers)):
+        print(report)
+        if not ok:
+            failed.append(study)
+
+    if failed:
+        print(f"\nCould not index {len(failed)} folder(s): {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
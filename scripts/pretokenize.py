@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+PsychLing-101 – Pre-tokenised prompt shards
+===========================================
+
+Tokenises each study's prompts.jsonl.zip once with the vendored cl100k_base
+tokenizer and writes memory-mappable token arrays, response masks and an
+index of prompts by experiment and participant (see psychling/pretokenized.py),
+so training and evaluation runs can skip JSON parsing and tokenisation.
+Studies whose archive has not changed since their shard was built are
+skipped.
+
+Usage:
+    python scripts/pretokenize.py <folder> [<folder2> ...]
+    python scripts/pretokenize.py --all                # every dataset folder
+    python scripts/pretokenize.py --all --workers 4    # tokenise in 4 processes
+    python scripts/pretokenize.py --all --out DIR      # default: build/tokens/
+    python scripts/pretokenize.py <folder> --force     # rebuild even if current
+
+Exit codes:
+    0  – every requested study has a current shard
+    1  – one or more archives could not be read
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+from psychling.pretokenized import build_study, is_current
+from psychling.shards import resolve_workers
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT_DIR = REPO_ROOT / "build" / "tokens"
+PROMPTS_NAME = "prompts.jsonl.zip"
+
+
+def detect_all_folders() -> list[str]:
+    """Dataset folders in the repo root that have a prompts archive."""
+    return [
+        item.name for item in sorted(REPO_ROOT.iterdir())
+        if item.is_dir() and not item.name.startswith(".") and (item / PROMPTS_NAME).exists()
+    ]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Tokenise PsychLing-101 prompts into memory-mappable shards.",
+    )
+    parser.add_argument("folders", nargs="*", help="dataset folders to tokenise")
+    parser.add_argument("--all", action="store_true", help="tokenise every dataset folder")
+    parser.add_argument(
+        "--out", type=Path, default=DEFAULT_OUT_DIR, metavar="DIR",
+        help="where the shards are written, one directory per study (default: build/tokens/)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="tokenise in N worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild shards even if their archive is unchanged"
+    )
+    args = parser.parse_args(argv)
+    if args.all and args.folders:
+        parser.error("folder names cannot be combined with --all")
+    if not args.all and not args.folders:
+        parser.error("give dataset folders or --all")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    return args
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    folder_names = detect_all_folders() if args.all else args.folders
+    workers = resolve_workers(args.workers)
+
+    failed = []
+    for name in folder_names:
+        zip_path = REPO_ROOT / name / PROMPTS_NAME
+        out_dir = args.out / name
+        try:
+            if not args.force and is_current(zip_path, out_dir):
+                print(f"{name}: up to date")
+                continue
+            start = time.perf_counter()
+            meta = build_study(zip_path, out_dir, workers)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as exc:
+            # Archives not fetched from LFS are pointer files, not zips
+            print(f"{name}: ERROR {exc}")
+            failed.append(name)
+            continue
+        print(
+            f"{name}: {meta['n_records']:,} prompts, {meta['n_tokens']:,} tokens "
+            f"({meta['n_response_tokens']:,} in responses) in {time.perf_counter() - start:.1f}s"
+        )
+
+    if failed:
+        print(f"\nCould not tokenise {len(failed)} folder(s): {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+Shared helpers for PsychLing-101 prompt generation and validation.
+
+The package lives next to validate_submission.py and, like it, only needs
+the standard library; ``render``, ``templates``, ``groups``, ``shards``,
+``incremental``, ``pretokenized``, ``store``, ``query`` and ``stimuli``
+additionally need pandas and numpy, and ``keys`` and ``feedback`` numpy,
+which the generators already use (``store`` and ``query`` read Parquet
+files with pyarrow when it is installed). ``seekable`` reads single
+participants from prompts.jsonl.zip. A dataset's generate_prompts.py can
+import it with:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+    from psychling.tokens import count_tokens
+"""
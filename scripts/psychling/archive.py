@@ -0,0 +1,417 @@
+"""
+Streaming writer for ``prompts.jsonl.zip``.
+
+Records are serialised as they are produced and deflated straight into the
+``prompts.jsonl`` entry of the archive, so a generator never holds the whole
+corpus in memory and never writes an uncompressed ``prompts.jsonl`` first.
+
+The entry is compressed in fixed-size blocks, each primed with the last
+32 KiB of the block before it (the scheme pigz uses). Blocks can therefore
+be deflated on several threads, and the archive comes out byte-for-byte
+the same whatever the number of threads.
+
+Records can also be deflated elsewhere (e.g. in another process) with
+:func:`deflate_segment` and spliced into the entry with
+:meth:`PromptArchiveWriter.write_segment`, without being decompressed
+again.
+
+With ``seekable=True`` blocks are not primed, and the writer records where
+each block and each participant's records start, for random access with
+``seekable.PromptReader`` (see psychling/seekable.py).
+
+Usage:
+    from psychling.archive import PromptArchiveWriter
+
+    with PromptArchiveWriter(base_dir / "prompts.jsonl.zip") as writer:
+        for record in build_prompts(df):
+            writer.write(record)
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+
+from psychling.seekable import OFFSETS_NAME, add_span, line_key, record_key, write_offsets
+
+ARCNAME = "prompts.jsonl"
+
+# Uncompressed bytes per deflate block
+BLOCK_SIZE = 1 << 20
+# Deflate window; each block is primed with this much of the previous one
+WINDOW_SIZE = 1 << 15
+COMPRESS_LEVEL = zlib.Z_DEFAULT_COMPRESSION
+
+# Sizes and offsets from which ZIP64 records are needed, and the value that
+# then stands in for them in the 32-bit fields
+_ZIP64_LIMIT = (1 << 32) - 1
+_ZIP64_MARKER = 0xFFFFFFFF
+# DOS time and date of 1980-01-01 00:00, the zipfile.ZipInfo default
+_DOS_EPOCH = (0, (1 << 5) | 1)
+_EXTERNAL_ATTR = 0o644 << 16
+_MADE_BY_UNIX = 3 << 8
+
+
+def json_encoder(ensure_ascii: bool = False, allow_nan: bool = True, fast_json: bool = False):
+    """Function turning a record into one UTF-8 JSON line, as configured for
+    :class:`PromptArchiveWriter`."""
+    if fast_json and not ensure_ascii and allow_nan:
+        try:
+            import orjson
+        except ImportError:
+            pass
+        else:
+            option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+            return lambda record: orjson.dumps(record, option=option)
+    encode = json.JSONEncoder(ensure_ascii=ensure_ascii, allow_nan=allow_nan).encode
+    return lambda record: (encode(record) + "\n").encode("utf-8")
+
+
+def _next_window(window: bytes, data: bytes) -> bytes:
+    """The last WINDOW_SIZE bytes of the stream once *data* follows *window*."""
+    if len(data) >= WINDOW_SIZE:
+        return data[-WINDOW_SIZE:]
+    return (window + data)[-WINDOW_SIZE:]
+
+
+def _deflate_block(data: bytes, zdict: bytes, last: bool, level: int) -> bytes:
+    """Raw deflate of one block; non-final blocks end on a byte boundary so
+    the blocks concatenate into a single valid stream."""
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _gf2_times(matrix: list[int], vector: int) -> int:
+    total = 0
+    i = 0
+    while vector:
+        if vector & 1:
+            total ^= matrix[i]
+        vector >>= 1
+        i += 1
+    return total
+
+
+def _gf2_square(matrix: list[int]) -> list[int]:
+    return [_gf2_times(matrix, row) for row in matrix]
+
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """CRC-32 of ``a + b`` from ``crc32(a)``, ``crc32(b)`` and ``len(b)``
+    (zlib's ``crc32_combine``, which the zlib module does not expose)."""
+    if len2 <= 0:
+        return crc1
+    # Operator for one zero bit, then squared to two and four zero bits
+    odd = [0xEDB88320] + [1 << n for n in range(31)]
+    even = _gf2_square(odd)
+    odd = _gf2_square(even)
+    # Apply len2 zero bytes to crc1, one bit of len2 at a time
+    while True:
+        even = _gf2_square(odd)
+        if len2 & 1:
+            crc1 = _gf2_times(even, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+        odd = _gf2_square(even)
+        if len2 & 1:
+            crc1 = _gf2_times(odd, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+    return crc1 ^ crc2
+
+
+class DeflateSegment:
+    """Deflated JSON lines that can be spliced into a prompt archive.
+
+    ``data`` is a run of non-final raw deflate blocks; ``crc`` and ``size``
+    describe the uncompressed lines and ``tail`` holds their last
+    WINDOW_SIZE bytes, which prime the block that follows.
+
+    A seekable segment also has ``restarts``, the ``(offset in data, offset
+    in the lines)`` of its unprimed blocks, and ``spans``, its participants'
+    byte ranges in the lines (see ``seekable.add_span``); both are None
+    otherwise.
+    """
+
+    def __init__(
+        self, data: bytes, crc: int, size: int, n_records: int, tail: bytes,
+        restarts: list | None = None, spans: list | None = None,
+    ):
+        self.data = data
+        self.crc = crc
+        self.size = size
+        self.n_records = n_records
+        self.tail = tail
+        self.restarts = restarts
+        self.spans = spans
+
+
+def deflate_segment(
+    lines, level: int = COMPRESS_LEVEL, block_size: int = BLOCK_SIZE, seekable: bool = False,
+) -> DeflateSegment:
+    """Deflate encoded JSON *lines* the way :class:`PromptArchiveWriter`
+    would after a fresh start: blocks of *block_size* bytes, each primed
+    with the end of the one before unless *seekable*."""
+    blocks: list[bytes] = []
+    buffer: list[bytes] = []
+    buffered = 0
+    crc = size = n_records = compressed = 0
+    window = b""
+    restarts: list[tuple[int, int]] = []
+    spans: list[list] = []
+
+    def flush():
+        nonlocal buffered, crc, size, window, compressed
+        data = b"".join(buffer)
+        buffer.clear()
+        buffered = 0
+        if seekable:
+            restarts.append((compressed, size))
+        crc = zlib.crc32(data, crc)
+        size += len(data)
+        blocks.append(_deflate_block(data, b"" if seekable else window, False, level))
+        compressed += len(blocks[-1])
+        window = _next_window(window, data)
+
+    for line in lines:
+        if seekable:
+            add_span(spans, line_key(line), size + buffered, len(line))
+        buffer.append(line)
+        buffered += len(line)
+        n_records += 1
+        if buffered >= block_size:
+            flush()
+    if buffer:
+        flush()
+    if not seekable:
+        return DeflateSegment(b"".join(blocks), crc, size, n_records, window)
+    return DeflateSegment(b"".join(blocks), crc, size, n_records, window, restarts, spans)
+
+
+class PromptArchiveWriter:
+    """Write JSON records, one per line, into a single-entry ZIP archive.
+
+    ``ensure_ascii`` and ``allow_nan`` mean what they mean for
+    ``json.dumps``, and by default the lines are exactly what
+    ``json.dumps(record, ensure_ascii=...)`` would give. With
+    ``fast_json=True`` records are encoded with orjson when it is
+    installed: several times faster and accepting numpy scalars, but
+    compact (no spaces after separators) and with NaN written as null, so
+    it is only used when ``ensure_ascii`` is false and ``allow_nan`` true.
+
+    ``workers`` threads deflate blocks in parallel (zlib releases the GIL);
+    at most ``2 * workers`` blocks are in flight at any time.
+
+    With ``seekable=True`` every block is deflated on its own, and on close
+    ``prompts.offsets.json`` is written next to the archive, locating each
+    block and each participant's records (see psychling/seekable.py).
+    Segments must then be deflated with ``seekable=True`` as well. Without
+    it, a sidecar left by an earlier seekable run is removed.
+
+    The archive is written to ``<path>.part`` and moved into place on a
+    clean close, so an interrupted run leaves any previous archive intact.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        arcname: str = ARCNAME,
+        *,
+        ensure_ascii: bool = False,
+        allow_nan: bool = True,
+        fast_json: bool = False,
+        workers: int = 1,
+        level: int = COMPRESS_LEVEL,
+        block_size: int = BLOCK_SIZE,
+        seekable: bool = False,
+    ):
+        self.path = Path(path)
+        self.arcname = arcname.encode("ascii")
+        self.json_options = {"ensure_ascii": ensure_ascii, "allow_nan": allow_nan, "fast_json": fast_json}
+        self.level = level
+        self.block_size = block_size
+        self.seekable = seekable
+        self.n_records = 0
+        self.n_bytes = 0
+        self._encode = json_encoder(**self.json_options)
+
+        self._tmp_path = self.path.with_name(self.path.name + ".part")
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(self._local_header(0, 0, 0))
+        self._data_offset = self._file.tell()
+        self._compressed = 0
+        self._crc = 0
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self._window = b""
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self._max_pending = 2 * workers
+        self._pending: collections.deque = collections.deque()
+        self._closed = False
+        # Offsets of unprimed blocks in the file and the JSONL, and the
+        # participants' byte ranges in the JSONL
+        self._restarts: list[tuple[int, int]] = []
+        self._spans: list[list] = []
+
+    def write(self, record) -> None:
+        """Append one record as a JSON line."""
+        line = self._encode(record)
+        if self.seekable:
+            add_span(self._spans, record_key(record), self.n_bytes + self._buffered, len(line))
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self.n_records += 1
+        if self._buffered >= self.block_size:
+            self._submit(last=False)
+
+    def write_all(self, records) -> None:
+        for record in records:
+            self.write(record)
+
+    def write_segment(self, segment: DeflateSegment) -> int:
+        """Append records already deflated with :func:`deflate_segment`.
+
+        Returns the offset in the archive file at which ``segment.data``
+        was written.
+        """
+        if self.seekable and segment.restarts is None:
+            raise ValueError("a seekable archive needs segments deflated with seekable=True")
+        if self._buffer:
+            self._submit(last=False)
+        while self._pending:
+            self._write_block(*self._pending.popleft())
+        offset = self._data_offset + self._compressed
+        if self.seekable:
+            self._restarts += [(offset + block, self.n_bytes + start) for block, start in segment.restarts]
+            for experiment, participant, start, length, n_records in segment.spans:
+                add_span(self._spans, (experiment, participant), self.n_bytes + start, length)
+                self._spans[-1][4] += n_records - 1
+        self._write_block(segment.data)
+        self._crc = crc32_combine(self._crc, segment.crc, segment.size)
+        self.n_bytes += segment.size
+        self.n_records += segment.n_records
+        self._window = _next_window(self._window, segment.tail)
+        return offset
+
+    def close(self) -> None:
+        """Finish the archive and move it into place."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._submit(last=True)
+            while self._pending:
+                self._write_block(*self._pending.popleft())
+            self._finish()
+        finally:
+            self._shutdown()
+        os.replace(self._tmp_path, self.path)
+        if self.seekable:
+            write_offsets(self.path, self.arcname.decode("ascii"), self._restarts, self._spans)
+        else:
+            self.path.with_name(OFFSETS_NAME).unlink(missing_ok=True)
+
+    def abort(self) -> None:
+        """Drop the partial archive, leaving any previous one in place."""
+        if self._closed:
+            return
+        self._closed = True
+        self._shutdown()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # -- compression -------------------------------------------------------
+
+    def _submit(self, last: bool) -> None:
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self._crc = zlib.crc32(data, self._crc)
+        self.n_bytes += len(data)
+
+        zdict = b"" if self.seekable else self._window
+        self._window = _next_window(self._window, data)
+        # The JSONL offset the block starts at, for the sidecar
+        start = self.n_bytes - len(data) if self.seekable and data else None
+        if self._pool is None:
+            self._write_block(_deflate_block(data, zdict, last, self.level), start)
+            return
+        self._pending.append((self._pool.submit(_deflate_block, data, zdict, last, self.level), start))
+        while len(self._pending) > self._max_pending:
+            self._write_block(*self._pending.popleft())
+
+    def _write_block(self, block, start: int | None = None) -> None:
+        if isinstance(block, concurrent.futures.Future):
+            block = block.result()
+        if start is not None:
+            self._restarts.append((self._data_offset + self._compressed, start))
+        self._file.write(block)
+        self._compressed += len(block)
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            for future, _ in self._pending:
+                future.cancel()
+            self._pool.shutdown(wait=True)
+        self._pending.clear()
+        self._file.close()
+
+    # -- ZIP container -----------------------------------------------------
+    # One deflated entry, written like zipfile does for a seekable file with
+    # force_zip64: the local header is rewritten once sizes and CRC are known.
+
+    def _local_header(self, crc: int, compressed: int, size: int) -> bytes:
+        extra = struct.pack("<HHQQ", 0x0001, 16, size, compressed)
+        return struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 45, 0, zlib.DEFLATED, *_DOS_EPOCH,
+            crc, _ZIP64_MARKER, _ZIP64_MARKER, len(self.arcname), len(extra),
+        ) + self.arcname + extra
+
+    def _finish(self) -> None:
+        f = self._file
+        size, compressed, crc = self.n_bytes, self._compressed, self._crc
+        directory_offset = f.tell()
+
+        zip64 = size >= _ZIP64_LIMIT or compressed >= _ZIP64_LIMIT
+        extra = struct.pack("<HHQQ", 0x0001, 16, size, compressed) if zip64 else b""
+        version = 45 if zip64 else 20
+        f.write(struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50, _MADE_BY_UNIX | version, version, 0, zlib.DEFLATED,
+            *_DOS_EPOCH, crc,
+            _ZIP64_MARKER if zip64 else compressed, _ZIP64_MARKER if zip64 else size,
+            len(self.arcname), len(extra), 0, 0, 0, _EXTERNAL_ATTR, 0,
+        ) + self.arcname + extra)
+        directory_size = f.tell() - directory_offset
+
+        if directory_offset >= _ZIP64_LIMIT:
+            zip64_end = f.tell()
+            f.write(struct.pack(
+                "<IQHHIIQQQQ", 0x06064B50, 44, _MADE_BY_UNIX | 45, 45, 0, 0, 1, 1,
+                directory_size, directory_offset,
+            ))
+            f.write(struct.pack("<IIQI", 0x07064B50, 0, zip64_end, 1))
+        f.write(struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, 1, 1, directory_size,
+            _ZIP64_MARKER if directory_offset >= _ZIP64_LIMIT else directory_offset, 0,
+        ))
+
+        f.seek(0)
+        f.write(self._local_header(crc, compressed, size))
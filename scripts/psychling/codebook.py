@@ -0,0 +1,219 @@
+"""
+Column semantics declared in the repository-level CODEBOOK.csv.
+
+Columns may declare a ``Type`` (``string``, ``integer``, ``number`` or
+``boolean``) next to their description; the validator checks processed
+data against it, and the columnar store (``psychling.store``) stores the
+column with that type in every study.
+
+:func:`compact_dtypes` maps CODEBOOK columns to the smallest pandas dtypes
+that hold them, for readers to apply while parsing (``store.read_processed``):
+nullable ``Int32`` for integers (``Int8`` for 0/1 columns such as
+accuracy), ``float32`` for numbers, nullable ``boolean`` for booleans, and
+categoricals for the columns in :data:`CATEGORICAL_COLUMNS`, whose values
+repeat across rows. float32 keeps about 7 significant digits, plenty for
+RTs and ratings; a generator that writes raw values into prompts should
+read such columns as float.
+
+:func:`column_rules` parses the ``Type``, ``Range`` and ``Allowed Values``
+of each column into a :class:`ColumnRule`, which the validator checks cell
+values against. This module uses only the standard library, like the
+validator.
+
+Usage:
+    from psychling.codebook import column_rules, column_types, compact_dtypes
+
+    column_types()["rt"]  # "number"
+    compact_dtypes()["accuracy"]  # "Int8"
+    column_rules()["accuracy"].check("2")  # "allowed"
+"""
+
+from __future__ import annotations
+
+import csv
+import functools
+from pathlib import Path
+
+CODEBOOK_PATH = Path(__file__).resolve().parents[2] / "CODEBOOK.csv"
+
+TYPES = ("string", "integer", "number", "boolean")
+
+# Optional CODEBOOK columns describing the values a column may hold
+SCHEMA_COLUMNS = ("Type", "Range", "Allowed Values")
+
+# Spellings of booleans the validator accepts, by value
+TRUE_VALUES = ("1", "1.0", "true")
+FALSE_VALUES = ("0", "0.0", "false")
+BOOLEAN_VALUES = frozenset(TRUE_VALUES + FALSE_VALUES)
+
+# Participants, their background, and the labels, stimuli and responses of
+# trials: few distinct values, each repeated over many rows
+CATEGORICAL_COLUMNS = frozenset({
+    "participant_id", "gender", "education", "clinical_diagnoses", "first_language", "other_languages",
+    "nationality", "country_of_birth", "country_of_residence", "handedness",
+    "list", "phase_id", "session_id", "condition", "stimulus_type", "part_of_speech",
+    "stimulus", "stimulus_translation", "target_word", "constituent_1", "constituent_2",
+    "image_filename", "object", "response", "response_corrected",
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _columns(path: Path) -> dict[str, dict[str, str]]:
+    """The CODEBOOK's rows by column name, with their fields stripped."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        name_field = reader.fieldnames[0] if reader.fieldnames else None
+        columns = {}
+        for row in reader:
+            name = (row.get(name_field) or "").strip()
+            if name:
+                columns[name] = {key: (value or "").strip() for key, value in row.items() if key}
+    return columns
+
+
+def column_types(path: Path = CODEBOOK_PATH) -> dict[str, str]:
+    """The declared ``Type`` of every CODEBOOK column that has one.
+
+    Unknown types are ignored, as the validator ignores them (with a
+    warning of its own).
+    """
+    return {
+        name: row["Type"] for name, row in _columns(path).items() if row.get("Type") in TYPES
+    }
+
+
+def allowed_values(path: Path = CODEBOOK_PATH) -> dict[str, list[str]]:
+    """The ``Allowed Values`` of every CODEBOOK column that lists them."""
+    return {
+        name: [value.strip() for value in row["Allowed Values"].split("|")]
+        for name, row in _columns(path).items() if row.get("Allowed Values")
+    }
+
+
+def compact_dtypes(path: Path = CODEBOOK_PATH) -> dict[str, str]:
+    """The compact pandas dtype of every CODEBOOK column that has one."""
+    dtypes = dict.fromkeys(sorted(CATEGORICAL_COLUMNS), "category")
+    allowed = allowed_values(path)
+    for name, type_ in column_types(path).items():
+        if type_ == "integer":
+            binary = name in allowed and set(allowed[name]) <= {"0", "1"}
+            dtypes[name] = "Int8" if binary else "Int32"
+        elif type_ == "number":
+            dtypes[name] = "float32"
+        elif type_ == "boolean":
+            dtypes[name] = "boolean"
+    return dtypes
+
+
+class ColumnRule:
+    """The values one column may hold, from the CODEBOOK's schema columns.
+
+    *type_* is ``string``, ``integer``, ``number`` or ``boolean``; *minimum*
+    and *maximum* bound numeric values; *allowed* lists the only values
+    permitted (compared numerically for numeric types). :meth:`check`
+    classifies a cell as valid (None) or as a ``"type"``, ``"range"`` or
+    ``"allowed"`` violation.
+    """
+
+    def __init__(
+        self,
+        column: str,
+        type_: str = "string",
+        minimum: float | None = None,
+        maximum: float | None = None,
+        allowed: list[str] | None = None,
+    ):
+        if type_ not in TYPES:
+            raise ValueError(f"unknown type {type_!r} (expected one of {', '.join(TYPES)})")
+        self.column = column
+        self.type = type_
+        self.minimum = minimum
+        self.maximum = maximum
+        self.allowed = allowed
+        self.numeric = type_ in ("integer", "number")
+        self._allowed_set: set | None = None
+        if allowed is not None:
+            self._allowed_set = {float(v) for v in allowed} if self.numeric else set(allowed)
+
+    @classmethod
+    def parse(cls, column: str, type_: str, range_: str, allowed: str) -> ColumnRule | None:
+        """Build a rule from the raw CODEBOOK fields; None if all are empty.
+
+        *range_* is ``min..max`` with either bound optional (``0..``, ``1..8``);
+        *allowed* is a ``|``-separated list of values. Raises ValueError
+        for malformed fields.
+        """
+        type_, range_, allowed = type_.strip(), range_.strip(), allowed.strip()
+        if not (type_ or range_ or allowed):
+            return None
+        minimum = maximum = None
+        if range_:
+            low, sep, high = range_.partition("..")
+            if not sep:
+                raise ValueError(f"range {range_!r} is not of the form min..max")
+            minimum = float(low) if low.strip() else None
+            maximum = float(high) if high.strip() else None
+        values = [v.strip() for v in allowed.split("|")] if allowed else None
+        return cls(column, type_ or "string", minimum, maximum, values)
+
+    def check(self, cell: str) -> str | None:
+        value = cell.strip()
+        if self.type == "boolean":
+            return None if value.lower() in BOOLEAN_VALUES else "type"
+        if not self.numeric:
+            if self._allowed_set is not None and value not in self._allowed_set:
+                return "allowed"
+            return None
+
+        try:
+            number = float(value)
+        except ValueError:
+            return "allowed" if self._allowed_set is not None else "type"
+        if self.type == "integer" and not number.is_integer():
+            return "type"
+        if self._allowed_set is not None and number not in self._allowed_set:
+            return "allowed"
+        if (self.minimum is not None and number < self.minimum) or (
+            self.maximum is not None and number > self.maximum
+        ):
+            return "range"
+        return None
+
+    def describe(self, kind: str) -> str:
+        """What the column should hold, phrased for violations of *kind*."""
+        if kind == "type":
+            return {"boolean": "booleans (0/1/true/false)"}.get(self.type, f"{self.type}s")
+        if kind == "allowed":
+            return f"only {'|'.join(self.allowed or [])}"
+        low = "" if self.minimum is None else f"{self.minimum:g}"
+        high = "" if self.maximum is None else f"{self.maximum:g}"
+        return f"values within {low}..{high}"
+
+
+@functools.lru_cache(maxsize=None)
+def _rules(path: Path) -> tuple[dict[str, ColumnRule], dict[str, str]]:
+    """The CODEBOOK's value rules, and the error of every malformed one."""
+    rules, errors = {}, {}
+    for name, row in _columns(path).items():
+        fields = [row.get(field, "") for field in SCHEMA_COLUMNS]
+        try:
+            rule = ColumnRule.parse(name, *fields)
+        except ValueError as e:
+            errors[name] = str(e)
+            continue
+        if rule is not None:
+            rules[name] = rule
+    return rules, errors
+
+
+def column_rules(path: Path = CODEBOOK_PATH) -> dict[str, ColumnRule]:
+    """The value rule of every CODEBOOK column that declares one.
+
+    Malformed rules are left out; :func:`rule_errors` says why.
+    """
+    return dict(_rules(path)[0])
+
+
+def rule_errors(path: Path = CODEBOOK_PATH) -> dict[str, str]:
+    """Why each malformed CODEBOOK rule was left out of :func:`column_rules`."""
+    return dict(_rules(path)[1])
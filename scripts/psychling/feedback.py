@@ -0,0 +1,77 @@
+"""
+Breaks with performance feedback in long sessions.
+
+Megastudies such as balota2007_LDT paused every N trials and told the
+participant their accuracy and mean RT over the trials since the last
+break. Building a Series per break inside the trial loop is slow. Instead,
+the break rows of a whole (sorted) frame are found at once, and the block
+statistics for all breaks are computed in one pass over the trial arrays.
+The feedback texts can then be rendered column-wise like trial lines, with
+``render.choose`` for rules such as "longer break every third time" or
+"below 80 % accuracy".
+
+Like ``render``, this module needs numpy.
+
+Usage:
+    from psychling.feedback import block_means, periodic_breaks
+
+    rests = np.flatnonzero(periodic_breaks(trial_num, 250, n_trials))
+    accuracy = block_means(df["accuracy"].to_numpy(), rests, 250)
+    lines[rests] += render_lines(
+        "\\nBreak. Your accuracy was {accuracy} %. {advice}\\n",
+        accuracy=(accuracy * 100).astype(int),
+        advice=choose(accuracy < .8, "Please be more accurate.", "Well done."),
+    )
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def periodic_breaks(trial_num, every: int, n_trials=None) -> np.ndarray:
+    """True for the trials after which a break falls: every *every*-th
+    trial by its 1-based *trial_num*, but not a session's last trial
+    (*n_trials*, given per row)."""
+    trial_num = np.asarray(trial_num)
+    breaks = trial_num % every == 0
+    if n_trials is not None:
+        breaks &= trial_num != np.asarray(n_trials)
+    return breaks
+
+
+def running_count(mask, bounds: np.ndarray) -> np.ndarray:
+    """How many rows of *mask* are true up to and including each row,
+    counted afresh in every group of *bounds* (e.g. the number of the
+    break within its session)."""
+    counts = np.cumsum(np.asarray(mask, dtype=bool), dtype=np.int64)
+    before = np.append(0, counts)[bounds[:-1]]
+    return counts - np.repeat(before, np.diff(bounds))
+
+
+def block_means(values, rows, window: int, floors=None) -> np.ndarray:
+    """Mean of *values* over the block ending with each of *rows*.
+
+    A block holds up to *window* rows, up to and including the row, and
+    does not reach back before ``floors[row]`` (e.g. the first row of the
+    row's batch). Missing values are skipped, and each mean equals
+    ``pd.Series(block).mean()`` to the last bit. Blocks of the same length
+    are summed together as rows of one array.
+    """
+    values = np.asarray(values)
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = rows + 1 - window
+    if floors is not None:
+        starts = np.maximum(starts, np.asarray(floors)[rows])
+    starts = np.maximum(starts, 0)
+
+    present = ~np.isnan(values) if values.dtype.kind == "f" else np.ones(len(values), dtype=bool)
+    filled = np.where(present, values, 0)
+    lengths = rows + 1 - starts
+    means = np.empty(len(rows), dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for length in np.unique(lengths).tolist():
+            which = np.flatnonzero(lengths == length)
+            block = starts[which, None] + np.arange(length)
+            means[which] = filled[block].sum(axis=1) / present[block].sum(axis=1)
+    return means
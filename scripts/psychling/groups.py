@@ -0,0 +1,83 @@
+"""
+Positional access to participants and their trials.
+
+Generators that loop over participants with ``df[df["participant_id"] == p]``
+and then over trial numbers with ``.loc[df_p["trial_id"] == t]`` scan the
+whole table once per participant and each participant's rows once per trial,
+which grows quadratically with the number of participants. :class:`TrialGroups`
+sorts the frame once (stably, by group and trial), keeps the group offsets,
+and finds trials within a group by binary search.
+
+Like ``render``, this module needs pandas and numpy.
+
+Usage:
+    from psychling.groups import TrialGroups
+
+    groups = TrialGroups(df, ["participant_id"], "trial_id")
+    for df_participant in groups:
+        for trial in groups.trials(df_participant, range(n_trials)).itertuples():
+            ...
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from psychling.render import group_bounds, sort_groups
+
+_GROUP = "__group__"
+
+
+class TrialGroups:
+    """The *by* groups of *df*, each with its rows sorted by *trial*.
+
+    Groups come in sorted order, or with ``sort=False`` in the order they
+    first appear in *df* (the order of ``df[column].unique()``). Rows with
+    the same trial keep their order in *df*. Iterating yields every group's
+    rows as a frame.
+    """
+
+    def __init__(self, df: pd.DataFrame, by: list[str], trial: str, sort: bool = True):
+        by = list(by)
+        if sort:
+            self.df = sort_groups(df, by, [trial])
+        else:
+            codes = df.groupby(by, sort=False).ngroup()
+            self.df = sort_groups(df.assign(**{_GROUP: codes}), [_GROUP], [trial]).drop(columns=_GROUP)
+        self.by = by
+        self.trial = trial
+        self.bounds = group_bounds(self.df, by)
+        self._trials = self.df[trial].to_numpy()
+
+    def __len__(self) -> int:
+        return len(self.bounds) - 1
+
+    def __iter__(self):
+        for g in range(len(self)):
+            yield self.group(g)
+
+    def group(self, g: int) -> pd.DataFrame:
+        """Rows of the *g*-th group."""
+        return self.df.iloc[self.bounds[g]:self.bounds[g + 1]]
+
+    def trials(self, group: int | pd.DataFrame, trials=None) -> pd.DataFrame:
+        """The first row of each trial of *group*, in trial order.
+
+        *group* is a group's index or the frame iteration yielded for it
+        (changes made to that frame are kept). With *trials*, only those
+        trials, in the order given; trials the group does not have are
+        skipped, as an empty ``.loc`` match would be.
+        """
+        frame = self.group(group) if isinstance(group, (int, np.integer)) else group
+        # Frames from iteration keep their positions in self.df as the index
+        start = int(frame.index[0]) if len(frame) else 0
+        values = self._trials[start:start + len(frame)]
+        if trials is None:
+            positions = np.flatnonzero(np.append(True, values[1:] != values[:-1])) if len(values) else []
+            return frame.iloc[positions]
+        wanted = np.asarray(list(trials))
+        positions = np.searchsorted(values, wanted, side="left")
+        found = positions < len(values)
+        found[found] = values[positions[found]] == wanted[found]
+        return frame.iloc[positions[found]]
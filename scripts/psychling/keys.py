@@ -0,0 +1,83 @@
+"""
+Reproducible per-participant randomisation of response keys.
+
+A participant's draws depend only on ``(experiment, participant_id)``, never
+on the participants processed before them, so prompts come out the same
+whatever order (or process) participants are generated in. The seed is the
+first 8 bytes of ``sha256("<experiment>:<participant_id>")``, the scheme
+vergallito2020_ipsn introduced.
+
+Key labels for many participants are drawn at once: every candidate label
+gets a counter-based pseudo-random number (splitmix64 of seed + counter),
+and the *n* labels with the smallest numbers are a participant's keys.
+Like ``render``, this module needs numpy.
+
+Usage:
+    from psychling.keys import assign_keys
+
+    keys = assign_keys("balota2007_LDT_exp1", participant_ids, n=2)
+    word_key, nonword_key = keys[:, 0], keys[:, 1]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import string
+
+import numpy as np
+
+# splitmix64 constants: the counter increment (2**64 / golden ratio) and the
+# two multipliers of the output mix
+_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def participant_seed(experiment: str, participant_id) -> int:
+    """64-bit seed of one participant of *experiment*."""
+    digest = hashlib.sha256(f"{experiment}:{participant_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], byteorder="big", signed=False)
+
+
+def participant_rng(experiment: str, participant_id) -> random.Random:
+    """A ``random.Random`` of its own for one participant, e.g. to shuffle
+    their trials or options."""
+    return random.Random(participant_seed(experiment, participant_id))
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def assign_keys(
+    experiment: str,
+    participant_ids,
+    n: int = 2,
+    alphabet=string.ascii_uppercase,
+) -> np.ndarray:
+    """*n* distinct labels from *alphabet* for each of *participant_ids*.
+
+    Returns an object array of shape ``(len(participant_ids), n)``. Ids may
+    repeat (e.g. a participant column with one entry per trial); each
+    distinct id is hashed once and gets the same row every time.
+    """
+    labels = np.array(list(alphabet), dtype=object)
+    if not 0 < n <= len(labels):
+        raise ValueError(f"Cannot draw {n} distinct keys from {len(labels)} labels")
+
+    codes: dict = {}
+    rows = np.fromiter((codes.setdefault(pid, len(codes)) for pid in participant_ids), dtype=np.intp)
+    seeds = np.array([participant_seed(experiment, pid) for pid in codes], dtype=np.uint64)
+
+    counters = np.arange(1, len(labels) + 1, dtype=np.uint64) * _GAMMA
+    draws = _splitmix64(seeds[:, None] + counters[None, :])
+    order = np.argsort(draws, axis=1, kind="stable")[:, :n]
+    return labels[order][rows]
+
+
+def participant_keys(experiment: str, participant_id, n: int = 2, alphabet=string.ascii_uppercase) -> list[str]:
+    """The :func:`assign_keys` labels of a single participant."""
+    return assign_keys(experiment, [participant_id], n, alphabet)[0].tolist()
@@ -0,0 +1,106 @@
+"""
+Split a participant's session into as few prompts as fit the token budget.
+
+Every prompt repeats the instruction header, followed by as many
+consecutive trial lines as fit within :data:`psychling.tokens.TOKEN_LIMIT`.
+A session that fits is counted once, as a whole. Otherwise each line is
+tokenised once and the size of a candidate prompt is the header's count
+plus its lines' counts; cl100k_base pre-tokenisation splits at line
+breaks, so for lines ending in a newline that sum is the real count (or
+slightly above it, where a newline meets leading whitespace). Each finished
+prompt is still counted once in full, and shortened if it came out over
+budget.
+
+Usage:
+    from psychling.packing import pack_prompts
+
+    for chunk in pack_prompts(INSTRUCTIONS, lines):
+        record = {"text": chunk.text, "participant_id": pid, **chunk.metadata()}
+"""
+
+from __future__ import annotations
+
+from psychling.tokens import TOKEN_LIMIT, count_tokens
+
+
+class PromptChunk:
+    """One prompt cut from a session: ``lines[start:stop]`` after the header."""
+
+    def __init__(
+        self, text: str, part: int, start: int, stop: int, n_tokens: int,
+        budget: int = TOKEN_LIMIT, n_parts: int = 0,
+    ):
+        self.text = text
+        self.part = part
+        self.n_parts = n_parts
+        self.start = start
+        self.stop = stop
+        self.n_tokens = n_tokens
+        self.budget = budget
+
+    @property
+    def over_budget(self) -> bool:
+        """True for a single line that does not fit the budget on its own."""
+        return self.n_tokens > self.budget
+
+    def metadata(self, trial_ids=None) -> dict:
+        """Fields recording where the chunk sits in the session.
+
+        ``trial_start``/``trial_end`` are the 1-based positions of the first
+        and last trial, or their entries in *trial_ids* if given.
+        """
+        if trial_ids is None:
+            first, last = self.start + 1, self.stop
+        else:
+            first, last = trial_ids[self.start], trial_ids[self.stop - 1]
+        return {"part": self.part, "n_parts": self.n_parts, "trial_start": first, "trial_end": last}
+
+
+def pack_prompts(
+    header: str,
+    lines: list[str],
+    budget: int = TOKEN_LIMIT,
+    footer: str = "",
+    counts: list[int] | None = None,
+) -> list[PromptChunk]:
+    """Pack *lines* in order into the fewest prompts of at most *budget* tokens.
+
+    Each prompt is ``header + lines[start:stop] + footer``. Filling every
+    prompt greedily gives the minimum number of prompts for a fixed order.
+    *counts* may pass token counts of *lines* computed beforehand (the
+    whole-session count is then skipped). A line
+    too long for any prompt gets a prompt of its own, marked ``over_budget``.
+    """
+    lines = list(lines)
+    if counts is None:
+        text = header + "".join(lines) + footer
+        n_tokens = count_tokens(text)
+        if n_tokens <= budget:
+            return [PromptChunk(text, 1, 0, len(lines), n_tokens, budget, n_parts=1)]
+        counts = [count_tokens(line) for line in lines]
+    overhead = count_tokens(header) + count_tokens(footer)
+
+    chunks: list[PromptChunk] = []
+    start = 0
+    while start < len(lines) or not chunks:
+        stop = start
+        total = overhead
+        while stop < len(lines) and (stop == start or total + counts[stop] <= budget):
+            total += counts[stop]
+            stop += 1
+
+        text = header + "".join(lines[start:stop]) + footer
+        n_tokens = count_tokens(text)
+        # Joining lines can change the tokens at their boundaries; drop
+        # lines until the prompt really fits
+        while n_tokens > budget and stop - start > 1:
+            stop -= 1
+            text = header + "".join(lines[start:stop]) + footer
+            n_tokens = count_tokens(text)
+
+        chunks.append(PromptChunk(text, len(chunks) + 1, start, stop, n_tokens, budget))
+        start = stop
+
+    for chunk in chunks:
+        chunk.n_parts = len(chunks)
+    return chunks
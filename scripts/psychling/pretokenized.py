@@ -0,0 +1,241 @@
+"""
+Pre-tokenised prompt shards for training and evaluation pipelines.
+
+``scripts/pretokenize.py`` tokenises a study's ``prompts.jsonl.zip`` once,
+with the vendored cl100k_base encoder of ``psychling.tokens``, and writes
+one directory per study:
+
+    tokens.u32   token ids of every prompt, back to back (little-endian uint32)
+    mask.u8      one byte per token: 1 if the token is part of a <<...>>
+                 response, else 0
+    records.npy  one row per prompt: offset and number of its tokens, and
+                 its experiment and participant (indices into meta.json)
+    meta.json    encoding, sizes, experiment and participant names, and the
+                 archive entry the shard was built from
+
+A token counts as part of a response if any of its bytes lie between a
+``<<`` and the next ``>>`` (a token such as ``">>."`` does not). Loaders
+memory-map the arrays with :class:`PretokenizedStudy` and never parse JSON
+or run the tokenizer.
+
+Like ``shards``, this module needs pandas and numpy.
+
+Usage:
+    from psychling.pretokenized import PretokenizedStudy
+
+    study = PretokenizedStudy("build/tokens/balota2007_LDT")
+    for i in study.participant_records("balota2007_LDT_exp1", "1"):
+        ids, mask = study.prompt(i)
+"""
+
+from __future__ import annotations
+
+import collections
+import functools
+import json
+import os
+import re
+import shutil
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from psychling.seekable import jsonl_entry, record_key
+from psychling.shards import map_ordered
+from psychling.tokens import ENCODING_NAME, get_encoder, load_ranks
+
+FORMAT_VERSION = 1
+
+TOKENS_NAME = "tokens.u32"
+MASK_NAME = "mask.u8"
+RECORDS_NAME = "records.npy"
+META_NAME = "meta.json"
+
+TOKEN_DTYPE = np.dtype("<u4")
+RECORD_DTYPE = np.dtype([
+    ("start", "<u8"), ("length", "<u4"), ("experiment", "<u4"), ("participant", "<u4"),
+])
+
+# Response contents, between the markers
+_RESPONSE = re.compile(rb"<<(.*?)>>", re.DOTALL)
+
+# Prompts per job sent to a worker process
+BATCH_SIZE = 64
+
+
+@functools.lru_cache(maxsize=None)
+def token_byte_lengths() -> np.ndarray:
+    """Number of UTF-8 bytes each cl100k_base token id stands for."""
+    ranks = load_ranks()
+    lengths = np.zeros(max(ranks.values()) + 1, dtype=np.int64)
+    for token, rank in ranks.items():
+        lengths[rank] = len(token)
+    return lengths
+
+
+def encode_prompt(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Token ids of *text* and the response mask over them."""
+    ids = np.asarray(get_encoder().encode_ordinary(text), dtype=TOKEN_DTYPE)
+    mask = np.zeros(len(ids), dtype=np.uint8)
+    spans = [match.span(1) for match in _RESPONSE.finditer(text.encode("utf-8"))]
+    if spans and len(ids):
+        ends = np.cumsum(token_byte_lengths()[ids])
+        starts = ends - token_byte_lengths()[ids]
+        for start, stop in spans:
+            # Tokens ending after the span starts and starting before it stops
+            first = np.searchsorted(ends, start, side="right")
+            last = np.searchsorted(starts, stop, side="left")
+            mask[first:last] = 1
+    return ids, mask
+
+
+def _encode_batch(texts: list[str]) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Worker entry point: :func:`encode_prompt` of a batch of texts."""
+    return [encode_prompt(text) for text in texts]
+
+
+def source_info(zip_path: str | os.PathLike) -> dict:
+    """What identifies the archive entry a shard is built from."""
+    with zipfile.ZipFile(zip_path) as archive:
+        info = jsonl_entry(archive)
+    return {"entry": info.filename, "size": info.file_size, "crc": info.CRC}
+
+
+def is_current(zip_path: str | os.PathLike, out_dir: str | os.PathLike) -> bool:
+    """True if *out_dir* holds a shard of the archive as it is now."""
+    try:
+        with open(Path(out_dir) / META_NAME, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("version") == FORMAT_VERSION and meta.get("source") == source_info(zip_path)
+
+
+def _read_records(zip_path: Path):
+    """``(text, experiment, participant)`` of every record of the archive."""
+    with zipfile.ZipFile(zip_path) as archive:
+        with archive.open(jsonl_entry(archive)) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield (record["text"], *record_key(record))
+
+
+def _batches(records, size: int):
+    batch: list = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_study(zip_path: str | os.PathLike, out_dir: str | os.PathLike, workers: int = 1) -> dict:
+    """Tokenise the prompts of *zip_path* into a shard directory *out_dir*.
+
+    The shard is written next to *out_dir* and moved into place when
+    complete. Returns its metadata.
+    """
+    zip_path, out_dir = Path(zip_path), Path(out_dir)
+    source = source_info(zip_path)
+    tmp_dir = out_dir.with_name(out_dir.name + ".part")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    experiments: dict[str, int] = {}
+    participants: dict[str, int] = {}
+    records: list[tuple[int, int, int, int]] = []
+    n_tokens = n_response_tokens = 0
+
+    # Keys of the batches sent out and not yet written, oldest first
+    pending: collections.deque = collections.deque()
+
+    def jobs():
+        for batch in _batches(_read_records(zip_path), BATCH_SIZE):
+            pending.append([(experiment, participant) for _, experiment, participant in batch])
+            yield ([text for text, _, _ in batch],)
+
+    with open(tmp_dir / TOKENS_NAME, "wb") as tokens_file, open(tmp_dir / MASK_NAME, "wb") as mask_file:
+        for encoded in map_ordered(_encode_batch, jobs(), workers):
+            for (experiment, participant), (ids, mask) in zip(pending.popleft(), encoded):
+                records.append((
+                    n_tokens, len(ids),
+                    experiments.setdefault(experiment, len(experiments)),
+                    participants.setdefault(participant, len(participants)),
+                ))
+                tokens_file.write(ids.tobytes())
+                mask_file.write(mask.tobytes())
+                n_tokens += len(ids)
+                n_response_tokens += int(mask.sum())
+
+    np.save(tmp_dir / RECORDS_NAME, np.array(records, dtype=RECORD_DTYPE))
+    meta = {
+        "version": FORMAT_VERSION,
+        "encoding": ENCODING_NAME,
+        "source": source,
+        "n_records": len(records),
+        "n_tokens": n_tokens,
+        "n_response_tokens": n_response_tokens,
+        "experiments": list(experiments),
+        "participants": list(participants),
+    }
+    with open(tmp_dir / META_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+        f.write("\n")
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return meta
+
+
+class PretokenizedStudy:
+    """A shard directory written by :func:`build_study`, memory-mapped.
+
+    ``tokens`` and ``mask`` span the whole study; ``records`` has the
+    fields ``start``, ``length``, ``experiment`` and ``participant``.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with open(self.path / META_NAME, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported format version {self.meta.get('version')!r}")
+        self.experiments: list[str] = self.meta["experiments"]
+        self.participants: list[str] = self.meta["participants"]
+        self.records = np.load(self.path / RECORDS_NAME, mmap_mode="r")
+        self.tokens = self._map(TOKENS_NAME, TOKEN_DTYPE)
+        self.mask = self._map(MASK_NAME, np.uint8)
+        self._by_participant: dict | None = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def prompt(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        """Token ids and response mask of prompt *i* (views, not copies)."""
+        start, length = int(self.records["start"][i]), int(self.records["length"][i])
+        return self.tokens[start:start + length], self.mask[start:start + length]
+
+    def participant_records(self, experiment: str, participant: str) -> np.ndarray:
+        """Indices of the prompts of one participant of *experiment*, in order."""
+        if self._by_participant is None:
+            keys = self.records["experiment"].astype(np.int64) << 32 | self.records["participant"]
+            order = np.argsort(keys, kind="stable")
+            bounds = np.flatnonzero(np.diff(keys[order])) + 1
+            groups = np.split(order, bounds) if len(order) else []
+            self._by_participant = {int(keys[group[0]]): group for group in groups}
+        try:
+            key = self.experiments.index(experiment) << 32 | self.participants.index(participant)
+        except ValueError:
+            return np.empty(0, dtype=np.int64)
+        return self._by_participant.get(key, np.empty(0, dtype=np.int64))
+
+    def _map(self, name: str, dtype) -> np.ndarray:
+        # np.memmap cannot map an empty file
+        if self.meta["n_tokens"] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path / name, dtype=dtype, mode="r", shape=(self.meta["n_tokens"],))
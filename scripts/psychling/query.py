@@ -0,0 +1,217 @@
+"""
+Queries across the processed data of many studies.
+
+:func:`query` selects columns and rows from every ``processed_data/exp*.csv``
+of the chosen studies and returns them as one frame, with ``study`` and
+``exp`` columns in front. Each file is read with ``store.load_processed``,
+so the column selection and the filters are pushed down to the Parquet
+reader (only those columns, and only row groups the filters do not rule
+out, are read) when the columnar store has a current copy, and applied
+while reading the CSV otherwise. Studies are chosen by name or glob
+pattern before anything is read, and files are read in parallel
+processes.
+
+A file takes part if it has every column the filters use. Selected
+columns a file does not have are missing values in its rows. Files that
+cannot be read (e.g. Git LFS pointers, or a filter comparing a number
+with a column of strings) are skipped and listed in
+``result.attrs["skipped"]``. Filters select the same rows whether a file
+is read from the store or from its CSV; :func:`compare_paths` checks that
+for a query.
+
+In the result, columns that are numeric in every file are numeric, and
+all others, like ``study`` and ``exp``, are categoricals of strings.
+
+Like ``store``, this module needs pandas, and pyarrow to use the store.
+
+Usage:
+    from psychling.query import query
+
+    df = query(
+        ["stimulus", "rt", "accuracy"],
+        filters=[("stimulus", "==", "table")],
+        studies=["balota2007_LDT", "keuleers2011_britishlexiconproject", "guenther2020*"],
+        workers=4,
+    )
+"""
+
+from __future__ import annotations
+
+import fnmatch
+from pathlib import Path
+
+import pandas as pd
+
+from psychling.shards import map_ordered
+from psychling.store import (
+    REPO_ROOT,
+    STORE_DIR,
+    all_studies,
+    csv_path,
+    experiments,
+    is_lfs_pointer,
+    load_processed,
+    read_header,
+    sniff_delimiter,
+)
+
+STUDY, EXP = "study", "exp"
+
+
+def select_studies(patterns: list[str] | None = None, repo_root: Path = REPO_ROOT) -> list[str]:
+    """The studies matching any of the names or glob *patterns* (all studies
+    if None), in name order."""
+    studies = all_studies(repo_root)
+    if patterns is None:
+        return studies
+    return [study for study in studies if any(fnmatch.fnmatchcase(study, pattern) for pattern in patterns)]
+
+
+def filter_columns(filters) -> set[str]:
+    """The columns *filters* (in pyarrow's format) test."""
+    if not filters:
+        return set()
+    groups = filters if isinstance(filters[0], list) else [filters]
+    return {column for group in groups for column, _, _ in group}
+
+
+def _query_file(
+    study: str, exp: str, columns: list[str], filters, store_dir: Path | None, compact: bool,
+) -> tuple[pd.DataFrame | None, str | None]:
+    """Worker entry point: the selected rows of one file, or why it was
+    skipped."""
+    source = csv_path(study, exp)
+    if is_lfs_pointer(source):
+        return None, "Git LFS pointer, not data"
+    header = read_header(source, sniff_delimiter(source))
+    missing_filters = filter_columns(filters) - set(header)
+    if missing_filters:
+        return None, f"no column(s) {', '.join(sorted(missing_filters))}"
+    present = [column for column in columns if column in header]
+    try:
+        df = load_processed(study, exp, present, filters, compact=compact, store_dir=store_dir)
+    except Exception as exc:  # noqa: BLE001 - one bad file must not stop the query
+        return None, f"{type(exc).__name__}: {exc}"
+    return df.reindex(columns=columns), None
+
+
+def _numeric(series: pd.Series) -> bool:
+    """True if *series* holds numbers (or only missing values)."""
+    return series.dtype.kind in "biufb" or bool(series.isna().all())
+
+
+def _plain(series: pd.Series) -> pd.Series:
+    """A categorical *series* as numbers or strings, like its categories,
+    so that files with different categories can be concatenated."""
+    if series.cat.categories.dtype.kind in "biuf":
+        return pd.to_numeric(series.astype(object))
+    return series.astype("str")
+
+
+def combine(parts: list[tuple[str, str, pd.DataFrame]], columns: list[str]) -> pd.DataFrame:
+    """The ``(study, exp, frame)`` *parts* as one typed frame with ``study``
+    and ``exp`` columns (see the module docstring for the types)."""
+    frames = []
+    for study, exp, df in parts:
+        df = df.copy()
+        for column in columns:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = _plain(df[column])
+        df.insert(0, EXP, exp)
+        df.insert(0, STUDY, study)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame({name: pd.Series(dtype="category") for name in [STUDY, EXP, *columns]})
+
+    for column in columns:
+        if not all(_numeric(df[column]) for df in frames):
+            for df in frames:
+                df[column] = df[column].astype("str")
+    result = pd.concat(frames, ignore_index=True)
+    for column in [STUDY, EXP, *columns]:
+        if column in (STUDY, EXP) or result[column].dtype.kind not in "biufb":
+            result[column] = result[column].astype("category")
+    return result
+
+
+def query(
+    columns: list[str],
+    filters=None,
+    studies: list[str] | None = None,
+    *,
+    workers: int = 1,
+    compact: bool = False,
+    store_dir: Path | None = STORE_DIR,
+) -> pd.DataFrame:
+    """The *columns* of the rows passing *filters* in every processed file
+    of *studies* (names or glob patterns; all studies by default).
+
+    *filters* are as for ``store.load_processed``. Files are read in
+    *workers* processes (0 = one per CPU) and their rows are concatenated
+    in study and experiment order. ``compact=True`` reads files with the
+    compact CODEBOOK dtypes; ``store_dir=None`` reads only the CSVs.
+    """
+    columns = list(columns)
+    store_dir = Path(store_dir) if store_dir is not None else None
+    jobs = [
+        (study, exp, columns, filters, store_dir, compact)
+        for study in select_studies(studies)
+        for exp in experiments(study)
+    ]
+    parts, skipped = [], []
+    for (study, exp, *_), (df, reason) in zip(jobs, map_ordered(_query_file, jobs, workers)):
+        if df is None:
+            skipped.append((study, exp, reason))
+        else:
+            parts.append((study, exp, df))
+    result = combine(parts, columns)
+    result.attrs["skipped"] = skipped
+    return result
+
+
+
+def _plain_values(df: pd.DataFrame) -> pd.DataFrame:
+    """*df* with categoricals as plain values, to compare frames read by
+    different paths."""
+    df = df.reset_index(drop=True)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+    return df
+
+
+def compare_paths(
+    columns: list[str],
+    filters=None,
+    studies: list[str] | None = None,
+    *,
+    workers: int = 1,
+    store_dir: Path = STORE_DIR,
+) -> list[str]:
+    """Read every file of a :func:`query` from the store at *store_dir* and
+    from its CSV alone, and describe every file for which the two differ:
+    skipped by one only, or with other rows. An empty list means they
+    agree. Files are compared before :func:`combine` unifies their types."""
+    columns = list(columns)
+    keys = [(study, exp) for study in select_studies(studies) for exp in experiments(study)]
+    jobs = [
+        (study, exp, columns, filters, path, False)
+        for study, exp in keys for path in (Path(store_dir), None)
+    ]
+    results = list(map_ordered(_query_file, jobs, workers))
+
+    differences = []
+    for (study, exp), (from_store, store_reason), (from_csv, csv_reason) in zip(keys, results[::2], results[1::2]):
+        if (from_store is None) != (from_csv is None):
+            which, reason = ("store", store_reason) if from_store is None else ("CSV", csv_reason)
+            differences.append(f"{study}/{exp}: skipped from the {which} only ({reason})")
+        elif from_store is None:
+            continue
+        elif len(from_store) != len(from_csv):
+            differences.append(f"{study}/{exp}: {len(from_store):,} rows from the store, {len(from_csv):,} from the CSV")
+        else:
+            try:
+                pd.testing.assert_frame_equal(_plain_values(from_store), _plain_values(from_csv), check_dtype=False)
+            except AssertionError as exc:
+                differences.append(f"{study}/{exp}: values differ ({str(exc).splitlines()[0]})")
+    return differences
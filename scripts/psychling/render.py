@@ -0,0 +1,170 @@
+"""
+Column-wise rendering of trial lines for generate_prompts.py scripts.
+
+Building a prompt with ``df.iterrows()`` and ``text += ...`` creates a
+pandas Series per trial, which is what makes the megastudies take tens of
+minutes. Here each template field is formatted once for the whole column,
+the fields are joined into one line per trial in a single pass, and the
+lines are joined per participant (or session, batch, ...) using group
+boundaries computed once from the sorted frame.
+
+Unlike the rest of the package this module needs pandas and numpy, which
+every generator already uses.
+
+Usage:
+    from psychling.render import group_bounds, join_groups, render_lines, sort_groups
+
+    df = sort_groups(df, ["participant_id"], ["trial_id"])
+    lines = render_lines(
+        "Trial {trial}: You see '{stimulus}'. You press <<{response}>>.\\n",
+        trial=df["trial_id"] + 1, stimulus=df["stimulus"], response=df["response"],
+    )
+    bounds = group_bounds(df, ["participant_id"])
+    texts = join_groups(lines, bounds, prefix=INSTRUCTIONS)
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import string
+
+import numpy as np
+import pandas as pd
+
+
+def sort_groups(df: pd.DataFrame, by: list[str], order: list[str] | None = None) -> pd.DataFrame:
+    """*df* with the rows of each *by* group together, groups in
+    ``groupby(by)`` order and rows within a group sorted by *order*.
+
+    The sort is stable, so rows that tie on every key keep their file order.
+    """
+    return df.sort_values(list(by) + list(order or []), kind="stable").reset_index(drop=True)
+
+
+def group_bounds(df: pd.DataFrame, by: list[str]) -> np.ndarray:
+    """Offsets of the groups of a frame sorted with :func:`sort_groups`.
+
+    Group ``g`` spans rows ``bounds[g]:bounds[g + 1]``; the last offset is
+    ``len(df)``. Key columns must not contain missing values.
+    """
+    n = len(df)
+    starts = np.zeros(n, dtype=bool)
+    if n:
+        starts[0] = True
+    for column in by:
+        values = df[column].to_numpy()
+        starts[1:] |= values[1:] != values[:-1]
+    return np.append(np.flatnonzero(starts), n)
+
+
+def split_bounds(bounds: np.ndarray, size: int) -> np.ndarray:
+    """Split every group of *bounds* into consecutive chunks of at most
+    *size* rows (the last chunk of a group may be shorter)."""
+    chunks = [
+        np.arange(start, stop, size) for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    return np.append(np.concatenate(chunks) if chunks else np.empty(0, dtype=int), bounds[-1])
+
+
+def group_positions(bounds: np.ndarray) -> np.ndarray:
+    """0-based position of every row within its group."""
+    sizes = np.diff(bounds)
+    return np.arange(bounds[-1]) - np.repeat(bounds[:-1], sizes)
+
+
+def _formatted(values, spec: str = ""):
+    """Iterator over the values of *values* as f-string fields would print them."""
+    if isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+        values = values.tolist()
+    if spec:
+        return (format(value, spec) for value in values)
+    return map(str, values)
+
+
+def format_column(values, spec: str = "") -> list[str]:
+    """Every value of *values* formatted as an f-string field would be.
+
+    Values are converted to Python objects first, so integers print as
+    ``3``, floats as ``3.0`` and missing values as ``nan``, exactly like
+    ``f"{row['column']}"`` on an ``iterrows()`` row of a mixed-type frame.
+    """
+    return list(_formatted(values, spec))
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template: str) -> tuple[tuple[str, str | None, str], ...]:
+    """*template* split into ``(literal, field name, format spec)`` parts.
+
+    Parsed once per template string and cached, so rendering a template for
+    every shard or participant does not parse it again.
+    """
+    parts = []
+    for literal, name, spec, conversion in string.Formatter().parse(template):
+        if conversion:
+            raise ValueError(f"Conversions like '!{conversion}' are not supported: {template!r}")
+        parts.append((literal, name, spec or ""))
+    return tuple(parts)
+
+
+def render_lines(template: str, **fields) -> np.ndarray:
+    """One rendered *template* per row, as an object array.
+
+    *template* is a ``str.format`` template whose fields name keyword
+    arguments, each a column (Series, array or list) or a single string
+    shared by all rows. A field may carry a format spec, e.g. ``{rt:.0f}``.
+    Fields are formatted as the lines are joined, so no formatted column is
+    held in memory in full.
+    """
+    parts: list = []
+    n_rows = None
+    for literal, name, spec in compile_template(template):
+        if literal:
+            parts.append(literal)
+        if name is None:
+            continue
+        value = fields[name]
+        if isinstance(value, str):
+            parts.append(format(value, spec))
+            continue
+        if n_rows is not None and len(value) != n_rows:
+            raise ValueError(f"Field '{name}' has {len(value)} values, expected {n_rows}")
+        n_rows = len(value)
+        parts.append(_formatted(value, spec))
+
+    if n_rows is None:
+        raise ValueError(f"Template has no column fields: {template!r}")
+    columns = [itertools.repeat(part, n_rows) if isinstance(part, str) else part for part in parts]
+    return np.fromiter(map("".join, zip(*columns)), dtype=object, count=n_rows)
+
+
+def choose(condition, if_true, if_false) -> np.ndarray:
+    """Per-row choice between two strings or string columns."""
+    def values(side):
+        return side if isinstance(side, str) else np.asarray(format_column(side), dtype=object)
+
+    return np.where(np.asarray(condition, dtype=bool), values(if_true), values(if_false)).astype(object)
+
+
+def join_groups(lines, bounds: np.ndarray, prefix: str = "", sep: str = "", suffix: str = ""):
+    """The *lines* of each group joined with *sep*, between *prefix* and *suffix*.
+
+    Texts are yielded one group at a time, so only the prompt being written
+    is held in memory on top of the lines.
+    """
+    lines = list(lines)
+    for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        yield prefix + sep.join(lines[start:stop]) + suffix
+
+
+def group_values(values, bounds: np.ndarray):
+    """*values* (a column) split into one Python list per group, yielded in order."""
+    if isinstance(values, (pd.Series, np.ndarray)):
+        values = values.tolist()
+    for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        yield values[start:stop]
+
+
+def first_rows(df: pd.DataFrame, bounds: np.ndarray) -> pd.DataFrame:
+    """The first row of every group, e.g. for participant-level metadata."""
+    return df.iloc[bounds[:-1]]
@@ -0,0 +1,266 @@
+"""
+Random access to the records of ``prompts.jsonl.zip``.
+
+A :class:`~psychling.archive.PromptArchiveWriter` opened with
+``seekable=True`` deflates every block of the entry on its own, not primed
+with the end of the block before it, so inflating can start at any block.
+On close it writes a sidecar, ``prompts.offsets.json`` next to the
+archive, holding where each block starts (in the archive file and in the
+JSONL) and the byte range of every ``(experiment, participant_id)``'s
+records in the JSONL. The entry is still one ordinary deflate stream, so
+zipfile, unzip and the validator read the archive as before.
+
+:class:`PromptReader` finds a participant in the sidecar and inflates from
+the start of the block holding their first record: at most one block
+(``archive.BLOCK_SIZE``, 1 MiB) besides their own records, however large
+the archive. Without a current sidecar it reads the archive through once
+to find the records, and then inflates from the start of the entry.
+
+Unprimed blocks cost little compression, since blocks are large: 0.6%
+over the archives in the repo, up to 10% on small, repetitive ones. :func:`convert_archive` (used by
+``scripts/seekable_prompts.py``) rewrites an existing archive in this
+layout; the JSONL it holds stays byte-for-byte the same.
+
+Like ``archive``, this module only needs the standard library;
+:func:`convert_archive` deflates in worker processes with ``shards``,
+which needs pandas and numpy.
+
+Usage:
+    from psychling.seekable import PromptReader
+
+    reader = PromptReader("saban2024_ldt/prompts.jsonl.zip")
+    records = reader.participant_records("Saban_ItalianLDT-Exp1", "1")
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+
+OFFSETS_NAME = "prompts.offsets.json"
+OFFSETS_VERSION = 1
+
+# Compressed bytes read at a time while inflating
+READ_SIZE = 1 << 16
+# Uncompressed JSONL bytes per segment deflated by a worker in convert_archive
+SEGMENT_SIZE = 1 << 24
+
+
+def record_key(record: dict) -> tuple[str, str]:
+    """The ``(experiment, participant)`` a record belongs to, as strings."""
+    participant = record.get("participant_id", record.get("participant", ""))
+    return str(record.get("experiment", "")), str(participant)
+
+
+def line_key(line: bytes) -> tuple[str, str] | None:
+    """:func:`record_key` of an encoded JSON line, or None for a blank line."""
+    if not line.strip():
+        return None
+    return record_key(json.loads(line))
+
+
+def add_span(spans: list[list], key: tuple[str, str] | None, offset: int, length: int) -> None:
+    """Record a line of *length* bytes at JSONL *offset* in *spans*, the
+    ``[experiment, participant_id, offset, length, n_records]`` of runs of
+    consecutive lines with the same key."""
+    if key is None:
+        return
+    if spans and tuple(spans[-1][:2]) == key and spans[-1][2] + spans[-1][3] == offset:
+        spans[-1][3] += length
+        spans[-1][4] += 1
+    else:
+        spans.append([*key, offset, length, 1])
+
+
+def archive_facts(path: str | os.PathLike, arcname: str) -> dict:
+    """What a sidecar checks to recognise the archive it describes."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(arcname)
+    return {"size": Path(path).stat().st_size, "crc": info.CRC, "compressed": info.compress_size}
+
+
+def offsets_path(zip_path: str | os.PathLike) -> Path:
+    return Path(zip_path).with_name(OFFSETS_NAME)
+
+
+def write_offsets(zip_path: str | os.PathLike, arcname: str, restarts: list, spans: list) -> Path:
+    """Write the sidecar of the finished archive *zip_path*: its block
+    *restarts* (``(file offset, JSONL offset)`` pairs) and participant
+    *spans* (see :func:`add_span`)."""
+    path = offsets_path(zip_path)
+    header = {
+        "version": OFFSETS_VERSION,
+        "arcname": arcname,
+        "archive": archive_facts(zip_path, arcname),
+        "restarts": [list(restart) for restart in restarts],
+    }
+    # One participant per line keeps the sidecar readable and diffable
+    lines = ",\n".join(json.dumps(span, ensure_ascii=False) for span in spans)
+    tmp_path = path.with_name(path.name + ".part")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header, ensure_ascii=False)[:-1] + ',\n"participants": [\n' + lines + "\n]}\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_offsets(zip_path: str | os.PathLike) -> dict | None:
+    """The sidecar of *zip_path*, or None if there is none or it describes
+    another archive."""
+    try:
+        with open(offsets_path(zip_path), encoding="utf-8") as f:
+            offsets = json.load(f)
+        if offsets.get("version") != OFFSETS_VERSION:
+            return None
+        if archive_facts(zip_path, offsets["arcname"]) != offsets["archive"]:
+            return None
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    return offsets
+
+
+def jsonl_entry(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """The single ``.jsonl`` entry of a prompt archive (``__MACOSX``
+    metadata aside, as the validator ignores it)."""
+    entries = [
+        info for info in archive.infolist()
+        if info.filename.endswith(".jsonl") and not info.filename.startswith("__MACOSX")
+    ]
+    if len(entries) != 1:
+        raise ValueError(f"{archive.filename}: expected one .jsonl entry, found {len(entries)}")
+    return entries[0]
+
+
+def data_offset(zip_path: str | os.PathLike, info: zipfile.ZipInfo) -> int:
+    """Offset in the file of the compressed data of the entry *info*."""
+    with open(zip_path, "rb") as f:
+        f.seek(info.header_offset)
+        header = f.read(30)
+    if len(header) != 30 or header[:4] != b"PK\x03\x04":
+        raise ValueError(f"{zip_path}: no local header for {info.filename}")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    return info.header_offset + 30 + name_length + extra_length
+
+
+class PromptReader:
+    """Records of a ``prompts.jsonl.zip`` by participant, read without
+    inflating the whole entry where the archive has a current sidecar."""
+
+    def __init__(self, zip_path: str | os.PathLike):
+        self.path = Path(zip_path)
+        offsets = load_offsets(self.path)
+        self.indexed = offsets is not None
+        if offsets is None:
+            offsets = self._scan()
+        self._restart_files = [restart[0] for restart in offsets["restarts"]]
+        self._restart_lines = [restart[1] for restart in offsets["restarts"]]
+        self._spans: dict[tuple[str, str], list[tuple[int, int]]] = {}
+        for experiment, participant, offset, length, _ in offsets["participants"]:
+            self._spans.setdefault((experiment, participant), []).append((offset, length))
+
+    def keys(self) -> list[tuple[str, str]]:
+        """Every ``(experiment, participant_id)``, in archive order."""
+        return list(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __contains__(self, key) -> bool:
+        return key in self._spans
+
+    def participant_lines(self, experiment: str, participant) -> list[bytes]:
+        """The JSON lines of one participant of *experiment*, in order."""
+        spans = self._spans.get((str(experiment), str(participant)), [])
+        data = b"".join(self._inflate(offset, length) for offset, length in spans)
+        return data.splitlines(keepends=True)
+
+    def participant_records(self, experiment: str, participant) -> list[dict]:
+        """The records of one participant of *experiment*, in order."""
+        return [json.loads(line) for line in self.participant_lines(experiment, participant) if line.strip()]
+
+    def _inflate(self, offset: int, length: int) -> bytes:
+        """*length* bytes of the JSONL from *offset*, inflated from the last
+        block start before it."""
+        i = bisect.bisect_right(self._restart_lines, offset) - 1
+        skip = offset - self._restart_lines[i]
+        wanted = skip + length
+        decompressor = zlib.decompressobj(-15)
+        out = bytearray()
+        with open(self.path, "rb") as f:
+            f.seek(self._restart_files[i])
+            pending = b""
+            while len(out) < wanted:
+                if not pending:
+                    pending = f.read(READ_SIZE)
+                    if not pending:
+                        raise ValueError(f"{self.path} ends inside the records at JSONL offset {offset}")
+                out += decompressor.decompress(pending, wanted - len(out))
+                pending = decompressor.unconsumed_tail
+        return bytes(out[skip:])
+
+    def _scan(self) -> dict:
+        """Sidecar contents for an archive without one: participant spans
+        from one pass through the entry, and its start as the only block
+        start."""
+        with zipfile.ZipFile(self.path) as archive:
+            info = jsonl_entry(archive)
+            spans: list[list] = []
+            offset = 0
+            with archive.open(info) as f:
+                for line in f:
+                    add_span(spans, line_key(line), offset, len(line))
+                    offset += len(line)
+        return {"restarts": [[data_offset(self.path, info), 0]], "participants": spans}
+
+
+def _deflate_lines(lines: list[bytes], level: int, block_size: int):
+    """Worker entry point: :func:`~psychling.archive.deflate_segment` of
+    *lines*, seekable."""
+    from psychling.archive import deflate_segment
+
+    return deflate_segment(lines, level, block_size, seekable=True)
+
+
+def _segments(lines, size: int):
+    segment: list[bytes] = []
+    buffered = 0
+    for line in lines:
+        segment.append(line)
+        buffered += len(line)
+        if buffered >= size:
+            yield segment
+            segment, buffered = [], 0
+    if segment:
+        yield segment
+
+
+def convert_archive(zip_path: str | os.PathLike, workers: int = 1) -> dict:
+    """Rewrite *zip_path* in the seekable layout and write its sidecar.
+
+    The JSONL entry keeps its name and exact contents; other entries (such
+    as ``__MACOSX`` metadata) are dropped. Returns the sizes before and
+    after and the number of participants.
+    """
+    from psychling.archive import PromptArchiveWriter
+    from psychling.shards import map_ordered
+
+    zip_path = Path(zip_path)
+    size_before = zip_path.stat().st_size
+    with zipfile.ZipFile(zip_path) as archive:
+        arcname = jsonl_entry(archive).filename
+    # zipfile checks the CRC of what it read, and the writer computes its
+    # own from the same bytes
+    with PromptArchiveWriter(zip_path, arcname, seekable=True) as writer, \
+            zipfile.ZipFile(zip_path) as archive, archive.open(arcname) as f:
+        jobs = ((segment, writer.level, writer.block_size) for segment in _segments(f, SEGMENT_SIZE))
+        for segment in map_ordered(_deflate_lines, jobs, workers):
+            writer.write_segment(segment)
+    return {
+        "size_before": size_before,
+        "size_after": zip_path.stat().st_size,
+        "n_participants": len(PromptReader(zip_path)),
+    }
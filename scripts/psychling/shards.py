@@ -0,0 +1,133 @@
+"""
+Sharded, multi-process prompt generation.
+
+A processed frame, sorted so each participant's rows are together (see
+``render.sort_groups``), is cut into shards of whole participants. Every
+shard is rendered and deflated in a worker process, and the deflated
+shards are spliced into ``prompts.jsonl.zip`` in participant order
+(``PromptArchiveWriter.write_segment``), so the parent never re-encodes or
+decompresses anything.
+
+Shard boundaries depend only on the data (every :data:`SHARD_ROWS` rows,
+moved forward to the next participant), and a shard is deflated the same
+way in any process. The archive is therefore byte-for-byte the same for
+every ``--workers`` value, including 1.
+
+The render function receives a shard as a frame (index reset) and returns
+or yields its records. It is sent to the workers by name, so it must be
+defined at module level, and the generator's top-level work must sit under
+``if __name__ == "__main__":``.
+
+Usage:
+    from psychling.archive import PromptArchiveWriter
+    from psychling.shards import add_workers_argument, write_shards
+
+    def build_prompts(df):
+        ...  # yield one record per participant of df
+
+    if __name__ == "__main__":
+        parser = argparse.ArgumentParser()
+        add_workers_argument(parser)
+        args = parser.parse_args()
+        df = sort_groups(pd.read_csv(...), ["participant_id"], ["trial_id"])
+        with PromptArchiveWriter(base_dir / "prompts.jsonl.zip") as writer:
+            write_shards(writer, df, ["participant_id"], build_prompts, workers=args.workers)
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import concurrent.futures
+import os
+
+import numpy as np
+import pandas as pd
+
+from psychling.archive import DeflateSegment, PromptArchiveWriter, deflate_segment, json_encoder
+from psychling.render import group_bounds
+
+# Rows per shard (before moving the cut to the next group boundary)
+SHARD_ROWS = 100_000
+
+
+def add_workers_argument(parser: argparse.ArgumentParser, default: int = 1) -> None:
+    """Add the ``--workers`` option shared by sharded generators."""
+    parser.add_argument(
+        "--workers", type=int, default=default, metavar="N",
+        help=f"render shards in N worker processes (0 = one per CPU; default: {default}); "
+             "the output is the same for every N",
+    )
+
+
+def resolve_workers(workers: int) -> int:
+    """*workers* with 0 standing for the number of CPUs."""
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def shard_bounds(bounds: np.ndarray, rows: int = SHARD_ROWS) -> np.ndarray:
+    """Offsets of shards of about *rows* rows, cut only at the group
+    boundaries *bounds* (from ``render.group_bounds``)."""
+    n = int(bounds[-1])
+    targets = np.arange(rows, n, rows)
+    cuts = bounds[np.searchsorted(bounds, targets)]
+    return np.unique(np.concatenate(([0], cuts, [n])))
+
+
+def _render_shard(
+    render, shard: pd.DataFrame, json_options: dict, level: int, block_size: int, seekable: bool,
+) -> DeflateSegment:
+    """Worker entry point: one shard's records, encoded and deflated."""
+    encode = json_encoder(**json_options)
+    return deflate_segment(map(encode, render(shard)), level, block_size, seekable)
+
+
+def write_shards(
+    writer: PromptArchiveWriter,
+    df: pd.DataFrame,
+    by: list[str],
+    render,
+    workers: int = 1,
+    shard_rows: int = SHARD_ROWS,
+) -> None:
+    """Render *df* shard by shard with *render* and append the records to
+    *writer* in order.
+
+    *df* must be sorted so that rows of each *by* group are together; a
+    group is never split across shards.
+    """
+    cuts = shard_bounds(group_bounds(df, by), shard_rows).tolist()
+    shards = (
+        df.iloc[start:stop].reset_index(drop=True) for start, stop in zip(cuts[:-1], cuts[1:])
+    )
+    args = (writer.json_options, writer.level, writer.block_size, writer.seekable)
+    jobs = ((render, shard, *args) for shard in shards)
+    for segment in map_ordered(_render_shard, jobs, workers):
+        writer.write_segment(segment)
+
+
+def map_ordered(function, jobs, workers: int = 1):
+    """Yield ``function(*job)`` for every job of *jobs*, in order, computed
+    in *workers* processes (0 = one per CPU; 1 = in this process).
+
+    At most 2 jobs per worker are in flight, so only a few shards' frames
+    and outputs are held in memory at a time.
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for job in jobs:
+            yield function(*job)
+        return
+
+    pending: collections.deque = collections.deque()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for job in jobs:
+                pending.append(pool.submit(function, *job))
+                while len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,288 @@
+"""
+Inverted index of the stimuli of every study.
+
+``scripts/index_stimuli.py`` maps every normalised value of the
+:data:`INDEXED_COLUMNS` of a study's processed data to where it occurs,
+and writes one directory per study:
+
+    strings.bin   the study's distinct normalised values, UTF-8, back to
+                  back in byte order
+    terms.npy     one row per value: offset and length of its text in
+                  strings.bin, and first index and number of its postings
+    postings.npy  one row per run of consecutive rows holding a value:
+                  experiment and column (indices into meta.json) and the
+                  row range [start, stop) in the processed CSV (data rows,
+                  from 0), sorted by value, experiment, column and start
+    meta.json     experiment and column names, and the CSVs the index was
+                  built from
+
+Values are normalised with :func:`normalize` (Unicode NFKC, case-folded,
+whitespace collapsed), so "Table", "table " and "ＴＡＢＬＥ" are one term.
+A study is only re-indexed when one of its CSVs changed. Readers
+memory-map the files with :class:`StimulusIndex` and find a term in each
+study by binary search, which takes about a millisecond across the corpus.
+
+Like ``store``, this module needs pandas and numpy; the processed data is
+read with ``store.load_processed``, so from the columnar store where it is
+current.
+
+Usage:
+    from psychling.stimuli import StimulusIndex
+
+    index = StimulusIndex()
+    for study, exp, column, start, stop in index.lookup("table"):
+        ...
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import re
+import shutil
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from psychling.store import (
+    REPO_ROOT,
+    STORE_DIR,
+    csv_path,
+    experiments,
+    is_lfs_pointer,
+    load_processed,
+    read_header,
+    sniff_delimiter,
+    source_info,
+)
+
+FORMAT_VERSION = 1
+
+INDEX_DIR = REPO_ROOT / "build" / "stimuli"
+
+STRINGS_NAME = "strings.bin"
+TERMS_NAME = "terms.npy"
+POSTINGS_NAME = "postings.npy"
+META_NAME = "meta.json"
+
+INDEXED_COLUMNS = ("stimulus", "target_word", "prime")
+
+TERM_DTYPE = np.dtype([
+    ("offset", "<u8"), ("length", "<u4"), ("first", "<u8"), ("count", "<u4"),
+])
+POSTING_DTYPE = np.dtype([
+    ("experiment", "<u2"), ("column", "<u1"), ("start", "<u4"), ("stop", "<u4"),
+])
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(value) -> str:
+    """*value* as an index term: NFKC, case-folded, with runs of whitespace
+    collapsed to one space and none at either end."""
+    text = unicodedata.normalize("NFKC", str(value)).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def sources(study: str) -> dict[str, dict]:
+    """What identifies each processed CSV of *study*, by experiment."""
+    return {exp: source_info(csv_path(study, exp)) for exp in experiments(study)}
+
+
+def is_current(study: str, out_dir: str | os.PathLike) -> bool:
+    """True if *out_dir* holds the index of *study*'s processed CSVs as they
+    are now."""
+    try:
+        with open(Path(out_dir) / META_NAME, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        meta.get("version") == FORMAT_VERSION
+        and meta.get("columns") == list(INDEXED_COLUMNS)
+        and meta.get("sources") == sources(study)
+    )
+
+
+def column_runs(values: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Runs of consecutive rows of *values* with the same term.
+
+    Returns the distinct terms (sorted) and, for every run, the index of
+    its term and its row range. Missing and empty values are in no run.
+    Only the distinct values are normalised, not every row.
+    """
+    values = values.astype("category")
+    normalized = np.array([normalize(value) for value in values.cat.categories], dtype=object)
+    terms, inverse = np.unique(normalized, return_inverse=True)
+    codes = values.cat.codes.to_numpy()
+    term_codes = np.full(len(codes), -1, dtype=np.int64)
+    term_codes[codes >= 0] = inverse[codes[codes >= 0]]
+    if len(terms) and terms[0] == "":
+        # Values that normalise to nothing are missing too
+        terms, term_codes = terms[1:], term_codes - 1
+
+    starts = np.flatnonzero(np.diff(term_codes, prepend=-3) != 0)
+    stops = np.append(starts[1:], len(term_codes))
+    keep = term_codes[starts] >= 0
+    return terms, term_codes[starts][keep], starts[keep], stops[keep]
+
+
+def build_study(study: str, out_dir: str | os.PathLike, store_dir: Path = STORE_DIR) -> dict:
+    """Index the processed CSVs of *study* into a directory *out_dir*.
+
+    CSVs that are Git LFS pointers are listed as skipped. The index is
+    written next to *out_dir* and moved into place when complete. Returns
+    its metadata.
+    """
+    out_dir = Path(out_dir)
+    exps = experiments(study)
+    run_terms, runs, skipped = [], [], []
+    for exp_index, exp in enumerate(exps):
+        source = csv_path(study, exp)
+        if is_lfs_pointer(source):
+            skipped.append(exp)
+            continue
+        header = read_header(source, sniff_delimiter(source))
+        present = [column for column in INDEXED_COLUMNS if column in header]
+        if not present:
+            continue
+        df = load_processed(study, exp, present, store_dir=store_dir)
+        for column in present:
+            terms, codes, starts, stops = column_runs(df[column])
+            run_terms.append(terms[codes])
+            run = np.empty(len(codes), dtype=POSTING_DTYPE)
+            run["experiment"], run["column"] = exp_index, INDEXED_COLUMNS.index(column)
+            run["start"], run["stop"] = starts, stops
+            runs.append(run)
+
+    # Python orders str by code point, as UTF-8 orders bytes
+    vocabulary, term_ids = np.unique(
+        np.concatenate(run_terms) if run_terms else np.empty(0, dtype=object), return_inverse=True
+    )
+    postings = np.concatenate(runs) if runs else np.empty(0, dtype=POSTING_DTYPE)
+    order = np.lexsort((postings["start"], postings["column"], postings["experiment"], term_ids))
+    postings = postings[order]
+
+    encoded = [term.encode("utf-8") for term in vocabulary]
+    terms = np.zeros(len(encoded), dtype=TERM_DTYPE)
+    terms["length"] = [len(text) for text in encoded]
+    terms["offset"] = np.cumsum(terms["length"], dtype=np.uint64) - terms["length"]
+    terms["count"] = np.bincount(term_ids, minlength=len(encoded))
+    terms["first"] = np.cumsum(terms["count"], dtype=np.uint64) - terms["count"]
+
+    tmp_dir = out_dir.with_name(out_dir.name + ".part")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    with open(tmp_dir / STRINGS_NAME, "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(tmp_dir / TERMS_NAME, terms)
+    np.save(tmp_dir / POSTINGS_NAME, postings)
+    meta = {
+        "version": FORMAT_VERSION,
+        "study": study,
+        "columns": list(INDEXED_COLUMNS),
+        "experiments": exps,
+        "sources": sources(study),
+        "skipped": skipped,
+        "n_terms": len(terms),
+        "n_postings": len(postings),
+        "n_bytes": int(terms["length"].sum()),
+    }
+    with open(tmp_dir / META_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+        f.write("\n")
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return meta
+
+
+class _Terms:
+    """The terms of a study as a sequence of bytes, for :mod:`bisect`."""
+
+    def __init__(self, strings: np.ndarray, terms: np.ndarray):
+        self.strings, self.offsets, self.lengths = strings, terms["offset"], terms["length"]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> bytes:
+        offset = int(self.offsets[i])
+        return self.strings[offset:offset + int(self.lengths[i])].tobytes()
+
+
+class StudyIndex:
+    """A study's index directory written by :func:`build_study`,
+    memory-mapped."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with open(self.path / META_NAME, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported format version {self.meta.get('version')!r}")
+        self.study: str = self.meta["study"]
+        self.experiments: list[str] = self.meta["experiments"]
+        self.columns: list[str] = self.meta["columns"]
+        self.terms = np.load(self.path / TERMS_NAME, mmap_mode="r")
+        self.postings = np.load(self.path / POSTINGS_NAME, mmap_mode="r")
+        # np.memmap cannot map an empty file
+        strings = (
+            np.memmap(self.path / STRINGS_NAME, dtype=np.uint8, mode="r")
+            if self.meta["n_bytes"] else np.empty(0, dtype=np.uint8)
+        )
+        self._terms = _Terms(strings, self.terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def term(self, i: int) -> str:
+        return self._terms[i].decode("utf-8")
+
+    def find(self, term: str) -> int:
+        """Index of the already normalised *term*, or -1."""
+        key = term.encode("utf-8")
+        i = bisect.bisect_left(self._terms, key)
+        return i if i < len(self._terms) and self._terms[i] == key else -1
+
+    def term_postings(self, i: int) -> np.ndarray:
+        """The postings of term *i* (a view, not a copy)."""
+        first = int(self.terms["first"][i])
+        return self.postings[first:first + int(self.terms["count"][i])]
+
+    def lookup(self, value) -> list[tuple[str, str, int, int]]:
+        """``(exp, column, start, stop)`` of every run of rows holding
+        *value*, after normalisation."""
+        i = self.find(normalize(value))
+        if i < 0:
+            return []
+        return [
+            (self.experiments[exp], self.columns[column], start, stop)
+            for exp, column, start, stop in self.term_postings(i).tolist()
+        ]
+
+
+class StimulusIndex:
+    """The indexes of every study under *path*, memory-mapped."""
+
+    def __init__(self, path: str | os.PathLike = INDEX_DIR):
+        self.path = Path(path)
+        self.studies = {
+            item.name: StudyIndex(item) for item in sorted(self.path.iterdir())
+            if item.is_dir() and (item / META_NAME).exists()
+        } if self.path.is_dir() else {}
+
+    def lookup(self, value) -> list[tuple[str, str, str, int, int]]:
+        """``(study, exp, column, start, stop)`` of every run of rows holding
+        *value*, after normalisation, in study order."""
+        return [
+            (study, *posting) for study, index in self.studies.items() for posting in index.lookup(value)
+        ]
+
+    def studies_with(self, value) -> list[str]:
+        """The studies that have *value*, after normalisation."""
+        term = normalize(value)
+        return [study for study, index in self.studies.items() if index.find(term) >= 0]
@@ -0,0 +1,552 @@
+"""
+Columnar store of the processed data.
+
+Parsing the processed CSVs is slow for the megastudies (minutes for the
+largest files, and several times the file size in memory).
+``scripts/build_store.py`` converts each ``processed_data/exp*.csv`` once
+into a Parquet file in a Hive-partitioned tree:
+
+    build/processed/study=<study>/exp=<exp>/part-0.parquet
+
+Columns with a ``Type`` in CODEBOOK.csv are stored with that type in every
+study (integer as int64, number as float64, boolean as bool). Other columns
+get the narrowest of int64, float64 and string that holds all their values,
+found in a first pass over the whole file. String columns are
+dictionary-encoded. Rows keep their CSV order and are written in row groups
+of :data:`ROW_GROUP_ROWS`, whose min/max statistics let readers skip the
+groups a filter rules out. The CSV is read in blocks, so converting even a
+2 GB file holds only about one row group in memory.
+
+:func:`load_processed` reads only the columns and row groups asked for. It
+reads the CSV with pandas instead when the store has no current copy of it
+(or pyarrow is missing), so generators can call it either way. Values read
+as missing are pandas' defaults (empty, ``NA``, ``nan``, ...) in both cases;
+string columns come back as categoricals from the store and as strings
+from the CSV.
+
+:func:`read_processed` reads a CSV with the compact dtypes of
+``codebook.compact_dtypes`` applied while parsing (``load_processed``
+with ``compact=True`` uses them too).
+
+The store needs pyarrow, an optional dependency; this module otherwise
+needs pandas.
+
+Usage:
+    from psychling.store import load_processed
+
+    df = load_processed(
+        "balota2007_LDT", "exp1",
+        columns=["participant_id", "stimulus", "rt"],
+        filters=[("rt", ">", 200), ("accuracy", "==", 1)],
+    )
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import operator
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from psychling.codebook import FALSE_VALUES, TRUE_VALUES, column_types, compact_dtypes
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+STORE_DIR = REPO_ROOT / "build" / "processed"
+PROCESSED_DIR = "processed_data"
+PART_NAME = "part-0.parquet"
+FORMAT_VERSION = 1
+
+# Rows per Parquet row group: the unit a filter can skip
+ROW_GROUP_ROWS = 1 << 17
+
+# Bytes of CSV parsed at a time
+BLOCK_SIZE = 1 << 24
+
+# pandas' default missing-value markers
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+LFS_POINTER_SIGNATURE = b"version https://git-lfs.github.com/spec/"
+
+_METADATA_KEY = b"psychling"
+
+_FILTER_OPS = {
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+
+def has_pyarrow() -> bool:
+    """True if pyarrow, which the store needs, is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def experiments(study: str, repo_root: Path = REPO_ROOT) -> list[str]:
+    """Names of the processed CSVs of *study* (``exp1``, ``exp2``, ...), in
+    numeric order."""
+    paths = (repo_root / study / PROCESSED_DIR).glob("exp*.csv")
+    names = [path.stem for path in paths if re.fullmatch(r"exp\d+", path.stem)]
+    return sorted(names, key=lambda name: int(name[3:]))
+
+
+def all_studies(repo_root: Path = REPO_ROOT) -> list[str]:
+    """Dataset folders in the repo root that have processed CSVs."""
+    return [
+        item.name for item in sorted(repo_root.iterdir())
+        if item.is_dir() and not item.name.startswith(".") and experiments(item.name, repo_root)
+    ]
+
+
+def csv_path(study: str, exp: str | int, repo_root: Path = REPO_ROOT) -> Path:
+    return repo_root / study / PROCESSED_DIR / f"{_exp_name(exp)}.csv"
+
+
+def store_path(study: str, exp: str | int, store_dir: Path = STORE_DIR) -> Path:
+    return Path(store_dir) / f"study={study}" / f"exp={_exp_name(exp)}" / PART_NAME
+
+
+def is_lfs_pointer(path: Path) -> bool:
+    """True if *path* is a Git LFS pointer file, not the real content."""
+    with open(path, "rb") as f:
+        return f.read(len(LFS_POINTER_SIGNATURE)) == LFS_POINTER_SIGNATURE
+
+
+def sniff_delimiter(path: Path) -> str:
+    """Guess the delimiter of a CSV from its first 4 KB (defaults to ',')."""
+    with open(path, encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def read_header(path: Path, delimiter: str) -> list[str]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def source_info(path: Path) -> dict:
+    """What identifies the CSV a stored file was converted from."""
+    stat = Path(path).stat()
+    return {"name": Path(path).name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _declared(names: list[str]) -> dict[str, str | None]:
+    types = column_types()
+    return {name: types.get(name) for name in names}
+
+
+def is_current(source: Path, path: Path) -> bool:
+    """True if *path* holds the store's conversion of the CSV *source* as it
+    is now, under the current CODEBOOK types."""
+    import pyarrow.parquet as pq
+
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+        stored = json.loads(metadata[_METADATA_KEY])
+    except (OSError, ValueError, KeyError):
+        return False
+    if stored.get("version") != FORMAT_VERSION or stored.get("source") != source_info(source):
+        return False
+    return stored.get("declared") == _declared(read_header(source, sniff_delimiter(source)))
+
+
+def _read_options(delimiter: str, names: list[str]):
+    """CSV reader options reading every column as strings, with pandas'
+    missing values."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    return {
+        "read_options": pacsv.ReadOptions(block_size=BLOCK_SIZE),
+        "parse_options": pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+        "convert_options": pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in names},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    }
+
+
+def _fits(column, kind: str) -> bool:
+    """True if every value of the string *column* can be stored as *kind*."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        if kind == "bool":
+            lower = pc.utf8_lower(pc.utf8_trim_whitespace(column))
+            valid = pc.is_in(lower, value_set=pa.array(TRUE_VALUES + FALSE_VALUES))
+            return pc.all(pc.or_kleene(valid, pc.is_null(column))).as_py() is not False
+        if kind == "int":
+            pc.cast(column, pa.int64())
+        elif kind == "float_int":
+            # Whole numbers written as floats, e.g. "1.0"
+            pc.cast(pc.cast(column, pa.float64()), pa.int64())
+        elif kind == "float":
+            pc.cast(column, pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return False
+    return True
+
+
+def infer_kinds(path: Path, delimiter: str, names: list[str]) -> dict[str, set[str]]:
+    """Every kind (``bool``, ``int``, ``float_int``, ``float``, ``string``)
+    that holds all values of each column of the CSV *path*. Booleans are
+    only checked for columns declared boolean."""
+    import pyarrow.csv as pacsv
+
+    declared = _declared(names)
+    kinds = {
+        name: {"int", "float_int", "float", "string"} | ({"bool"} if declared[name] == "boolean" else set())
+        for name in names
+    }
+    with pacsv.open_csv(path, **_read_options(delimiter, names)) as reader:
+        for batch in reader:
+            for name, column in zip(batch.schema.names, batch.columns):
+                kinds[name] = {kind for kind in kinds[name] if _fits(column, kind)}
+    return kinds
+
+
+def column_plan(path: Path, names: list[str], kinds: dict[str, set[str]]) -> tuple[dict[str, str], list[str]]:
+    """How each column is stored, and warnings about columns whose values
+    do not fit their CODEBOOK type.
+
+    A column gets its declared type if all values fit it, else (like an
+    undeclared column) the first of int, float and string that they fit.
+    """
+    allowed = {"integer": ("int", "float_int"), "number": ("float",), "boolean": ("bool",), "string": ("string",)}
+    plan, warnings = {}, []
+    for name, declared in _declared(names).items():
+        fitting = [kind for kind in allowed.get(declared, ()) if kind in kinds[name]]
+        if declared and not fitting:
+            warnings.append(f"{path.name}: column {name!r} is declared {declared} but holds other values")
+        plan[name] = (fitting or [kind for kind in ("int", "float", "string") if kind in kinds[name]])[0]
+    return plan, warnings
+
+
+def _arrow_type(kind: str):
+    import pyarrow as pa
+
+    return {
+        "int": pa.int64(), "float_int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+        "string": pa.dictionary(pa.int32(), pa.string()),
+    }[kind]
+
+
+def _convert_column(column, kind: str):
+    """A string column from the CSV reader as stored under *kind*, which
+    :func:`infer_kinds` found all its values fit."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if kind == "string":
+        return pc.dictionary_encode(column)
+    if kind == "float_int":
+        return pc.cast(pc.cast(column, pa.float64()), pa.int64())
+    if kind == "bool":
+        lower = pc.utf8_lower(pc.utf8_trim_whitespace(column))
+        values = pc.is_in(lower, value_set=pa.array(TRUE_VALUES))
+        return pc.if_else(pc.is_null(column), pa.scalar(None, pa.bool_()), values)
+    return pc.cast(column, _arrow_type(kind))
+
+
+def convert_csv(source: Path, path: Path) -> dict:
+    """Convert the CSV *source* into the Parquet file *path*.
+
+    The file is written next to *path* and moved into place when complete.
+    Returns the number of rows, row groups and bytes written, and warnings
+    about columns that do not hold their CODEBOOK type.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    source, path = Path(source), Path(path)
+    if is_lfs_pointer(source):
+        raise ValueError(f"{source.name} is a Git LFS pointer file; run 'git lfs pull' first")
+    delimiter = sniff_delimiter(source)
+    names = read_header(source, delimiter)
+    plan, warnings = column_plan(source, names, infer_kinds(source, delimiter, names))
+    metadata = {"version": FORMAT_VERSION, "source": source_info(source), "declared": _declared(names)}
+    schema = pa.schema(
+        [pa.field(name, _arrow_type(plan[name])) for name in names],
+        metadata={_METADATA_KEY: json.dumps(metadata)},
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".part")
+    n_rows = n_groups = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+
+            def write(table):
+                nonlocal n_rows, n_groups
+                # Batches bring dictionaries of their own; merge them per group
+                writer.write_table(table.unify_dictionaries().combine_chunks(), row_group_size=ROW_GROUP_ROWS)
+                n_rows += table.num_rows
+                n_groups += 1
+
+            pending = schema.empty_table()
+            with pacsv.open_csv(source, **_read_options(delimiter, names)) as reader:
+                for batch in reader:
+                    columns = [
+                        _convert_column(column, plan[name])
+                        for name, column in zip(batch.schema.names, batch.columns)
+                    ]
+                    pending = pa.concat_tables([pending, pa.Table.from_arrays(columns, schema=schema)])
+                    while pending.num_rows >= ROW_GROUP_ROWS:
+                        write(pending.slice(0, ROW_GROUP_ROWS))
+                        pending = pending.slice(ROW_GROUP_ROWS)
+            if pending.num_rows:
+                write(pending)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return {"rows": n_rows, "row_groups": n_groups, "bytes": path.stat().st_size, "warnings": warnings}
+
+
+def _column_kind(series: pd.Series) -> str:
+    """``boolean``, ``number`` or ``string``: what the store holds *series*
+    as."""
+    values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return "number"
+    # Booleans with missing values come from pyarrow as objects
+    return "boolean" if pd.api.types.infer_dtype(values, skipna=True) == "boolean" else "string"
+
+
+def _value_kind(value) -> str | None:
+    """The column kind (see :func:`_column_kind`) a filter *value* compares
+    with, or None for other values."""
+    if pd.api.types.is_bool(value):
+        return "boolean"
+    if pd.api.types.is_number(value):
+        return "number"
+    return "string" if isinstance(value, str) else None
+
+
+def _cast_values(values, kind: str, column: str) -> list:
+    """The values of an ``in`` filter on a *kind* column cast to that kind,
+    as pyarrow casts them; raises TypeError for values it cannot cast, or
+    of more than one kind (which pyarrow cannot put in one array)."""
+    kinds = {_value_kind(value) for value in values} - {None}
+    if len(kinds) > 1:
+        raise TypeError(f"filter on {column!r}: values of more than one kind ({', '.join(sorted(kinds))})")
+    cast = []
+    for value in values:
+        value_kind = _value_kind(value)
+        try:
+            if value_kind == kind or value_kind is None:
+                cast.append(value)
+            elif kind == "number" and value_kind == "boolean":
+                cast.append(int(value))
+            elif kind == "number" and value_kind == "string":
+                cast.append(float(value))
+            elif kind == "boolean" and value_kind == "number":
+                cast.append(bool(value))
+            elif kind == "boolean" and value.strip().lower() in TRUE_VALUES + FALSE_VALUES:
+                cast.append(value.strip().lower() in TRUE_VALUES)
+            else:
+                raise ValueError
+        except ValueError:
+            raise TypeError(f"filter on {column!r}: cannot cast {value!r} to the column's {kind}s") from None
+    return cast
+
+
+def filter_frame(df: pd.DataFrame, filters) -> pd.DataFrame:
+    """The rows of *df* that pass *filters*, in pyarrow's format: a list of
+    ``(column, op, value)`` tuples that must all hold, or a list of such
+    lists of which one must.
+
+    The semantics are pyarrow's, so that a filter selects the same rows
+    from the CSV as from the store: missing values pass no test, comparing
+    a column with a value of another kind (a number with a string, say)
+    raises TypeError, and the values of ``in`` are cast to the column's
+    kind first.
+    """
+    if not filters:
+        return df
+    groups = filters if isinstance(filters[0], list) else [filters]
+    keep = pd.Series(False, index=df.index)
+    for group in groups:
+        passes = pd.Series(True, index=df.index)
+        for column, op, value in group:
+            series = df[column]
+            kind = _column_kind(series)
+            if op in ("in", "not in"):
+                test = series.isin(_cast_values(list(value), kind, column))
+                test = ~test if op == "not in" else test
+            elif op in _FILTER_OPS:
+                value_kind = _value_kind(value)
+                if value_kind is not None and value_kind != kind:
+                    raise TypeError(
+                        f"filter ({column!r}, {op!r}, {value!r}): cannot compare a {kind} column "
+                        f"with a {value_kind}"
+                    )
+                if isinstance(series.dtype, pd.CategoricalDtype) and op not in ("=", "==", "!="):
+                    # Unordered categoricals only support equality
+                    series = series.astype(series.cat.categories.dtype)
+                test = _FILTER_OPS[op](series, value)
+            else:
+                raise ValueError(f"unknown filter operator {op!r}")
+            passes &= test & series.notna()
+        keep |= passes
+    return df[keep.to_numpy()]
+
+
+def read_csv(
+    source: Path,
+    columns: list[str] | None = None,
+    filters=None,
+    *,
+    dtype: dict | None = None,
+    **options,
+) -> pd.DataFrame:
+    """The CSV *source* read with pandas, with the same *columns* and
+    *filters* semantics as :func:`load_processed`.
+
+    *dtype* is applied while parsing, to the columns the file has. If a
+    column's values do not fit its dtype, it is read with pandas' own type
+    instead. Columns declared boolean in CODEBOOK.csv become booleans, as
+    in the store (see :func:`_declared_booleans`). Other *options* go to
+    ``pd.read_csv``.
+    """
+    delimiter = sniff_delimiter(source)
+    header = read_header(source, delimiter)
+    usecols = None
+    if columns is not None:
+        groups = filters if filters and isinstance(filters[0], list) else [filters or []]
+        needed = set(columns) | {column for group in groups for column, _, _ in group}
+        usecols = [name for name in header if name in needed]
+    dtype = {name: type_ for name, type_ in (dtype or {}).items() if name in header}
+    # round_trip parses floats exactly, as pyarrow does
+    options = {"sep": delimiter, "usecols": usecols, "float_precision": "round_trip", **options}
+    try:
+        df = pd.read_csv(source, dtype=dtype, **options)
+    except (TypeError, ValueError, OverflowError):
+        # Categoricals never fail to parse; convert the other columns one by one
+        df = pd.read_csv(source, dtype={k: v for k, v in dtype.items() if v == "category"}, **options)
+        df = _astype_where_possible(df, dtype)
+    for name, type_ in dtype.items():
+        if type_ == "category" and name in df:
+            df[name] = _numeric_categories(df[name])
+    df = filter_frame(_declared_booleans(df), filters)
+    # pyarrow converts after filtering, so booleans left without missing
+    # values are bool
+    df = _declared_booleans(df)
+    if columns is not None:
+        df = df[list(columns)]
+    return df.reset_index(drop=True)
+
+
+def read_processed(source: Path, columns: list[str] | None = None, filters=None, *, dtype=None, **options):
+    """The CSV *source* read like :func:`read_csv`, with the compact
+    CODEBOOK dtypes (``codebook.compact_dtypes``) applied while parsing.
+
+    *dtype* adds or overrides entries, e.g. ``{"rt": float}`` to keep RTs
+    at full precision.
+    """
+    return read_csv(source, columns, filters, dtype={**compact_dtypes(), **(dtype or {})}, **options)
+
+
+def _numeric_categories(series: pd.Series) -> pd.Series:
+    """*series* with categories parsed as numbers if they all are numbers.
+
+    ``pd.read_csv`` reads categories as strings, so that participant 10
+    would sort before participant 2 and not compare equal to 10.
+    """
+    categories = series.cat.categories
+    if categories.dtype.kind in "biuf":
+        return series
+    try:
+        numbers = pd.to_numeric(categories)
+    except (TypeError, ValueError):
+        return series
+    series = series.cat.rename_categories(numbers)
+    return series.cat.reorder_categories(numbers.sort_values())
+
+
+def _declared_booleans(df: pd.DataFrame) -> pd.DataFrame:
+    """*df* with the columns declared boolean in CODEBOOK.csv as the store
+    holds them, if all their values are booleans: ``bool``, or objects
+    with None for missing values (as pyarrow converts them).
+
+    pandas reads ``0``/``1`` columns as numbers, which filters would then
+    compare differently.
+    """
+    for name, type_ in column_types().items():
+        if type_ != "boolean" or name not in df or pd.api.types.is_bool_dtype(df[name].dtype):
+            continue
+        present = df[name].dropna()
+        if len(present) == len(df) and pd.api.types.infer_dtype(present) == "boolean":
+            df[name] = present.astype(bool)
+            continue
+        text = present.astype(str).str.strip().str.lower()
+        if not text.isin(TRUE_VALUES + FALSE_VALUES).all():
+            continue
+        values = text.isin(TRUE_VALUES)
+        if len(present) < len(df):
+            values = values.astype(object).reindex(df.index).where(df[name].notna(), None)
+        df[name] = values
+    return df
+
+
+def _astype_where_possible(df: pd.DataFrame, dtype: dict) -> pd.DataFrame:
+    """*df* with each column of *dtype* converted if its values fit."""
+    for name, type_ in dtype.items():
+        if name not in df:
+            continue
+        try:
+            df[name] = df[name].astype(type_)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return df
+
+
+def load_processed(
+    study: str,
+    exp: str | int,
+    columns: list[str] | None = None,
+    filters=None,
+    *,
+    compact: bool = False,
+    store_dir: Path | None = STORE_DIR,
+) -> pd.DataFrame:
+    """Rows of ``<study>/processed_data/<exp>.csv`` as a frame, in file order.
+
+    *exp* is ``"exp1"`` or ``1``. *columns* selects columns (all by
+    default); *filters* selects rows (see :func:`filter_frame`). Both are
+    applied while reading from the store, so only the columns asked for,
+    and row groups whose statistics do not rule them out, are read.
+    ``compact=True`` gives the columns their compact CODEBOOK dtypes (see
+    :func:`read_processed`). ``store_dir=None`` always reads the CSV.
+    """
+    source = csv_path(study, exp)
+    path = store_path(study, exp, store_dir) if store_dir is not None else None
+    if path is not None and has_pyarrow() and path.exists() and is_current(source, path):
+        import pyarrow.parquet as pq
+
+        df = pq.read_table(path, columns=columns, filters=filters or None).to_pandas()
+        return _astype_where_possible(df, compact_dtypes()) if compact else df
+    if compact:
+        return read_processed(source, columns, filters)
+    return read_csv(source, columns, filters)
+
+
+def _exp_name(exp: str | int) -> str:
+    return f"exp{exp}" if isinstance(exp, int) else exp
@@ -0,0 +1,177 @@
+"""
+Declarative prompt templates.
+
+Most generators hand-code the same things: an instruction block, a trial
+line, a helper that prints missing ratings as ``NA`` or maps a response code
+to its (randomised) key, and ``<<...>>`` around the participant's answers.
+A :class:`PromptTemplate` describes these as data instead:
+
+- ``instructions``: a template filled once per participant from their
+  first row (e.g. with their response keys), or plain text;
+- ``trial``: a template for one trial line;
+- ``fields``: how a field is filled, as a :class:`Field` (column, format
+  spec, cast, labels for codes, text for missing values, ``<<...>>``
+  marker, response keys) or a column name.
+
+Templates are ``str.format`` strings, parsed once and cached
+(``render.compile_template``), and every field is formatted for the whole
+column at once, so rendering costs no Python call per field per trial.
+Fields that are neither declared nor passed as columns to the render
+methods are read from the frame's column of the same name.
+
+Like ``render``, this module needs pandas and numpy.
+
+Usage:
+    from psychling.templates import Field, PromptTemplate
+
+    TEMPLATE = PromptTemplate(
+        instructions="Press {word_key} for words and {nonword_key} for nonwords.\\n\\n",
+        trial="Trial {trial}: {stimulus}. You press {response}.\\n",
+        fields={
+            "response": Field("response", choices=["nonword_key", "word_key"], missing="nothing", marked=True),
+        },
+    )
+    keys = assign_keys("study_exp1", df["participant_id"], n=2)
+    df = df.assign(word_key=keys[:, 0], nonword_key=keys[:, 1])
+    texts = TEMPLATE.render(df, bounds, trial=group_positions(bounds) + 1)
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from psychling.render import compile_template, format_column, render_lines
+
+
+class Field:
+    """How one template field is filled from the column *column*.
+
+    Values are converted in this order: *cast* (a dtype, e.g. ``int`` to
+    print ratings of ``3.0`` as ``3``), *labels* (a dict from value to
+    text), *choices* (column names: value ``k`` is replaced by the row's
+    entry in column ``choices[k]``, e.g. a participant's response keys),
+    upper-casing with *upper*, then formatting with *spec* as an f-string
+    field would. Missing values become *missing*, or print as ``nan`` if it
+    is None. ``marked=True`` puts the text between ``<<`` and ``>>``.
+    """
+
+    def __init__(
+        self,
+        column: str,
+        spec: str = "",
+        *,
+        cast=None,
+        labels: dict | None = None,
+        choices: list[str] | None = None,
+        upper: bool = False,
+        missing: str | None = None,
+        marked: bool = False,
+    ):
+        self.column = column
+        self.spec = spec
+        self.cast = cast
+        self.labels = labels
+        self.choices = choices
+        self.upper = upper
+        self.missing = missing
+        self.marked = marked
+
+    def format(self, df: pd.DataFrame) -> np.ndarray:
+        """The field's text for every row of *df*, as an object array."""
+        values = df[self.column].reset_index(drop=True)
+        present = np.ones(len(values), dtype=bool)
+        if self.missing is not None:
+            present = values.notna().to_numpy()
+        text = np.empty(len(values), dtype=object)
+        text[present] = self._convert(values[present], df.iloc[present])
+        text[~present] = self.missing
+        if self.marked:
+            text = np.fromiter((f"<<{value}>>" for value in text), dtype=object, count=len(text))
+        return text
+
+    def _convert(self, values: pd.Series, rows: pd.DataFrame) -> list[str]:
+        if self.cast is not None:
+            values = values.astype(self.cast)
+        if self.labels is not None:
+            values = values.map(self.labels)
+        if self.choices is not None:
+            options = rows[self.choices].to_numpy(dtype=object)
+            values = pd.Series(options[np.arange(len(options)), values.to_numpy().astype(int)])
+        if self.upper:
+            values = values.str.upper()
+        return format_column(values, self.spec)
+
+
+class PromptTemplate:
+    """Instructions and trial lines of a prompt, rendered column-wise.
+
+    A participant's prompt is their instructions, their trial lines joined
+    with *sep*, and *suffix*.
+    """
+
+    def __init__(
+        self,
+        instructions: str,
+        trial: str,
+        fields: dict | None = None,
+        sep: str = "",
+        suffix: str = "",
+    ):
+        self.instructions = instructions
+        self.trial = trial
+        self.fields = dict(fields or {})
+        self.sep = sep
+        self.suffix = suffix
+        # Parse both templates now; later renders hit the cache
+        compile_template(instructions)
+        compile_template(trial)
+
+    def trial_lines(self, df: pd.DataFrame, **columns) -> np.ndarray:
+        """One rendered trial line per row of *df*.
+
+        *columns* fill fields with values computed by the caller (a column
+        per row of *df*, or one string for all rows), e.g. trial numbers.
+        """
+        return self._render(self.trial, df, columns)
+
+    def instruction_texts(self, df: pd.DataFrame, bounds: np.ndarray, **columns) -> list[str]:
+        """The instructions of every group of *df* (offsets *bounds*), filled
+        from the group's first row; *columns* are per row of *df*."""
+        n_groups = len(bounds) - 1
+        if all(name is None for _, name, _ in compile_template(self.instructions)):
+            return [self.instructions] * n_groups
+        firsts = bounds[:-1]
+        first_columns = {
+            name: value if isinstance(value, str) else np.asarray(value, dtype=object)[firsts]
+            for name, value in columns.items()
+        }
+        return self._render(self.instructions, df.iloc[firsts], first_columns).tolist()
+
+    def render(self, df: pd.DataFrame, bounds: np.ndarray, **columns):
+        """Yield the prompt text of every group of *df*, in order.
+
+        *columns* may fill fields of either template.
+        """
+        lines = self.trial_lines(df, **_used(self.trial, columns)).tolist()
+        instructions = self.instruction_texts(df, bounds, **_used(self.instructions, columns))
+        for text, start, stop in zip(instructions, bounds[:-1].tolist(), bounds[1:].tolist()):
+            yield text + self.sep.join(lines[start:stop]) + self.suffix
+
+    def _render(self, template: str, df: pd.DataFrame, columns: dict) -> np.ndarray:
+        values = {}
+        for _, name, _ in compile_template(template):
+            if name is None or name in values:
+                continue
+            if name in columns:
+                values[name] = columns[name]
+                continue
+            field = self.fields.get(name, name)
+            values[name] = field.format(df) if isinstance(field, Field) else df[field]
+        return render_lines(template, **values)
+
+
+def _used(template: str, columns: dict) -> dict:
+    """The entries of *columns* that *template* has fields for."""
+    names = {name for _, name, _ in compile_template(template)}
+    return {name: value for name, value in columns.items() if name in names}
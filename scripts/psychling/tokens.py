@@ -0,0 +1,253 @@
+"""
+Token counting against the README's 32K-tokens-per-participant limit.
+
+Counts use the cl100k_base byte-pair encoding, for the validator and for
+the generators that split sessions with ``psychling.packing``. Its
+vocabulary is vendored in ``data/`` so counting never touches the network. When the ``tiktoken`` package is installed it
+does the encoding; otherwise a pure-Python BPE over the same vocabulary
+produces the same tokens.
+
+Usage:
+    from psychling.tokens import count_tokens, TOKEN_LIMIT
+
+    n = count_tokens(text)
+    if n > TOKEN_LIMIT:
+        ...
+"""
+
+from __future__ import annotations
+
+import base64
+import collections
+import heapq
+import re
+import unicodedata
+from pathlib import Path
+
+# Per-participant limit from README.md
+TOKEN_LIMIT = 32_000
+
+ENCODING_NAME = "cl100k_base"
+VOCAB_PATH = Path(__file__).resolve().parent / "data" / f"{ENCODING_NAME}.tiktoken"
+
+# cl100k_base pre-tokenisation pattern, as shipped with tiktoken
+CL100K_PATTERN = (
+    r"'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}"
+    r"| ?[^\s\p{L}\p{N}]++[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"
+)
+
+# Unicode White_Space, which is what \s means in tiktoken's pattern (the
+# standard library's \s also matches the separators \x1c-\x1f)
+_WHITESPACE = "\t\n\x0b\x0c\r \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+# Highest code point of category Nl/No (letter-like and other numbers)
+_MAX_OTHER_NUMBER = 0x1F10C
+# Faster form of the pattern, exact for text without \x1c-\x1f and Nl/No
+# characters (i.e. virtually every prompt)
+_SIMPLE_PATTERN = (
+    r"'(?i:[sdmt]|ll|ve|re)|(?:[^\r\n\w]|_)?+[^\W\d_]+|\d{1,3}"
+    r"| ?(?:[^\s\w]|_)++[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"
+)
+
+SPECIAL_TOKENS = {
+    "<|endoftext|>": 100257,
+    "<|fim_prefix|>": 100258,
+    "<|fim_middle|>": 100259,
+    "<|fim_suffix|>": 100260,
+    "<|endofprompt|>": 100276,
+}
+
+# Number of distinct pre-tokenised pieces whose encoding is remembered
+PIECE_CACHE_SIZE = 1 << 18
+
+# Edges of the token-count histogram buckets (upper bounds, inclusive)
+HISTOGRAM_EDGES = (1_000, 2_000, 4_000, 8_000, 16_000, TOKEN_LIMIT, 64_000)
+
+
+def _other_numbers() -> list[str]:
+    r"""The Nl/No characters (e.g. "²", "½", "Ⅻ").
+
+    Python's ``\w`` covers them like letters, so they have to be carved out
+    by hand for the ``\p{L}``/``\p{N}`` distinction.
+    """
+    return [
+        chr(code) for code in range(_MAX_OTHER_NUMBER + 1)
+        if unicodedata.category(chr(code)) in ("Nl", "No")
+    ]
+
+
+def _char_class(chars: list[str]) -> str:
+    """Regex character-class body matching exactly *chars* (sorted)."""
+    ranges: list[list[int]] = []
+    for code in map(ord, chars):
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return "".join(
+        re.escape(chr(lo)) + ("-" + re.escape(chr(hi)) if hi > lo else "") for lo, hi in ranges
+    )
+
+
+def stdlib_pattern() -> str:
+    r""":data:`CL100K_PATTERN` rewritten for the standard library's ``re``.
+
+    ``\p{L}`` becomes "a word character that is not a digit, underscore or
+    other number", and ``\p{N}`` "a digit or other number".
+    """
+    ws, num = _WHITESPACE, _char_class(_other_numbers())
+    return (
+        rf"'(?i:[sdmt]|ll|ve|re)|(?:[^\r\n\w]|_)?+[^\W\d_{num}]+|[\d{num}]{{1,3}}"
+        rf"| ?(?:[^{ws}\w]|_)++[\r\n]*|[{ws}]*[\r\n]|[{ws}]+(?![^{ws}])|[{ws}]+"
+    )
+
+
+def load_ranks(path: Path = VOCAB_PATH) -> dict[bytes, int]:
+    """Read a ``.tiktoken`` vocabulary: one ``<base64 token> <rank>`` per line."""
+    ranks = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+class BpeTokenizer:
+    """Byte-level BPE encoder over a tiktoken vocabulary, in pure Python.
+
+    Text is split into pieces with the pre-tokenisation pattern, and each
+    piece is merged pair by pair, lowest rank first, as tiktoken does.
+    Prompts repeat the same words over and over, so encoded pieces are
+    cached; a prompt then costs little more than the regex split.
+    """
+
+    def __init__(self, ranks: dict[bytes, int]):
+        self.ranks = ranks
+        self.pattern = re.compile(stdlib_pattern())
+        self._simple = re.compile(_SIMPLE_PATTERN)
+        self._needs_full = frozenset("\x1c\x1d\x1e\x1f").union(_other_numbers())
+        self._cache: dict[str, list[int]] = {}
+
+    def encode_ordinary(self, text: str) -> list[int]:
+        """Token ids of *text*; special-token strings are encoded as plain text."""
+        tokens: list[int] = []
+        for piece in self._split(text):
+            tokens.extend(self._piece_ids(piece))
+        return tokens
+
+    def count(self, text: str) -> int:
+        pieces = collections.Counter(self._split(text))
+        return sum(len(self._piece_ids(piece)) * n for piece, n in pieces.items())
+
+    def _split(self, text: str) -> list[str]:
+        if not text.isascii() and not self._needs_full.isdisjoint(text):
+            return self.pattern.findall(text)
+        return self._simple.findall(text)
+
+    def _piece_ids(self, piece: str) -> list[int]:
+        ids = self._cache.get(piece)
+        if ids is None:
+            ids = self._encode_piece(piece.encode("utf-8"))
+            if len(self._cache) >= PIECE_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[piece] = ids
+        return ids
+
+    def _encode_piece(self, piece: bytes) -> list[int]:
+        ranks = self.ranks
+        token = ranks.get(piece)
+        if token is not None:
+            return [token]
+
+        # Parts are linked by their start offsets: end[i] is where the part
+        # starting at i ends, prev[i] the start of the part before it.
+        n = len(piece)
+        end = list(range(1, n + 1))
+        prev = list(range(-1, n - 1))
+        alive = [True] * n
+        heap = []
+        for i in range(n - 1):
+            rank = ranks.get(piece[i:i + 2])
+            if rank is not None:
+                heap.append((rank, i, i + 1, i + 2))
+        heapq.heapify(heap)
+
+        while heap:
+            rank, left, mid, stop = heapq.heappop(heap)
+            # Skip pairs invalidated by an earlier merge
+            if not (alive[left] and alive[mid] and end[left] == mid and end[mid] == stop):
+                continue
+            end[left] = stop
+            alive[mid] = False
+            if stop < n:
+                prev[stop] = left
+                rank = ranks.get(piece[left:end[stop]])
+                if rank is not None:
+                    heapq.heappush(heap, (rank, left, stop, end[stop]))
+            before = prev[left]
+            if before >= 0:
+                rank = ranks.get(piece[before:stop])
+                if rank is not None:
+                    heapq.heappush(heap, (rank, before, left, stop))
+
+        ids = []
+        i = 0
+        while i < n:
+            ids.append(ranks[piece[i:end[i]]])
+            i = end[i]
+        return ids
+
+
+_encoder = None
+
+
+def get_encoder():
+    """The process-wide cl100k_base encoder, loaded on first use.
+
+    A ``tiktoken.Encoding`` built from the vendored vocabulary when tiktoken
+    is installed, else a :class:`BpeTokenizer`. Both provide
+    ``encode_ordinary(text)``.
+    """
+    global _encoder
+    if _encoder is None:
+        ranks = load_ranks()
+        try:
+            import tiktoken
+        except ImportError:
+            _encoder = BpeTokenizer(ranks)
+        else:
+            _encoder = tiktoken.Encoding(
+                name=ENCODING_NAME,
+                pat_str=CL100K_PATTERN,
+                mergeable_ranks=ranks,
+                special_tokens=SPECIAL_TOKENS,
+            )
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Number of cl100k_base tokens in *text*."""
+    encoder = get_encoder()
+    if isinstance(encoder, BpeTokenizer):
+        return encoder.count(text)
+    return len(encoder.encode_ordinary(text))
+
+
+def histogram_bucket(n_tokens: int) -> int:
+    """Index into :data:`HISTOGRAM_EDGES` of the bucket holding *n_tokens*
+    (``len(HISTOGRAM_EDGES)`` for counts beyond the last edge)."""
+    for i, edge in enumerate(HISTOGRAM_EDGES):
+        if n_tokens <= edge:
+            return i
+    return len(HISTOGRAM_EDGES)
+
+
+def histogram_labels() -> list[str]:
+    """Human-readable labels of the histogram buckets, e.g. ``"1K–2K"``."""
+    def k(n: int) -> str:
+        return f"{n // 1000}K"
+
+    labels = [f"≤{k(HISTOGRAM_EDGES[0])}"]
+    labels += [f"{k(lo)}–{k(hi)}" for lo, hi in zip(HISTOGRAM_EDGES, HISTOGRAM_EDGES[1:])]
+    labels.append(f">{k(HISTOGRAM_EDGES[-1])}")
+    return labels
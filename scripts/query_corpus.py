@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+PsychLing-101 – Query the processed data across studies
+=======================================================
+
+Selects columns and rows from the processed data of many studies at once
+(see psychling/query.py) and writes them as one table with `study` and
+`exp` columns. Filters are pushed down to the columnar store built by
+build_store.py where it is current, and applied while reading the CSVs
+otherwise.
+
+Usage:
+    python scripts/query_corpus.py stimulus rt accuracy --where "stimulus == table"
+    python scripts/query_corpus.py stimulus rt --where "rt > 200" --where "accuracy == 1" \\
+        --studies balota2007_LDT "guenther2020*" --workers 4 --out ldt.csv
+    python scripts/query_corpus.py stimulus rt --where "stimulus in table,chair" --out items.parquet
+    python scripts/query_corpus.py response --where "condition != word" --check
+
+A --where condition is `<column> <op> <value>` with op one of
+==, !=, <, <=, >, >=, in, not in (values of `in` separated by commas).
+Values that look like numbers are compared as numbers; quote them
+('"12"') to compare as strings. All conditions must hold.
+
+--check runs the query both from the store and from the CSVs alone, and
+lists the files for which the two differ instead of writing a result.
+
+Exit codes:
+    0  – the query ran (files that could not be read are listed), or
+         with --check, both ways of reading agree
+    1  – with --check, the store and the CSVs give different results
+    2  – the arguments are invalid
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from psychling.query import compare_paths, query
+from psychling.store import STORE_DIR
+
+_CONDITION = re.compile(r"^\s*(\S+)\s+(==|!=|<=|>=|<|>|not in|in)\s+(.*?)\s*$")
+
+
+def parse_value(text: str):
+    """*text* as a number if it looks like one, else as a string without
+    surrounding quotes."""
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_condition(text: str) -> tuple:
+    """A --where condition as a ``(column, op, value)`` filter."""
+    match = _CONDITION.match(text)
+    if match is None:
+        raise ValueError(f"cannot parse condition {text!r} (expected '<column> <op> <value>')")
+    column, op, value = match.groups()
+    if op in ("in", "not in"):
+        return column, op, [parse_value(item.strip()) for item in value.split(",")]
+    return column, op, parse_value(value)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Query the processed data of PsychLing-101 studies.",
+    )
+    parser.add_argument("columns", nargs="+", help="columns to select")
+    parser.add_argument(
+        "--where", action="append", default=[], metavar="CONDITION",
+        help="keep rows where CONDITION holds, e.g. \"rt > 200\" (repeatable)",
+    )
+    parser.add_argument(
+        "--studies", nargs="+", metavar="STUDY",
+        help="study folders or glob patterns to query (default: all)",
+    )
+    parser.add_argument(
+        "--out", type=Path, metavar="PATH",
+        help="write the result to PATH (.csv or .parquet) instead of printing it as CSV",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="read files in N worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--store", type=Path, default=STORE_DIR, metavar="DIR",
+        help="root of the columnar store (default: build/processed/)",
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="compare the result from the store with the one from the CSVs instead of writing it",
+    )
+    args = parser.parse_args(argv)
+    try:
+        args.filters = [parse_condition(condition) for condition in args.where]
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.check and args.out is not None:
+        parser.error("--check cannot be combined with --out")
+    if args.out is not None and args.out.suffix not in (".csv", ".parquet"):
+        parser.error("--out must end in .csv or .parquet")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    return args
+
+
+def check(args: argparse.Namespace) -> bool:
+    """Print where the store and the CSVs disagree on the query; returns
+    whether they agree."""
+    start = time.perf_counter()
+    differences = compare_paths(
+        args.columns, args.filters or None, args.studies, workers=args.workers, store_dir=args.store
+    )
+    for difference in differences:
+        print(difference)
+    verdict = "differ in" if differences else "agree on"
+    print(
+        f"The store and the CSVs {verdict} this query ({len(differences)} file(s) differ) "
+        f"in {time.perf_counter() - start:.1f}s",
+        file=sys.stderr,
+    )
+    return not differences
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.check:
+        sys.exit(0 if check(args) else 1)
+    start = time.perf_counter()
+    result = query(args.columns, args.filters or None, args.studies, workers=args.workers, store_dir=args.store)
+    elapsed = time.perf_counter() - start
+
+    if args.out is None:
+        result.to_csv(sys.stdout, index=False)
+    elif args.out.suffix == ".parquet":
+        result.to_parquet(args.out, index=False)
+    else:
+        result.to_csv(args.out, index=False)
+
+    # The summary goes to stderr, so stdout stays a clean CSV
+    n_files = result[["study", "exp"]].drop_duplicates().shape[0] if len(result) else 0
+    print(f"{len(result):,} rows from {n_files} file(s) in {elapsed:.1f}s", file=sys.stderr)
+    for study, exp, reason in result.attrs["skipped"]:
+        print(f"  skipped {study}/{exp}: {reason}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+PsychLing-101 – Random access to prompts.jsonl.zip
+==================================================
+
+Rewrites each study's prompts.jsonl.zip with deflate blocks that each
+start afresh, and writes prompts.offsets.json next to it, locating every
+block and every participant's records (see psychling/seekable.py). The
+JSONL in the archive stays byte-for-byte the same, and the archive is
+still an ordinary ZIP; with the sidecar, PromptReader fetches one
+participant without inflating the rest. Archives whose sidecar is current
+are skipped. Generators can write this layout directly with
+PromptArchiveWriter(..., seekable=True).
+
+Usage:
+    python scripts/seekable_prompts.py <folder> [<folder2> ...]
+    python scripts/seekable_prompts.py --all                # every dataset folder
+    python scripts/seekable_prompts.py --all --workers 4    # deflate in 4 processes
+    python scripts/seekable_prompts.py <folder> --force     # rewrite even if current
+    python scripts/seekable_prompts.py <folder> --show EXPERIMENT PARTICIPANT
+
+Exit codes:
+    0  – every requested archive is seekable
+    1  – one or more archives could not be read
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+from psychling.seekable import PromptReader, convert_archive, load_offsets
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PROMPTS_NAME = "prompts.jsonl.zip"
+
+
+def detect_all_folders() -> list[str]:
+    """Dataset folders in the repo root that have a prompts archive."""
+    return [
+        item.name for item in sorted(REPO_ROOT.iterdir())
+        if item.is_dir() and not item.name.startswith(".") and (item / PROMPTS_NAME).exists()
+    ]
+
+
+def show(zip_path: Path, experiment: str, participant: str) -> bool:
+    """Print one participant's records; returns whether there were any."""
+    start = time.perf_counter()
+    reader = PromptReader(zip_path)
+    records = reader.participant_records(experiment, participant)
+    elapsed = time.perf_counter() - start
+    for record in records:
+        print(json.dumps(record, ensure_ascii=False))
+    how = "with" if reader.indexed else "without"
+    print(f"{len(records)} record(s) in {elapsed * 1000:.1f} ms ({how} prompts.offsets.json)", file=sys.stderr)
+    return bool(records)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Make PsychLing-101 prompt archives seekable by participant.",
+    )
+    parser.add_argument("folders", nargs="*", help="dataset folders to convert")
+    parser.add_argument("--all", action="store_true", help="convert every dataset folder")
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="deflate in N worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rewrite archives even if their sidecar is current"
+    )
+    parser.add_argument(
+        "--show", nargs=2, metavar=("EXPERIMENT", "PARTICIPANT"),
+        help="print the records of one participant of the given folder instead",
+    )
+    args = parser.parse_args(argv)
+    if args.show is not None and (args.all or len(args.folders) != 1):
+        parser.error("--show needs exactly one folder")
+    if args.all and args.folders:
+        parser.error("folder names cannot be combined with --all")
+    if not args.all and not args.folders:
+        parser.error("give dataset folders or --all")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    return args
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.show is not None:
+        sys.exit(0 if show(REPO_ROOT / args.folders[0] / PROMPTS_NAME, *args.show) else 1)
+    folder_names = detect_all_folders() if args.all else args.folders
+
+    failed = []
+    for name in folder_names:
+        zip_path = REPO_ROOT / name / PROMPTS_NAME
+        try:
+            if not args.force and load_offsets(zip_path) is not None:
+                print(f"{name}: up to date")
+                continue
+            start = time.perf_counter()
+            stats = convert_archive(zip_path, args.workers)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as exc:
+            # Archives not fetched from LFS are pointer files, not zips
+            print(f"{name}: ERROR {exc}")
+            failed.append(name)
+            continue
+        change = stats["size_after"] / stats["size_before"] - 1
+        print(
+            f"{name}: {stats['n_participants']:,} participants, "
+            f"{stats['size_before'] / 1e6:,.1f} -> {stats['size_after'] / 1e6:,.1f} MB ({change:+.1%}) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+    if failed:
+        print(f"\nCould not convert {len(failed)} folder(s): {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
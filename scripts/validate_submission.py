@@ -10,6 +10,11 @@ Usage:
     python scripts/validate_submission.py <folder> [<folder2> ...]
     python scripts/validate_submission.py --changed   # auto-detect from git diff
     python scripts/validate_submission.py --all       # validate every dataset folder
+    python scripts/validate_submission.py --all --jobs 4   # validate in 4 processes
+    python scripts/validate_submission.py --all --no-cache # ignore cached results
+    python scripts/validate_submission.py <folder> --full-prompts  # check every JSONL line
+    python scripts/validate_submission.py --coverage  # README coverage numbers
+    python scripts/validate_submission.py <folder> --write-manifest  # stats for LFS-only CI
 
 Exit codes:
     0  – all checks passed (warnings may still be present)
@@ -18,16 +23,35 @@ Exit codes:
 
 from __future__ import annotations
 
+import argparse
+import collections
+import concurrent.futures
+import contextlib
 import csv
+import hashlib
 import io
 import json
 import os
+import random
 import re
 import subprocess
 import sys
+import time
 import zipfile
 from pathlib import Path
 
+from psychling.codebook import ColumnRule, column_rules, rule_errors
+from psychling.tokens import (
+    ENCODING_NAME,
+    HISTOGRAM_EDGES,
+    TOKEN_LIMIT,
+    VOCAB_PATH,
+    count_tokens,
+    get_encoder,
+    histogram_bucket,
+    histogram_labels,
+)
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -45,6 +69,14 @@ GENERATE_SCRIPT_NAMES = ["generate_prompts.py", "generate_prompts.R"]
 # Main CODEBOOK canonical header
 MAIN_CODEBOOK_HEADER = ("Recommended Column Name", "Description")
 
+# Columns of merged folders whose values knowingly depart from the main
+# CODEBOOK rules, and why; their violations are reported as warnings
+KNOWN_VALUE_EXCEPTIONS = {
+    "bonandrini2026_SPChumaneval": {"accuracy": "coded Correct/Incorrect by preprocess_data.R"},
+    "guenther2026_crosslingcommunication": {"rt": "written with decimal commas by preprocess_data.R"},
+    "saban2024_ldt": {"accuracy": "3 marks a timeout, recoded to 2 by generate_prompts.py"},
+}
+
 # Required JSONL fields (per README §3.3)
 REQUIRED_JSONL_FIELDS = {"text", "experiment", "participant_id"}
 
@@ -60,9 +92,6 @@ OPTIONAL_METADATA_FIELDS = {
     "first_language",
 }
 
-# Rough character limit for ~32K tokens
-TOKEN_CHAR_LIMIT = 100_000
-
 # Git LFS pointer signature (first line of every pointer file)
 LFS_POINTER_SIGNATURE = b"version https://git-lfs.github.com/spec/v1"
 
@@ -77,6 +106,33 @@ def is_lfs_pointer(path: Path) -> bool:
         return False
 
 
+def read_lfs_pointer(path: Path) -> dict[str, str] | None:
+    """Parse a Git LFS pointer file into its key/value pairs (version, oid, size).
+
+    Returns None if *path* is not a pointer.
+    """
+    if not is_lfs_pointer(path):
+        return None
+    fields: dict[str, str] = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            key, _, value = line.strip().partition(" ")
+            if key:
+                fields[key] = value
+    return fields
+
+
+def file_size(path: Path) -> int:
+    """Size of the real content of *path*, taken from the LFS pointer if needed."""
+    pointer = read_lfs_pointer(path)
+    if pointer is not None:
+        try:
+            return int(pointer.get("size", "0"))
+        except ValueError:
+            return 0
+    return path.stat().st_size
+
+
 # ---------------------------------------------------------------------------
 # Result collection
 # ---------------------------------------------------------------------------
@@ -98,12 +154,40 @@ class Result:
         return f"::{tag}::{self.module}: {self.message}"
 
 
+class ModuleMetrics:
+    """Resources used by one module run on one dataset folder.
+
+    ``peak_rss`` is the high-water mark of the process when the module
+    finished; a cached module only accounts for replaying its results.
+    """
+
+    def __init__(self, module: str, cached: bool = False):
+        self.module = module
+        self.cached = cached
+        self.seconds = 0.0
+        self.bytes_read = 0
+        self.rows = 0
+        self.peak_rss: int | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "module": self.module,
+            "cached": self.cached,
+            "seconds": round(self.seconds, 4),
+            "bytes_read": self.bytes_read,
+            "rows": self.rows,
+            "peak_rss": self.peak_rss,
+        }
+
+
 class ResultCollector:
     """Accumulates validation results for a dataset."""
 
     def __init__(self, folder_name: str):
         self.folder_name = folder_name
         self.results: list[Result] = []
+        self.metrics: list[ModuleMetrics] = []
+        self._active: list[ModuleMetrics] = []
 
     def error(self, module: str, msg: str):
         self.results.append(Result("ERROR", module, msg))
@@ -123,13 +207,48 @@ class ResultCollector:
     def warning_count(self) -> int:
         return sum(1 for r in self.results if r.level == "WARNING")
 
+    @contextlib.contextmanager
+    def measure(self, module: str, cached: bool = False):
+        """Time the enclosed block and record it as a :class:`ModuleMetrics`."""
+        metrics = ModuleMetrics(module, cached)
+        self._active.append(metrics)
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.seconds = time.perf_counter() - start
+            metrics.peak_rss = _peak_rss_bytes()
+            self._active.pop()
+            self.metrics.append(metrics)
+
+    def record_io(self, n_bytes: int = 0, n_rows: int = 0):
+        """Add bytes read and rows/lines processed to the module being measured."""
+        if self._active:
+            self._active[-1].bytes_read += n_bytes
+            self._active[-1].rows += n_rows
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
+def _sniff_delimiter(path: Path) -> str:
+    """Guess the delimiter of a CSV from its first 4 KB (defaults to ',')."""
+    with open(path, encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        return dialect.delimiter
+    except csv.Error:
+        return ","
+
+
 def read_csv_auto(path: Path) -> tuple[list[str], list[list[str]], str]:
     """Read a CSV file, auto-detecting delimiter. Returns (header, rows, delimiter).
 
+    Materialises every row — only use this for small files such as codebooks;
+    processed data goes through :func:`scan_csv`.
+
     Raises ValueError if the file is a Git LFS pointer.
     """
     if is_lfs_pointer(path):
@@ -138,15 +257,7 @@ def read_csv_auto(path: Path) -> tuple[list[str], list[list[str]], str]:
             "Run 'git lfs pull' to download the real content."
         )
 
-    with open(path, encoding="utf-8-sig") as f:
-        sample = f.read(4096)
-
-    # Sniff delimiter
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
-        delimiter = dialect.delimiter
-    except csv.Error:
-        delimiter = ","
+    delimiter = _sniff_delimiter(path)
 
     with open(path, encoding="utf-8-sig") as f:
         reader = csv.reader(f, delimiter=delimiter)
@@ -156,6 +267,275 @@ def read_csv_auto(path: Path) -> tuple[list[str], list[list[str]], str]:
     return header or [], rows, delimiter
 
 
+def _peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of this process, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class CsvScan:
+    """Summary of a CSV file gathered in a single streaming pass.
+
+    Holds everything the data-integrity checks need (header, row count,
+    empty-row positions, per-column missing counts, per-column value-rule
+    violations) so the rows themselves never have to be kept in memory.
+    """
+
+    # Number of empty-row line numbers kept for reporting
+    MAX_EMPTY_ROW_LINES = 10
+    # Number of offending (line, value) examples kept per column
+    MAX_INVALID_EXAMPLES = 5
+
+    def __init__(self, name: str, header: list[str], delimiter: str):
+        self.name = name
+        self.header = header
+        self.delimiter = delimiter
+        self.n_rows = 0
+        self.n_empty_rows = 0
+        self.empty_row_lines: list[int] = []
+        self.missing = [0] * len(header)
+        # column -> violation kind -> count, and column -> [(line, value)]
+        self.invalid: dict[str, dict[str, int]] = {}
+        self.invalid_examples: dict[str, list[tuple[int, str]]] = {}
+        self.n_bytes = 0
+        self.seconds = 0.0
+        self.peak_rss: int | None = None
+
+    @property
+    def columns(self) -> list[str]:
+        return [h.strip() for h in self.header]
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.n_rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "header": self.header,
+            "delimiter": self.delimiter,
+            "n_rows": self.n_rows,
+            "n_empty_rows": self.n_empty_rows,
+            "empty_row_lines": self.empty_row_lines,
+            "missing": self.missing,
+            "invalid": self.invalid,
+            "invalid_examples": self.invalid_examples,
+            "n_bytes": self.n_bytes,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> CsvScan:
+        scan = cls(name, data["header"], data["delimiter"])
+        scan.n_rows = data["n_rows"]
+        scan.n_empty_rows = data["n_empty_rows"]
+        scan.empty_row_lines = data["empty_row_lines"]
+        scan.missing = data["missing"]
+        scan.invalid = data["invalid"]
+        scan.invalid_examples = {
+            col: [tuple(e) for e in examples] for col, examples in data["invalid_examples"].items()
+        }
+        scan.n_bytes = data["n_bytes"]
+        return scan
+
+
+# Distinct cell values per column whose rule verdict is remembered during a scan
+VERDICT_MEMO_SIZE = 10_000
+
+
+def scan_csv(path: Path, schema: dict[str, ColumnRule] | None = None) -> CsvScan:
+    """Stream a CSV once, updating all per-column accumulators as rows arrive.
+
+    Columns with a rule in *schema* have each non-missing cell checked
+    against it in the same pass; the verdict for a repeated value is
+    remembered, so low-cardinality columns cost one dict lookup per cell.
+
+    Raises ValueError if the file is a Git LFS pointer, and propagates any
+    decoding or parsing error just like :func:`read_csv_auto`.
+    """
+    if is_lfs_pointer(path):
+        raise ValueError(
+            f"{path.name} is a Git LFS pointer file (not actual data). "
+            "Run 'git lfs pull' to download the real content."
+        )
+
+    start = time.perf_counter()
+    delimiter = _sniff_delimiter(path)
+
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None) or []
+        scan = CsvScan(path.name, header, delimiter)
+        missing = scan.missing
+        n_columns = len(header)
+        max_lines = CsvScan.MAX_EMPTY_ROW_LINES
+        max_examples = CsvScan.MAX_INVALID_EXAMPLES
+
+        # (column index, rule, memo of verdicts) for every column with a rule
+        checks = [
+            (col_idx, schema[name], {})
+            for col_idx, name in enumerate(scan.columns)
+            if schema and name in schema
+        ]
+
+        n_rows = 0
+        for row in reader:
+            n_rows += 1
+            width = len(row)
+            n_blank = 0
+            for col_idx, cell in enumerate(row):
+                if not cell or cell.isspace():
+                    n_blank += 1
+                    if col_idx < n_columns:
+                        missing[col_idx] += 1
+            for col_idx, rule, memo in checks:
+                if col_idx >= width:
+                    continue
+                cell = row[col_idx]
+                try:
+                    kind = memo[cell]
+                except KeyError:
+                    stripped = cell.strip()
+                    kind = None if not stripped or stripped in NA_VALUES else rule.check(stripped)
+                    if len(memo) < VERDICT_MEMO_SIZE:
+                        memo[cell] = kind
+                if kind is not None:
+                    counts = scan.invalid.setdefault(rule.column, {})
+                    counts[kind] = counts.get(kind, 0) + 1
+                    examples = scan.invalid_examples.setdefault(rule.column, [])
+                    if len(examples) < max_examples:
+                        examples.append((n_rows + 1, cell))
+            # Short rows count as missing in every absent column
+            for col_idx in range(width, n_columns):
+                missing[col_idx] += 1
+            if n_blank == width:
+                scan.n_empty_rows += 1
+                if len(scan.empty_row_lines) < max_lines:
+                    scan.empty_row_lines.append(n_rows + 1)  # 1-indexed, +1 for header
+
+    scan.n_rows = n_rows
+    scan.n_bytes = path.stat().st_size
+    scan.seconds = time.perf_counter() - start
+    scan.peak_rss = _peak_rss_bytes()
+    return scan
+
+
+def _count_csv_rows(path: Path) -> int:
+    """Count the data rows of a CSV with the csv parser, without keeping them."""
+    if is_lfs_pointer(path):
+        raise ValueError(f"{path.name} is a Git LFS pointer file (not actual data).")
+
+    delimiter = _sniff_delimiter(path)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        next(reader, None)
+        return sum(1 for _ in reader)
+
+
+# Read size for raw newline counting
+COUNT_CHUNK_SIZE = 1 << 20
+
+
+def count_csv_rows(path: Path) -> int:
+    """Count the data rows of a CSV (excluding the header) from raw bytes.
+
+    Counts newlines over buffered chunks, which is exact unless a quoted
+    field spans lines or the file uses bare carriage returns; when either is
+    possible the count is redone with the csv parser.
+    """
+    if is_lfs_pointer(path):
+        raise ValueError(f"{path.name} is a Git LFS pointer file (not actual data).")
+
+    n_lines = 0
+    in_quotes = False  # parity of '"' characters seen so far
+    last_byte = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(COUNT_CHUNK_SIZE)
+            if not chunk:
+                break
+            if chunk.endswith(b"\r"):
+                chunk += f.read(1)  # keep a CRLF pair in the same chunk
+            last_byte = chunk[-1:]
+            n_lines += chunk.count(b"\n")
+
+            if b"\r" in chunk and chunk.count(b"\r") != chunk.count(b"\r\n"):
+                return _count_csv_rows(path)
+
+            if in_quotes or b'"' in chunk:
+                lines = chunk.split(b"\n")
+                for line in lines[:-1]:
+                    if line.count(b'"') % 2:
+                        in_quotes = not in_quotes
+                    if in_quotes:
+                        return _count_csv_rows(path)
+                if lines[-1].count(b'"') % 2:
+                    in_quotes = not in_quotes
+
+    if last_byte and last_byte != b"\n":
+        n_lines += 1  # final line without a trailing newline
+    return max(n_lines - 1, 0)
+
+
+class RowCountIndex:
+    """Data-row counts for the CSV files of one dataset folder.
+
+    Counts are computed at most once per file — with :func:`count_csv_rows`,
+    unless a full scan already recorded them — and shared by every check
+    that needs them. LFS pointers are answered from *manifest* when it
+    covers their oid; other unreadable files map to None. Full scans are
+    kept in :attr:`scans`, and may be seeded from a previous run so that
+    unchanged files are not read again.
+    """
+
+    def __init__(self, folder: Path, manifest: StatsManifest | None = None):
+        self.folder = folder
+        self.manifest = manifest
+        self._counts: dict[Path, int | None] = {}
+        self.scans: dict[Path, CsvScan] = {}
+
+    def record(self, path: Path, n_rows: int):
+        self._counts[path] = n_rows
+
+    def record_scan(self, path: Path, scan: CsvScan):
+        self.scans[path] = scan
+        self.record(path, scan.n_rows)
+
+    def counted(self) -> dict[Path, int]:
+        """Row counts known so far (unreadable files excluded)."""
+        return {path: n for path, n in self._counts.items() if n is not None}
+
+    def get(self, path: Path, rc: ResultCollector | None = None) -> int | None:
+        """Row count of *path*; bytes read to count it are recorded on *rc*."""
+        if path not in self._counts and self.manifest is not None:
+            entry = self.manifest.match(path)
+            if entry is not None:
+                self._counts[path] = entry["rows"]
+        if path not in self._counts:
+            try:
+                self._counts[path] = count_csv_rows(path)
+            except Exception:
+                self._counts[path] = None
+            else:
+                if rc is not None:
+                    rc.record_io(path.stat().st_size, self._counts[path])
+        return self._counts[path]
+
+    def total(self, paths: list[Path], rc: ResultCollector | None = None) -> int:
+        """Sum of the row counts of *paths*, skipping unreadable files."""
+        counts = (self.get(path, rc) for path in paths)
+        return sum(n for n in counts if n is not None)
+
+    def original_csvs(self) -> list[Path]:
+        return sorted((self.folder / "original_data").glob("*.csv"))
+
+    def processed_csvs(self) -> list[Path]:
+        return sorted((self.folder / "processed_data").glob("*.csv"))
+
+
 def load_main_codebook() -> set[str]:
     """Load column names from the repository-level CODEBOOK.csv."""
     path = REPO_ROOT / "CODEBOOK.csv"
@@ -166,6 +546,35 @@ def load_main_codebook() -> set[str]:
     return {row[0].strip() for row in rows if row and row[0].strip()}
 
 
+# Cell values that mean "missing" and are exempt from value checks
+NA_VALUES = {"NA", "N/A", "NaN", "nan", "null", "NULL", "None"}
+def load_codebook_schema() -> dict[str, ColumnRule]:
+    """Value rules declared in the Type/Range/Allowed Values columns of the
+    repository-level CODEBOOK.csv, keyed by column name."""
+    path = REPO_ROOT / "CODEBOOK.csv"
+    if not path.exists():
+        return {}
+    for column, error in rule_errors(path).items():
+        print(f"WARNING: CODEBOOK.csv: ignoring the schema of '{column}': {error}")
+    return column_rules(path)
+
+
+def schema_rules(schema: dict[str, ColumnRule] | None, columns=None) -> dict[str, list]:
+    """The value rules in *schema* as plain lists, by column, for the
+    *columns* only if given; what findings about those columns depend on."""
+    return {
+        name: [rule.type, rule.minimum, rule.maximum, rule.allowed]
+        for name, rule in sorted((schema or {}).items())
+        if columns is None or name in columns
+    }
+
+
+def schema_digest(schema: dict[str, ColumnRule] | None, columns=None) -> str:
+    """Hash of :func:`schema_rules`; scans checked against different rules
+    have different digests."""
+    return hashlib.sha256(json.dumps(schema_rules(schema, columns)).encode("utf-8")).hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # Module 1: Codebook Validation
 # ---------------------------------------------------------------------------
@@ -184,6 +593,7 @@ def validate_codebook(folder: Path, rc: ResultCollector, main_columns: set[str])
     except Exception as e:
         rc.error(MODULE_CODEBOOK, f"Could not parse CODEBOOK.csv: {e}")
         return set()
+    rc.record_io(path.stat().st_size, len(rows))
 
     if not header:
         rc.error(MODULE_CODEBOOK, "CODEBOOK.csv is empty (no header row).")
@@ -275,6 +685,8 @@ def validate_processed_folder(folder: Path, rc: ResultCollector) -> list[Path]:
 # Module 3: Data Integrity
 # ---------------------------------------------------------------------------
 MODULE_DATA = "data_integrity"
+# Metrics label for the original-vs-processed check (its findings use MODULE_DATA)
+MODULE_SANITY = "sanity_check"
 
 # Number of rows to sample for original-vs-processed checks
 SANITY_CHECK_N = 5
@@ -287,86 +699,152 @@ def validate_data_integrity(
     csvs: list[Path],
     local_columns: set[str],
     rc: ResultCollector,
+    index: RowCountIndex | None = None,
+    manifest: StatsManifest | None = None,
+    schema: dict[str, ColumnRule] | None = None,
 ) -> dict[str, list[str]]:
     """Validate the contents of each processed CSV.
 
+    Every file is read exactly once by :func:`scan_csv`, which also checks
+    values against the *schema* rules; all checks below work off the
+    resulting :class:`CsvScan`. A file that is still an LFS
+    pointer is checked from its *manifest* scan when the oid matches, and a
+    scan already held by *index* (seeded from the result cache) is reused.
+    Scans are recorded in *index* so later checks do not count rows again.
+
     Returns a dict mapping csv filename to its list of column names.
     """
+    if index is None:
+        index = RowCountIndex(folder, manifest)
     csv_column_map: dict[str, list[str]] = {}
+    row_counts: dict[str, int] = {}
+
+    with rc.measure(MODULE_DATA):
+        for csv_path in csvs:
+            entry = manifest.match(csv_path) if manifest is not None else None
+            if csv_path in index.scans:
+                scan = index.scans[csv_path]
+                print(f"  {csv_path.name}: unchanged — reusing its cached scan")
+            elif entry is not None:
+                scan = CsvScan.from_dict(csv_path.name, entry["scan"])
+                print(f"  {csv_path.name}: LFS pointer — using {MANIFEST_NAME} stats ({entry['oid']})")
+            else:
+                try:
+                    scan = scan_csv(csv_path, schema)
+                except Exception as e:
+                    rc.error(MODULE_DATA, f"Could not parse {csv_path.name}: {e}")
+                    continue
+                _print_scan_stats(scan)
+                rc.record_io(scan.n_bytes, scan.n_rows)
+
+            row_counts[csv_path.name] = scan.n_rows
+            index.record_scan(csv_path, scan)
+
+            if not scan.header:
+                rc.error(MODULE_DATA, f"{csv_path.name} has no header row.")
+                continue
 
-    for csv_path in csvs:
-        try:
-            header, rows, _ = read_csv_auto(csv_path)
-        except Exception as e:
-            rc.error(MODULE_DATA, f"Could not parse {csv_path.name}: {e}")
-            continue
+            csv_column_map[csv_path.name] = scan.columns
+            exceptions = KNOWN_VALUE_EXCEPTIONS.get(folder.name)
+            _report_csv_scan(scan, local_columns, rc, schema, exceptions)
 
-        if not header:
-            rc.error(MODULE_DATA, f"{csv_path.name} has no header row.")
-            continue
+    # --- Sanity check: original vs processed ---
+    with rc.measure(MODULE_SANITY):
+        _sanity_check_original_vs_processed(folder, row_counts, index, rc)
 
-        columns = [h.strip() for h in header]
-        csv_column_map[csv_path.name] = columns
+    return csv_column_map
 
-        # --- participant_id required ---
-        if "participant_id" not in columns:
-            rc.error(MODULE_DATA, f"{csv_path.name}: missing required column 'participant_id'.")
 
-        # --- Empty rows ---
-        empty_rows = [
-            i + 2  # 1-indexed, +1 for header
-            for i, row in enumerate(rows)
-            if all(cell.strip() == "" for cell in row)
-        ]
-        if empty_rows:
-            display = empty_rows[:10]
-            suffix = f" (and {len(empty_rows) - 10} more)" if len(empty_rows) > 10 else ""
+def _print_scan_stats(scan: CsvScan):
+    """Print throughput and memory figures for one scanned CSV."""
+    peak = f"{scan.peak_rss / 1e6:,.1f} MB" if scan.peak_rss is not None else "n/a"
+    print(
+        f"  {scan.name}: {scan.n_rows:,} rows, {scan.n_bytes / 1e6:,.1f} MB "
+        f"in {scan.seconds:.2f}s ({scan.rows_per_sec:,.0f} rows/s, peak RSS {peak})"
+    )
+
+
+def _report_csv_scan(
+    scan: CsvScan,
+    local_columns: set[str],
+    rc: ResultCollector,
+    schema: dict[str, ColumnRule] | None = None,
+    exceptions: dict[str, str] | None = None,
+):
+    """Turn the accumulators of one scanned CSV into findings.
+
+    Value violations in the columns of *exceptions* are known and only
+    warned about, with the recorded reason.
+    """
+    name = scan.name
+    columns = scan.columns
+
+    # --- participant_id required ---
+    if "participant_id" not in columns:
+        rc.error(MODULE_DATA, f"{name}: missing required column 'participant_id'.")
+
+    # --- Empty rows ---
+    if scan.n_empty_rows:
+        display = scan.empty_row_lines
+        n_more = scan.n_empty_rows - len(display)
+        suffix = f" (and {n_more} more)" if n_more > 0 else ""
+        rc.error(
+            MODULE_DATA,
+            f"{name}: {scan.n_empty_rows} fully empty row(s) at lines {display}{suffix}.",
+        )
+
+    # --- Column names vs local CODEBOOK ---
+    if local_columns:
+        undocumented = set(columns) - local_columns
+        if undocumented:
             rc.error(
                 MODULE_DATA,
-                f"{csv_path.name}: {len(empty_rows)} fully empty row(s) at lines {display}{suffix}.",
+                f"{name}: columns not in local CODEBOOK.csv: {sorted(undocumented)}",
             )
 
-        # --- Column names vs local CODEBOOK ---
-        if local_columns:
-            undocumented = set(columns) - local_columns
-            if undocumented:
-                rc.error(
+    # --- Values vs the main CODEBOOK schema ---
+    # A wrong type or a value outside the allowed set is an error; values out
+    # of range may be legitimate codes (e.g. -1 for a timeout), so only warn
+    for col_name, counts in scan.invalid.items():
+        rule = (schema or {}).get(col_name)
+        if rule is None:
+            continue
+        examples = ", ".join(f"line {i}: {v!r}" for i, v in scan.invalid_examples.get(col_name, []))
+        reason = (exceptions or {}).get(col_name)
+        suffix = f" Known exception: {reason}." if reason else ""
+        for kind, count in sorted(counts.items()):
+            report = rc.warning if kind == "range" or reason else rc.error
+            report(
+                MODULE_DATA,
+                f"{name}: column '{col_name}' should hold {rule.describe(kind)} per the main "
+                f"CODEBOOK.csv, but {count} value(s) do not (e.g., {examples}).{suffix}",
+            )
+
+    # --- Missing values ---
+    if scan.n_rows:
+        n_rows = scan.n_rows
+        for col_name, n_missing in zip(columns, scan.missing):
+            frac = n_missing / n_rows
+            if frac > MISSING_THRESHOLD:
+                rc.warning(
                     MODULE_DATA,
-                    f"{csv_path.name}: columns not in local CODEBOOK.csv: {sorted(undocumented)}",
+                    f"{name}: column '{col_name}' has {n_missing}/{n_rows} "
+                    f"({frac:.1%}) missing values.",
                 )
 
-        # --- Missing values ---
-        if rows:
-            n_rows = len(rows)
-            for col_idx, col_name in enumerate(columns):
-                n_missing = sum(
-                    1 for row in rows if col_idx >= len(row) or row[col_idx].strip() == ""
-                )
-                frac = n_missing / n_rows
-                if frac > MISSING_THRESHOLD:
-                    rc.warning(
-                        MODULE_DATA,
-                        f"{csv_path.name}: column '{col_name}' has {n_missing}/{n_rows} "
-                        f"({frac:.1%}) missing values.",
-                    )
-
-    # --- Sanity check: original vs processed ---
-    _sanity_check_original_vs_processed(folder, csvs, rc)
-
-    return csv_column_map
-
 
 def _sanity_check_original_vs_processed(
     folder: Path,
-    csvs: list[Path],
+    row_counts: dict[str, int],
+    index: RowCountIndex,
     rc: ResultCollector,
 ):
-    """Spot-check a few rows from originals against processed data.
+    """Compare processed row counts against the rows in original_data CSVs.
 
-    Only runs when original_data contains CSV files.
+    *row_counts* maps each successfully scanned processed CSV to its number
+    of data rows; original row counts come from *index*. Only runs when
+    original_data contains CSV files.
     """
-    import random
-
     orig_dir = folder / "original_data"
     if not orig_dir.exists():
         return
@@ -379,35 +857,26 @@ def _sanity_check_original_vs_processed(
         )
         return
 
-    # For each processed CSV, check row count plausibility against originals
-    for csv_path in csvs:
-        try:
-            _, proc_rows, _ = read_csv_auto(csv_path)
-        except Exception:
-            continue
+    if not row_counts:
+        return
 
-        # Sum original row counts
-        total_orig_rows = 0
-        for orig_csv in orig_csvs:
-            try:
-                _, orig_rows, _ = read_csv_auto(orig_csv)
-                total_orig_rows += len(orig_rows)
-            except Exception:
-                continue
+    total_orig_rows = index.total(orig_csvs, rc)
 
-        if total_orig_rows > 0 and len(proc_rows) > 0:
-            ratio = len(proc_rows) / total_orig_rows
+    # For each processed CSV, check row count plausibility against originals
+    for name, n_proc_rows in row_counts.items():
+        if total_orig_rows > 0 and n_proc_rows > 0:
+            ratio = n_proc_rows / total_orig_rows
             if ratio > 2.0:
                 rc.warning(
                     MODULE_DATA,
-                    f"{csv_path.name} has {len(proc_rows)} rows but original_data CSVs "
+                    f"{name} has {n_proc_rows} rows but original_data CSVs "
                     f"have {total_orig_rows} total rows (ratio {ratio:.1f}x) — "
                     "unexpected expansion, worth verifying.",
                 )
             elif ratio < 0.1:
                 rc.warning(
                     MODULE_DATA,
-                    f"{csv_path.name} has {len(proc_rows)} rows but original_data CSVs "
+                    f"{name} has {n_proc_rows} rows but original_data CSVs "
                     f"have {total_orig_rows} total rows (ratio {ratio:.2f}x) — "
                     "large reduction, worth verifying.",
                 )
@@ -424,19 +893,296 @@ ANGLE_MARKER_RE = re.compile(r"<<([^>]*)>>")
 IMAGE_REF_RE = re.compile(r"<[^<>]+\.[a-zA-Z]{2,4}>|<image>")
 
 
+# Lines validated per JSONL file in the default (sampled) mode
+MAX_JSONL_SAMPLE = 100
+# Per-line findings (invalid JSON, non-object lines) reported individually
+MAX_LINE_ERRORS = 100
+# Size of the decompressed blocks handed to workers in --full-prompts mode
+PROMPT_CHUNK_BYTES = 8 << 20
+# Sampled lines are only tokenised in worker processes above this many bytes
+PROMPT_PARALLEL_MIN_BYTES = 4 << 20
+
+
+class PromptStats:
+    """Counters accumulated while checking the lines of one prompts JSONL.
+
+    Lines are fed one at a time through :meth:`check_line`; stats built over
+    consecutive parts of a file (e.g. by different workers) are combined
+    with :meth:`merge`, in file order.
+    """
+
+    MAX_EXAMPLE_LINES = 5
+
+    def __init__(self):
+        self.n_checked = 0
+        self.n_line_errors = 0
+        self.line_errors: list[tuple[int, str]] = []
+        self.keys_seen: set[str] = set()
+        self.missing_field_counts: dict[str, int] = {}
+        self.participant_misname_count = 0
+        self.no_marker_count = 0
+        self.stray_angle_count = 0
+        self.stray_angle_lines: list[int] = []
+        self.token_histogram = [0] * (len(HISTOGRAM_EDGES) + 1)
+        self.total_tokens = 0
+        self.max_tokens = 0
+        self.max_tokens_line = 0
+        self.token_limit_count = 0
+        self.token_limit_lines: list[tuple[int, int]] = []
+
+    def _line_error(self, i: int, message: str):
+        self.n_line_errors += 1
+        if len(self.line_errors) < MAX_LINE_ERRORS:
+            self.line_errors.append((i, message))
+
+    def check_line(self, i: int, line: str):
+        """Check one stripped, non-blank line (*i* is its 1-indexed line number)."""
+        self.n_checked += 1
+
+        # --- Valid JSON ---
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            self._line_error(i, f"invalid JSON — {e}")
+            return
+
+        if not isinstance(obj, dict):
+            self._line_error(i, f"expected a JSON object, got {type(obj).__name__}.")
+            return
+
+        keys = set(obj.keys())
+        self.keys_seen.update(keys)
+
+        # --- Required fields ---
+        for field in REQUIRED_JSONL_FIELDS:
+            if field not in keys:
+                if field == "participant_id" and "participant" in keys:
+                    self.participant_misname_count += 1
+                else:
+                    self.missing_field_counts[field] = self.missing_field_counts.get(field, 0) + 1
+
+        text = obj.get("text", "")
+
+        # --- <<...>> markers ---
+        markers = ANGLE_MARKER_RE.findall(text)
+        if not markers:
+            self.no_marker_count += 1
+
+        # --- Stray < > ---
+        # Remove <<...>> markers and <image>/<filename.ext> refs, then count strays
+        cleaned = ANGLE_MARKER_RE.sub("", text)
+        cleaned = IMAGE_REF_RE.sub("", cleaned)
+        if "<" in cleaned or ">" in cleaned:
+            self.stray_angle_count += 1
+            if len(self.stray_angle_lines) < self.MAX_EXAMPLE_LINES:
+                self.stray_angle_lines.append(i)
+
+        # --- Token length ---
+        n_tokens = count_tokens(text)
+        self.token_histogram[histogram_bucket(n_tokens)] += 1
+        self.total_tokens += n_tokens
+        if n_tokens > self.max_tokens:
+            self.max_tokens, self.max_tokens_line = n_tokens, i
+        if n_tokens > TOKEN_LIMIT:
+            self.token_limit_count += 1
+            if len(self.token_limit_lines) < self.MAX_EXAMPLE_LINES:
+                self.token_limit_lines.append((i, n_tokens))
+
+    def to_dict(self) -> dict:
+        return {
+            "n_checked": self.n_checked,
+            "n_line_errors": self.n_line_errors,
+            "line_errors": self.line_errors,
+            "keys_seen": sorted(self.keys_seen),
+            "missing_field_counts": self.missing_field_counts,
+            "participant_misname_count": self.participant_misname_count,
+            "no_marker_count": self.no_marker_count,
+            "stray_angle_count": self.stray_angle_count,
+            "stray_angle_lines": self.stray_angle_lines,
+            "token_histogram": self.token_histogram,
+            "total_tokens": self.total_tokens,
+            "max_tokens": self.max_tokens,
+            "max_tokens_line": self.max_tokens_line,
+            "token_limit_count": self.token_limit_count,
+            "token_limit_lines": self.token_limit_lines,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PromptStats:
+        stats = cls()
+        for attr, value in data.items():
+            setattr(stats, attr, value)
+        stats.line_errors = [tuple(e) for e in stats.line_errors]
+        stats.token_limit_lines = [tuple(e) for e in stats.token_limit_lines]
+        stats.keys_seen = set(stats.keys_seen)
+        return stats
+
+    def merge(self, other: PromptStats):
+        """Fold in the stats of the lines that follow this part of the file."""
+        self.n_checked += other.n_checked
+        self.n_line_errors += other.n_line_errors
+        room = MAX_LINE_ERRORS - len(self.line_errors)
+        self.line_errors.extend(other.line_errors[:max(room, 0)])
+        self.keys_seen.update(other.keys_seen)
+        for field, count in other.missing_field_counts.items():
+            self.missing_field_counts[field] = self.missing_field_counts.get(field, 0) + count
+        self.participant_misname_count += other.participant_misname_count
+        self.no_marker_count += other.no_marker_count
+        self.stray_angle_count += other.stray_angle_count
+        self.stray_angle_lines = (self.stray_angle_lines + other.stray_angle_lines)[:self.MAX_EXAMPLE_LINES]
+        self.token_histogram = [a + b for a, b in zip(self.token_histogram, other.token_histogram)]
+        self.total_tokens += other.total_tokens
+        if other.max_tokens > self.max_tokens:
+            self.max_tokens, self.max_tokens_line = other.max_tokens, other.max_tokens_line
+        self.token_limit_count += other.token_limit_count
+        self.token_limit_lines = (self.token_limit_lines + other.token_limit_lines)[:self.MAX_EXAMPLE_LINES]
+
+
+def _check_prompt_chunk(data: bytes, first_line: int) -> PromptStats:
+    """Worker entry point: check every line of a block of whole JSONL lines."""
+    stats = PromptStats()
+    for i, raw in enumerate(data.split(b"\n"), first_line):
+        line = raw.decode("utf-8").strip()
+        if line:
+            stats.check_line(i, line)
+    return stats
+
+
+def _check_prompt_lines(lines: list[tuple[int, str]]) -> PromptStats:
+    """Worker entry point: check a batch of ``(line_no, line)`` pairs."""
+    stats = PromptStats()
+    for i, line in lines:
+        stats.check_line(i, line)
+    return stats
+
+
+def _iter_line_blocks(stream, block_size: int):
+    """Yield ``(data, first_line_no)`` blocks of whole lines from a binary stream."""
+    line_no = 1
+    pending = b""
+    while True:
+        chunk = stream.read(block_size)
+        if not chunk:
+            break
+        data = pending + chunk
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            pending = data
+            continue
+        block, pending = data[:cut], data[cut + 1:]
+        yield block, line_no
+        line_no += block.count(b"\n") + 1
+    if pending:
+        yield pending, line_no
+
+
+def _scan_prompts_sampled(stream, workers: int = 1) -> tuple[int, int, PromptStats, bool]:
+    """Single streaming pass with a seeded reservoir sample of the lines to check.
+
+    A large sample is checked — and tokenised — in batches spread over
+    *workers* processes. Returns ``(n_raw_lines, n_lines, stats, is_sampled)``
+    where *n_lines* counts non-blank lines.
+    """
+    rng = random.Random(SANITY_CHECK_SEED)
+    reservoir: list[tuple[int, str]] = []
+    n_raw = n_lines = 0
+    for n_raw, raw in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), 1):
+        line = raw.strip()
+        if not line:
+            continue
+        n_lines += 1
+        if len(reservoir) < MAX_JSONL_SAMPLE:
+            reservoir.append((n_raw, line))
+        else:
+            slot = rng.randrange(n_lines)
+            if slot < MAX_JSONL_SAMPLE:
+                reservoir[slot] = (n_raw, line)
+
+    sample = sorted(reservoir)
+    n_bytes = sum(len(line) for _, line in sample)
+    if workers <= 1 or n_bytes < PROMPT_PARALLEL_MIN_BYTES:
+        stats = _check_prompt_lines(sample)
+    else:
+        get_encoder()  # load the vocabulary once, before the workers fork
+        size = -(-len(sample) // workers)
+        batches = [sample[k:k + size] for k in range(0, len(sample), size)]
+        stats = PromptStats()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_check_prompt_lines, batches):
+                stats.merge(part)
+    return n_raw, n_lines, stats, n_lines > MAX_JSONL_SAMPLE
+
+
+def _scan_prompts_full(stream, workers: int) -> tuple[int, int, PromptStats, bool]:
+    """Check every line, parsing blocks of the decompressed stream in parallel.
+
+    At most ``2 * workers`` blocks are in flight, so memory stays bounded.
+    """
+    stats = PromptStats()
+    n_raw = n_lines = 0
+
+    def absorb(part: PromptStats):
+        nonlocal n_lines
+        n_lines += part.n_checked
+        stats.merge(part)
+
+    blocks = _iter_line_blocks(stream, PROMPT_CHUNK_BYTES)
+    if workers <= 1:
+        for data, first_line in blocks:
+            n_raw = first_line + data.count(b"\n")
+            absorb(_check_prompt_chunk(data, first_line))
+        return n_raw, n_lines, stats, False
+
+    get_encoder()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        window: collections.deque[concurrent.futures.Future] = collections.deque()
+        for data, first_line in blocks:
+            n_raw = first_line + data.count(b"\n")
+            window.append(pool.submit(_check_prompt_chunk, data, first_line))
+            if len(window) >= 2 * workers:
+                absorb(window.popleft().result())
+        while window:
+            absorb(window.popleft().result())
+    return n_raw, n_lines, stats, False
+
+
+def _read_jsonl_stats(
+    zf: zipfile.ZipFile, jsonl_name: str, full: bool, workers: int
+) -> tuple[int, int, PromptStats, bool]:
+    """Check one JSONL entry of an open archive (see :func:`_scan_prompts_sampled`)."""
+    with zf.open(jsonl_name) as f:
+        if full:
+            return _scan_prompts_full(f, workers)
+        return _scan_prompts_sampled(f, workers)
+
+
 def validate_prompts(
     folder: Path,
     csv_column_map: dict[str, list[str]],
     rc: ResultCollector,
+    full: bool = False,
+    workers: int = 1,
+    manifest: StatsManifest | None = None,
 ):
-    """Validate prompts.jsonl.zip contents."""
+    """Validate prompts.jsonl.zip contents.
+
+    The JSONL is decompressed incrementally. By default a seeded reservoir
+    sample of :data:`MAX_JSONL_SAMPLE` lines is checked; with *full* every
+    line is checked, split into blocks parsed by *workers* processes. An
+    archive that is still an LFS pointer is checked from its *manifest*
+    stats when the oid matches.
+    """
     zip_path = folder / "prompts.jsonl.zip"
     if not zip_path.exists():
         rc.error(MODULE_PROMPTS, "prompts.jsonl.zip is missing.")
         return
 
+    entry = manifest.match(zip_path) if manifest is not None else None
+    if entry is not None:
+        print(f"  prompts.jsonl.zip: LFS pointer — using {MANIFEST_NAME} stats ({entry['oid']})")
+
     # Guard against unresolved LFS pointer
-    if is_lfs_pointer(zip_path):
+    if entry is None and is_lfs_pointer(zip_path):
         rc.error(
             MODULE_PROMPTS,
             "prompts.jsonl.zip is a Git LFS pointer file (not the actual ZIP). "
@@ -445,20 +1191,26 @@ def validate_prompts(
         )
         return
 
-    try:
-        zf = zipfile.ZipFile(zip_path)
-    except Exception as e:
-        rc.error(MODULE_PROMPTS, f"Could not open prompts.jsonl.zip: {e}")
-        return
+    zf = None
+    if entry is not None:
+        names = entry["entries"]
+    else:
+        try:
+            zf = zipfile.ZipFile(zip_path)
+        except Exception as e:
+            rc.error(MODULE_PROMPTS, f"Could not open prompts.jsonl.zip: {e}")
+            return
+        names = zf.namelist()
 
     # --- Validate ZIP contents ---
-    all_entries = [n for n in zf.namelist() if not n.startswith("__MACOSX")]
+    all_entries = [n for n in names if not n.startswith("__MACOSX")]
     jsonl_files = [n for n in all_entries if n.endswith(".jsonl")]
     non_jsonl = [n for n in all_entries if not n.endswith(".jsonl") and not n.endswith("/")]
 
     if not jsonl_files:
         rc.error(MODULE_PROMPTS, "No .jsonl file found inside prompts.jsonl.zip.")
-        zf.close()
+        if zf is not None:
+            zf.close()
         return
 
     # Should be exactly one JSONL file named 'prompts.jsonl'
@@ -490,162 +1242,127 @@ def validate_prompts(
         all_csv_columns.update(cols)
 
     for jsonl_name in jsonl_files:
-        try:
-            with zf.open(jsonl_name) as f:
-                stream = io.TextIOWrapper(f, encoding="utf-8")
-                lines = stream.readlines()
-        except Exception as e:
-            rc.error(MODULE_PROMPTS, f"Could not read {jsonl_name}: {e}")
-            continue
-
-        if not lines:
-            rc.error(MODULE_PROMPTS, f"{jsonl_name} is empty.")
-            continue
-
-        all_keys_seen: set[str] = set()
-        instruction_texts: list[str] = []
-        stimulus_words: list[str] = []
-
-        # Strip blank lines once
-        non_blank = [(idx, l.strip()) for idx, l in enumerate(lines, 1) if l.strip()]
-        n_lines = len(non_blank)
-
-        # For large files, sample deterministically (first 50 + last 50)
-        MAX_JSONL_SAMPLE = 100
-        if n_lines > MAX_JSONL_SAMPLE:
-            half = MAX_JSONL_SAMPLE // 2
-            sampled = non_blank[:half] + non_blank[-half:]
-            is_sampled = True
+        if entry is not None:
+            recorded = entry["jsonl"].get(jsonl_name)
+            if recorded is None:
+                rc.error(MODULE_PROMPTS, f"Could not read {jsonl_name}: not recorded in {MANIFEST_NAME}.")
+                continue
+            n_raw, n_lines = recorded["n_raw"], recorded["n_lines"]
+            stats, is_sampled = PromptStats.from_dict(recorded["stats"]), False
         else:
-            sampled = non_blank
-            is_sampled = False
-
-        # Counters for aggregating repeating per-line issues
-        missing_field_counts: dict[str, int] = {}  # field_name -> count
-        participant_misname_count = 0
-        no_marker_count = 0
-        stray_angle_count = 0
-        stray_angle_lines: list[int] = []
-        token_limit_count = 0
-        token_limit_lines: list[int] = []
-
-        for i, line in sampled:
-
-            # --- Valid JSON ---
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError as e:
-                rc.error(MODULE_PROMPTS, f"{jsonl_name} line {i}: invalid JSON — {e}")
-                continue
-
-            if not isinstance(obj, dict):
-                rc.error(MODULE_PROMPTS, f"{jsonl_name} line {i}: expected a JSON object, got {type(obj).__name__}.")
+                n_raw, n_lines, stats, is_sampled = _read_jsonl_stats(zf, jsonl_name, full, workers)
+            except Exception as e:
+                rc.error(MODULE_PROMPTS, f"Could not read {jsonl_name}: {e}")
                 continue
+            rc.record_io(zf.getinfo(jsonl_name).file_size, n_raw)
 
-            keys = set(obj.keys())
-            all_keys_seen.update(keys)
-
-            # --- Required fields ---
-            for field in REQUIRED_JSONL_FIELDS:
-                if field not in keys:
-                    if field == "participant_id" and "participant" in keys:
-                        participant_misname_count += 1
-                    else:
-                        missing_field_counts[field] = missing_field_counts.get(field, 0) + 1
-
-            text = obj.get("text", "")
-
-            # --- <<...>> markers ---
-            markers = ANGLE_MARKER_RE.findall(text)
-            if not markers:
-                no_marker_count += 1
-
-            # --- Stray < > ---
-            # Remove <<...>> markers and <image>/<filename.ext> refs, then count strays
-            cleaned = ANGLE_MARKER_RE.sub("", text)
-            cleaned = IMAGE_REF_RE.sub("", cleaned)
-            stray_left = cleaned.count("<")
-            stray_right = cleaned.count(">")
-            if stray_left > 0 or stray_right > 0:
-                stray_angle_count += 1
-                if len(stray_angle_lines) < 5:
-                    stray_angle_lines.append(i)
-
-            # --- Token length ---
-            if len(text) > TOKEN_CHAR_LIMIT:
-                token_limit_count += 1
-                if len(token_limit_lines) < 5:
-                    token_limit_lines.append(i)
-
-
-
-        # --- Emit aggregated per-line errors/warnings ---
-        sample_note = f" (sampled {len(sampled)}/{n_lines} lines)" if is_sampled else ""
-        if is_sampled:
-            rc.warning(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: large file — validated {len(sampled)}/{n_lines} lines "
-                f"(first {MAX_JSONL_SAMPLE // 2} + last {MAX_JSONL_SAMPLE // 2}).",
-            )
-        if participant_misname_count > 0:
-            rc.error(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: field 'participant' used instead of 'participant_id' "
-                f"in {participant_misname_count}/{n_lines} lines.",
-            )
-
-        for field, count in sorted(missing_field_counts.items()):
-            rc.error(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: required field '{field}' missing "
-                f"in {count}/{n_lines} lines.",
-            )
+        if not n_raw:
+            rc.error(MODULE_PROMPTS, f"{jsonl_name} is empty.")
+            continue
 
-        if no_marker_count > 0:
-            rc.warning(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: {no_marker_count}/{n_lines} lines have no <<...>> markers.",
-            )
+        _print_token_stats(jsonl_name, stats)
+        _report_prompt_stats(jsonl_name, n_lines, stats, is_sampled, all_csv_columns, rc)
 
-        if stray_angle_count > 0:
-            example = f" (e.g., lines {stray_angle_lines})" if stray_angle_lines else ""
-            rc.warning(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: {stray_angle_count}/{n_lines} lines have stray '<' or '>' "
-                f"characters outside <<...>> markers{example}.",
-            )
+    if zf is not None:
+        zf.close()
 
-        if token_limit_count > 0:
-            example = f" (e.g., lines {token_limit_lines})" if token_limit_lines else ""
-            rc.error(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: {token_limit_count}/{n_lines} lines exceed the "
-                f"{TOKEN_CHAR_LIMIT:,}-character limit{example}.",
-            )
 
-        # --- Metadata cross-check ---
-        metadata_in_csv = all_csv_columns & OPTIONAL_METADATA_FIELDS
-        metadata_in_jsonl = all_keys_seen & OPTIONAL_METADATA_FIELDS
-        missing_meta = metadata_in_csv - metadata_in_jsonl
-        if missing_meta:
-            rc.warning(
-                MODULE_PROMPTS,
-                f"{jsonl_name}: CSV columns {sorted(missing_meta)} could be included "
-                "as metadata fields in the JSONL but are missing.",
-            )
+def _print_token_stats(jsonl_name: str, stats: PromptStats):
+    """Print the token-count distribution of the checked lines."""
+    if not stats.n_checked:
+        return
+    mean = stats.total_tokens / stats.n_checked
+    print(
+        f"  {jsonl_name}: {ENCODING_NAME} tokens per line over {stats.n_checked:,} checked "
+        f"lines — mean {mean:,.0f}, max {stats.max_tokens:,} (line {stats.max_tokens_line})"
+    )
+    buckets = zip(histogram_labels(), stats.token_histogram)
+    print("    " + "  ".join(f"{label}: {n:,}" for label, n in buckets if n))
+
+
+def _report_prompt_stats(
+    jsonl_name: str,
+    n_lines: int,
+    stats: PromptStats,
+    is_sampled: bool,
+    all_csv_columns: set[str],
+    rc: ResultCollector,
+):
+    """Turn the counters of one checked JSONL into findings."""
+    for i, message in stats.line_errors:
+        rc.error(MODULE_PROMPTS, f"{jsonl_name} line {i}: {message}")
+    n_unreported = stats.n_line_errors - len(stats.line_errors)
+    if n_unreported > 0:
+        rc.error(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: {n_unreported} more line(s) are not valid JSON objects.",
+        )
 
+    # --- Emit aggregated per-line errors/warnings ---
+    if is_sampled:
+        rc.warning(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: large file — validated {stats.n_checked}/{n_lines} lines "
+            "(seeded random sample; use --full-prompts to check every line).",
+        )
+    if stats.participant_misname_count > 0:
+        rc.error(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: field 'participant' used instead of 'participant_id' "
+            f"in {stats.participant_misname_count}/{n_lines} lines.",
+        )
 
+    for field, count in sorted(stats.missing_field_counts.items()):
+        rc.error(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: required field '{field}' missing "
+            f"in {count}/{n_lines} lines.",
+        )
 
-    zf.close()
+    if stats.no_marker_count > 0:
+        rc.warning(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: {stats.no_marker_count}/{n_lines} lines have no <<...>> markers.",
+        )
 
+    if stats.stray_angle_count > 0:
+        example = f" (e.g., lines {stats.stray_angle_lines})" if stats.stray_angle_lines else ""
+        rc.warning(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: {stats.stray_angle_count}/{n_lines} lines have stray '<' or '>' "
+            f"characters outside <<...>> markers{example}.",
+        )
 
+    if stats.token_limit_count > 0:
+        example = ""
+        if stats.token_limit_lines:
+            shown = ", ".join(f"line {i}: {n:,}" for i, n in stats.token_limit_lines)
+            example = f" (e.g., {shown})"
+        rc.error(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: {stats.token_limit_count}/{n_lines} lines exceed the "
+            f"{TOKEN_LIMIT:,}-token limit ({ENCODING_NAME} tokens){example}.",
+        )
 
+    # --- Metadata cross-check ---
+    metadata_in_csv = all_csv_columns & OPTIONAL_METADATA_FIELDS
+    metadata_in_jsonl = stats.keys_seen & OPTIONAL_METADATA_FIELDS
+    missing_meta = metadata_in_csv - metadata_in_jsonl
+    if missing_meta:
+        rc.warning(
+            MODULE_PROMPTS,
+            f"{jsonl_name}: CSV columns {sorted(missing_meta)} could be included "
+            "as metadata fields in the JSONL but are missing.",
+        )
 
 
 # ---------------------------------------------------------------------------
 # File presence checks (README §4 checklist)
 # ---------------------------------------------------------------------------
 MODULE_FILES = "file_presence"
+# Metrics label for the images.zip cross-check (its findings use MODULE_FILES)
+MODULE_IMAGES = "images"
 
 
 def validate_file_presence(folder: Path, rc: ResultCollector):
@@ -694,34 +1411,595 @@ def check_images_zip(folder: Path, csv_column_map: dict[str, list[str]], rc: Res
         )
 
 
+# ---------------------------------------------------------------------------
+# Stats manifest
+# ---------------------------------------------------------------------------
+# Machine-generated file that lets LFS pointers be validated without their content
+MANIFEST_NAME = "validation_manifest.json"
+MANIFEST_FORMAT = 5
+
+
+class StatsManifest:
+    """Precomputed statistics of a folder's data files, bound to their LFS oids.
+
+    The manifest is written by ``--write-manifest`` from the real data. When
+    a data file is checked out as an LFS pointer, :meth:`match` returns the
+    recorded stats if (and only if) the pointer's oid is the one they were
+    computed from; otherwise the file needs its content to be validated.
+    CSV scans also hold the value-rule verdicts of the CODEBOOK rules for
+    their columns, so they only match while *schema* has the same rules for
+    those columns.
+    """
+
+    def __init__(self, folder: Path, files: dict[str, dict], schema: dict[str, ColumnRule] | None = None):
+        self.folder = folder
+        self.files = files
+        self.schema = schema
+
+    @classmethod
+    def load(cls, folder: Path, schema: dict[str, ColumnRule] | None = None) -> StatsManifest | None:
+        path = folder / MANIFEST_NAME
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != MANIFEST_FORMAT:
+            return None
+        return cls(folder, data.get("files", {}), schema)
+
+    def match(self, path: Path) -> dict | None:
+        pointer = read_lfs_pointer(path)
+        if pointer is None:
+            return None
+        entry = self.files.get(path.relative_to(self.folder).as_posix())
+        if entry is None or entry.get("oid") != pointer.get("oid"):
+            return None
+        if "scan" in entry:
+            columns = [h.strip() for h in entry["scan"]["header"]]
+            if entry.get("schema") != schema_digest(self.schema, columns):
+                return None
+        return entry
+
+
+def build_manifest(folder: Path, workers: int = 1) -> dict:
+    """Compute the stats manifest of *folder* from its real data files.
+
+    Records a full scan of every processed CSV (with the digest of the
+    CODEBOOK rules of its columns it was checked against), the row count of every
+    original CSV, and the entry names plus full-line prompt stats of
+    prompts.jsonl.zip, each keyed by the sha256 oid Git LFS would assign.
+    Files that are themselves LFS pointers cannot be summarised and are
+    skipped with a warning.
+    """
+    files: dict[str, dict] = {}
+
+    def add(path: Path, entry: dict):
+        rel = path.relative_to(folder).as_posix()
+        files[rel] = {"oid": f"sha256:{_sha256_file(path)}", "size": path.stat().st_size, **entry}
+
+    def readable(path: Path) -> bool:
+        if is_lfs_pointer(path):
+            print(f"WARNING: {path.relative_to(REPO_ROOT)} is an LFS pointer — run 'git lfs pull' first.")
+            return False
+        return True
+
+    schema = load_codebook_schema()
+    for path in sorted((folder / "processed_data").glob("*.csv")):
+        if readable(path):
+            scan = scan_csv(path, schema)
+            add(path, {"scan": scan.to_dict(), "schema": schema_digest(schema, scan.columns)})
+
+    for path in sorted((folder / "original_data").glob("*.csv")):
+        if readable(path):
+            add(path, {"rows": count_csv_rows(path)})
+
+    zip_path = folder / "prompts.jsonl.zip"
+    if zip_path.exists() and readable(zip_path):
+        jsonl: dict[str, dict] = {}
+        with zipfile.ZipFile(zip_path) as zf:
+            names = zf.namelist()
+            for name in names:
+                if name.endswith(".jsonl") and not name.startswith("__MACOSX"):
+                    n_raw, n_lines, stats, _ = _read_jsonl_stats(zf, name, True, workers)
+                    jsonl[name] = {"n_raw": n_raw, "n_lines": n_lines, "stats": stats.to_dict()}
+        add(zip_path, {"entries": names, "jsonl": jsonl})
+
+    return {"format": MANIFEST_FORMAT, "files": files}
+
+
+def write_manifest(folder: Path, workers: int = 1) -> Path:
+    path = folder / MANIFEST_NAME
+    manifest = build_manifest(folder, workers)
+    path.write_text(json.dumps(manifest, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+# Outside the worktree: a cache inside it could be committed by a PR, and
+# would then be trusted by CI
+_CACHE_HOME = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+DEFAULT_CACHE_DIR = _CACHE_HOME / "psychling101-validation"
+
+# Chunk size used when hashing file contents
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _git(*args: str) -> str | None:
+    """Run a git command in the repository root; None if git is unavailable or fails."""
+    try:
+        result = subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=REPO_ROOT
+        )
+    except FileNotFoundError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def tracked_files_under(directory: Path) -> list[str]:
+    """Files git tracks under *directory*, if it lies in the repository.
+
+    A cache directory must hold none: its entries are trusted as they are,
+    so a committed one could replace the verdicts of any folder.
+    """
+    try:
+        rel = directory.resolve().relative_to(REPO_ROOT.resolve())
+    except ValueError:
+        return []
+    if rel == Path("."):
+        return ["."]
+    tracked = _git("ls-files", "-z", "--", rel.as_posix())
+    return sorted(filter(None, (tracked or "").split("\0")))
+
+
+class ContentIdentity:
+    """Resolves the content identity of the files in one folder.
+
+    Hashing multi-GB LFS files on every run is what the cache is meant to
+    avoid, so identities are resolved cheapest-first:
+
+    1. an unsmudged LFS pointer is identified by its own ``oid``;
+    2. a tracked file git reports as unmodified is identified by its blob
+       id in the index (for a smudged LFS file, the blob of its pointer);
+    3. a file whose size and mtime match the last run reuses that hash;
+    4. anything else is hashed.
+
+    Git blob ids make the identities of unchanged files free to compute,
+    and equal across checkouts — which is what lets a CI run reuse the
+    results stored by an earlier one. A pointer and its smudged content
+    are deliberately told apart, since a pointer is validated from the
+    manifest: the run that fills the cache has to fetch the LFS content
+    that PR runs validate.
+    """
+
+    def __init__(self, folder: Path, memo_path: Path | None):
+        self.folder = folder
+        self.memo_path = memo_path
+        self.memo: dict[str, list] = {}
+        if memo_path is not None and memo_path.exists():
+            try:
+                self.memo = json.loads(memo_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.memo = {}
+        self._index_blobs: dict[str, str] | None = None
+
+    def of(self, path: Path) -> str:
+        if not path.exists():
+            return "missing"
+        pointer = read_lfs_pointer(path)
+        if pointer is not None:
+            return f"lfs-pointer:{pointer.get('oid', '')}"
+
+        rel = path.relative_to(REPO_ROOT).as_posix()
+        blob = self._blobs_from_index().get(rel)
+        if blob is not None:
+            return f"git:{blob}"
+
+        st = path.stat()
+        cached = self.memo.get(rel)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        identity = f"sha256:{_sha256_file(path)}"
+        self.memo[rel] = [st.st_size, st.st_mtime_ns, identity]
+        return identity
+
+    def _blobs_from_index(self) -> dict[str, str]:
+        """Map the unmodified, tracked files of the folder to their index blob ids."""
+        if self._index_blobs is not None:
+            return self._index_blobs
+        self._index_blobs = {}
+
+        folder_rel = self.folder.relative_to(REPO_ROOT).as_posix()
+        staged = _git("ls-files", "-s", "-z", "--", folder_rel)
+        modified = _git("ls-files", "-m", "-z", "--", folder_rel)
+        if not staged or modified is None:
+            return self._index_blobs
+        modified_paths = set(filter(None, modified.split("\0")))
+
+        for entry in filter(None, staged.split("\0")):
+            info, _, rel = entry.partition("\t")
+            if rel not in modified_paths:
+                self._index_blobs[rel] = info.split()[1]
+        return self._index_blobs
+
+    def save(self):
+        if self.memo_path is None:
+            return
+        try:
+            self.memo_path.parent.mkdir(parents=True, exist_ok=True)
+            self.memo_path.write_text(json.dumps(self.memo, sort_keys=True), encoding="utf-8")
+        except OSError:
+            pass
+
+
+# Files outside the dataset folders that every module depends on: this
+# script, the psychling modules it imports (token counting) and the
+# tokenizer vocabulary. The root CODEBOOK.csv is not one of them: modules
+# are keyed on the parts of it that concern their folder (see
+# validate_folder), so editing it only re-runs the checks it affects.
+VALIDATOR_INPUTS = tuple(sorted({
+    path.relative_to(REPO_ROOT).as_posix()
+    for path in [
+        Path(__file__).resolve(),
+        VOCAB_PATH,
+        *(
+            Path(module.__file__).resolve() for name, module in list(sys.modules.items())
+            if name.split(".")[0] == "psychling" and getattr(module, "__file__", None)
+        ),
+    ]
+}))
+
+
+class ResultCache:
+    """Persistent per-folder, per-module store of validation results.
+
+    An entry is reused only when its key matches: a hash of
+    :data:`VALIDATOR_INPUTS` (the validator's source, the psychling modules
+    it imports and the tokenizer vocabulary), and every input the module
+    reads: file identities, and the parts of the root CODEBOOK.csv that
+    concern the folder. Changing one input therefore only re-runs the
+    modules that depend on it.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        digest = hashlib.sha256()
+        for rel in VALIDATOR_INPUTS:
+            path = REPO_ROOT / rel
+            if path.exists():
+                digest.update(rel.encode("utf-8") + b"\0")
+                digest.update(path.read_bytes())
+        self.salt = digest.hexdigest()
+
+    def _entry_path(self, folder: Path, module: str) -> Path:
+        return self.cache_dir / folder.name / f"{module}.json"
+
+    def key(self, module: str, inputs: dict) -> str:
+        payload = json.dumps({"salt": self.salt, "module": module, "inputs": inputs}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def identities(self, folder: Path) -> ContentIdentity:
+        return ContentIdentity(folder, self.cache_dir / folder.name / "hashes.json")
+
+    def load(self, folder: Path, module: str, key: str | None = None) -> dict | None:
+        """The stored entry of *module*, if its key matches *key*.
+
+        Without a *key*, returns whatever the previous run stored, provided
+        it was produced by this same validator.
+        """
+        path = self._entry_path(folder, module)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if key is None:
+            return entry if entry.get("salt") == self.salt else None
+        return entry if entry.get("key") == key else None
+
+    def store(self, folder: Path, module: str, key: str, inputs: dict, results: list[Result], outputs):
+        path = self._entry_path(folder, module)
+        entry = {
+            "key": key,
+            "salt": self.salt,
+            "inputs": inputs,
+            "results": [[r.level, r.module, r.message] for r in results],
+            "outputs": outputs,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            tmp.replace(path)
+        except OSError:
+            pass
+
+
+def _run_module(
+    cache: ResultCache | None,
+    folder: Path,
+    rc: ResultCollector,
+    module: str,
+    inputs: dict,
+    run,
+):
+    """Run *run()* for one module, or replay its findings from *cache*.
+
+    *run* must return JSON-serialisable outputs; they are returned as-is on a
+    cache hit so downstream modules see the same values either way. On a
+    miss, the inputs that differ from the stored entry's are printed: they
+    are what the key is made of, so this is exactly why the module re-runs.
+    """
+    if cache is None:
+        return run()
+
+    key = cache.key(module, inputs)
+    with rc.measure(module, cached=True):
+        entry = cache.load(folder, module, key)
+        if entry is not None:
+            rc.results.extend(Result(level, mod, msg) for level, mod, msg in entry["results"])
+    if entry is not None:
+        print(f"  [{module}] unchanged — reusing cached results")
+        return entry["outputs"]
+    rc.metrics.pop()  # the lookup missed; the real run is measured instead
+    print(f"  [{module}] re-running — {_miss_reason(cache.load(folder, module), inputs)}")
+
+    start = len(rc.results)
+    outputs = run()
+    cache.store(folder, module, key, inputs, rc.results[start:], outputs)
+    return outputs
+
+
+def _miss_reason(previous: dict | None, inputs: dict) -> str:
+    """Why *inputs* missed the cache, given the *previous* entry of the
+    module (as :meth:`ResultCache.load` returns it without a key)."""
+    if previous is None or "inputs" not in previous:
+        return "no cached result from this validator"
+    # Compare as stored, so tuples and lists are alike
+    inputs = json.loads(json.dumps(inputs))
+    changed = []
+    for name, value in inputs.items():
+        old = previous["inputs"].get(name)
+        if value == old:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            # File identities by name: say which files
+            files = sorted(f for f in value.keys() | old.keys() if value.get(f) != old.get(f))
+            shown = ", ".join(files[:5]) + (f" (+{len(files) - 5} more)" if len(files) > 5 else "")
+            changed.append(f"{name}: {shown}")
+        else:
+            changed.append(name)
+    return "changed inputs: " + "; ".join(changed) if changed else "its inputs changed"
+
+
+def _listing(directory: Path) -> list[str]:
+    """Sorted entry names of *directory* (directories get a trailing '/')."""
+    if not directory.is_dir():
+        return []
+    return sorted(p.name + ("/" if p.is_dir() else "") for p in directory.iterdir())
+
+
+# ---------------------------------------------------------------------------
+# Incremental validation (--changed)
+# ---------------------------------------------------------------------------
+class ChangeSet:
+    """The files a PR changes, as reported by git.
+
+    *diff* maps repository-relative paths changed since origin/main to their
+    status letter (A, M, D; renames are split into a D and an A).
+    """
+
+    def __init__(self, diff: dict[str, str]):
+        self.diff = diff
+
+    def folders(self) -> list[str]:
+        """Dataset folders the diff touches: all of them if it changes the
+        root CODEBOOK.csv, whose names and rules every folder is checked
+        against (the cache re-runs only the checks that read the change)."""
+        if "CODEBOOK.csv" in self.diff:
+            return detect_all_folders()
+        folders = set()
+        for f in self.diff:
+            parts = f.split("/")
+            if parts and parts[0] not in IGNORED_FOLDERS and (REPO_ROOT / parts[0]).is_dir():
+                folders.add(parts[0])
+        return sorted(folders)
+
+
+def _seed_row_index(
+    entry: dict | None,
+    index: RowCountIndex,
+    ids: ContentIdentity,
+    schema: dict[str, ColumnRule] | None = None,
+):
+    """Load the scans and row counts of a previous data-module run into *index*.
+
+    Only files whose identity is unchanged are seeded, and scans only if
+    the *schema* rules of their columns are the ones they were checked
+    against; everything else is read again by the checks.
+    """
+    if entry is None or not isinstance(entry.get("outputs"), dict):
+        return
+    for rel, stats in entry["outputs"].get("files", {}).items():
+        path = index.folder / rel
+        if ids.of(path) != stats.get("identity"):
+            continue
+        if "scan" in stats:
+            scan = CsvScan.from_dict(path.name, stats["scan"])
+            if stats.get("schema") == schema_digest(schema, scan.columns):
+                index.record_scan(path, scan)
+        else:
+            index.record(path, stats["rows"])
+
+
+def _codebook_columns(folder: Path) -> set[str]:
+    """The column names in the local CODEBOOK.csv of *folder*, if readable."""
+    try:
+        _, rows, _ = read_csv_auto(folder / "CODEBOOK.csv")
+    except Exception:
+        return set()
+    return {row[0].strip() for row in rows if row and row[0].strip()}
+
+
+def _processed_columns(folder: Path, manifest: StatsManifest | None) -> set[str]:
+    """Every column of the processed CSVs of *folder*, from their header
+    rows (from *manifest* for LFS pointers it covers)."""
+    columns: set[str] = set()
+    for path in sorted((folder / "processed_data").glob("*.csv")):
+        entry = manifest.match(path) if manifest is not None else None
+        if entry is not None:
+            header = entry["scan"]["header"]
+        elif is_lfs_pointer(path):
+            continue
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as f:
+                    header = next(csv.reader(f, delimiter=_sniff_delimiter(path)), [])
+            except (OSError, UnicodeDecodeError, csv.Error):
+                continue
+        columns.update(h.strip() for h in header)
+    return columns
+
+
+def _row_index_outputs(
+    index: RowCountIndex,
+    ids: ContentIdentity | None,
+    schema: dict[str, ColumnRule] | None = None,
+) -> dict[str, dict]:
+    """The scans and row counts in *index*, keyed for :func:`_seed_row_index`."""
+    if ids is None:
+        return {}
+    files = {}
+    for path, n_rows in index.counted().items():
+        stats = {"identity": ids.of(path)}
+        if path in index.scans:
+            scan = index.scans[path]
+            stats["scan"] = scan.to_dict()
+            stats["schema"] = schema_digest(schema, scan.columns)
+        else:
+            stats["rows"] = n_rows
+        files[path.relative_to(index.folder).as_posix()] = stats
+    return files
+
+
 # ---------------------------------------------------------------------------
 # Orchestrator
 # ---------------------------------------------------------------------------
-def validate_folder(folder: Path, main_columns: set[str]) -> ResultCollector:
-    """Run all validation modules on a single dataset folder."""
+def validate_folder(
+    folder: Path,
+    main_columns: set[str],
+    cache: ResultCache | None = None,
+    full_prompts: bool = False,
+    prompt_workers: int = 1,
+    schema: dict[str, ColumnRule] | None = None,
+) -> ResultCollector:
+    """Run all validation modules on a single dataset folder.
+
+    With a *cache*, modules whose inputs are unchanged since the run that
+    populated it replay their stored findings instead of re-reading data,
+    and processed/original CSVs that did not change are not scanned again.
+    The root CODEBOOK is an input only through the column names and value
+    rules that concern the folder, so an edit to it re-runs the codebook
+    check and re-scans just the CSVs with a column whose rules changed.
+    Each cached module prints whether it replayed its findings or, if
+    not, which of its inputs changed.
+    *schema* holds the value rules of the main CODEBOOK.
+    *full_prompts* and *prompt_workers* are passed on to :func:`validate_prompts`.
+    """
     rc = ResultCollector(folder.name)
 
     print(f"\n{'=' * 60}")
     print(f"  Validating: {folder.name}")
     print(f"{'=' * 60}")
 
-    # 0. File presence
-    validate_file_presence(folder, rc)
+    ids = cache.identities(folder) if cache is not None else None
+    manifest = StatsManifest.load(folder, schema)
+    index = RowCountIndex(folder, manifest)
 
-    # 1. Codebook
-    local_columns = validate_codebook(folder, rc, main_columns)
+    # 0. File presence
+    def run_presence():
+        with rc.measure(MODULE_FILES):
+            validate_file_presence(folder, rc)
 
-    # 2. Processed data folder
-    csvs = validate_processed_folder(folder, rc)
+    _run_module(
+        cache, folder, rc, MODULE_FILES,
+        {"listing": _listing(folder)} if cache else {},
+        run_presence,
+    )
 
-    # 3. Data integrity
-    csv_column_map = validate_data_integrity(folder, csvs, local_columns, rc)
+    # 1. Codebook
+    def run_codebook():
+        with rc.measure(MODULE_CODEBOOK):
+            return sorted(validate_codebook(folder, rc, main_columns))
+
+    codebook_inputs = {}
+    if ids is not None:
+        codebook_inputs = {
+            "codebook": ids.of(folder / "CODEBOOK.csv"),
+            # The local columns the main CODEBOOK documents
+            "main_columns": sorted(_codebook_columns(folder) & main_columns),
+        }
+    local_columns = set(_run_module(cache, folder, rc, MODULE_CODEBOOK, codebook_inputs, run_codebook))
+
+    # 2. Processed data folder + 3. Data integrity
+    def run_data():
+        if ids is not None:
+            _seed_row_index(cache.load(folder, MODULE_DATA), index, ids, schema)
+        with rc.measure(MODULE_PROCESSED):
+            csvs = validate_processed_folder(folder, rc)
+        columns = validate_data_integrity(folder, csvs, local_columns, rc, index, manifest, schema)
+        return {"columns": columns, "files": _row_index_outputs(index, ids, schema)}
+
+    data_inputs = {}
+    if ids is not None:
+        proc_dir = folder / "processed_data"
+        orig_dir = folder / "original_data"
+        data_inputs = {
+            "local_columns": sorted(local_columns),
+            "processed": {
+                name: ids.of(proc_dir / name) if name.lower().endswith(".csv") else None
+                for name in _listing(proc_dir)
+            },
+            "processed_exists": proc_dir.exists(),
+            "original_exists": orig_dir.exists(),
+            "original": {p.name: ids.of(p) for p in sorted(orig_dir.glob("*.csv"))},
+            "manifest": ids.of(folder / MANIFEST_NAME),
+            # The value rules of the columns the CSVs have
+            "schema": schema_rules(schema, _processed_columns(folder, manifest)),
+        }
+    csv_column_map = _run_module(cache, folder, rc, MODULE_DATA, data_inputs, run_data)["columns"]
 
     # 4. Prompts
-    validate_prompts(folder, csv_column_map, rc)
+    prompt_inputs = {}
+    if ids is not None:
+        prompt_inputs = {
+            "zip": ids.of(folder / "prompts.jsonl.zip"),
+            "csv_columns": sorted({c for cols in csv_column_map.values() for c in cols}),
+            "full": full_prompts,
+            "manifest": ids.of(folder / MANIFEST_NAME),
+        }
+    def run_prompts():
+        with rc.measure(MODULE_PROMPTS):
+            validate_prompts(folder, csv_column_map, rc, full_prompts, prompt_workers, manifest)
+
+    _run_module(cache, folder, rc, MODULE_PROMPTS, prompt_inputs, run_prompts)
 
     # 4b. images.zip cross-check
-    check_images_zip(folder, csv_column_map, rc)
+    with rc.measure(MODULE_IMAGES):
+        check_images_zip(folder, csv_column_map, rc)
+
+    if ids is not None:
+        ids.save()
 
     return rc
 
@@ -729,29 +2007,36 @@ def validate_folder(folder: Path, main_columns: set[str]) -> ResultCollector:
 # ---------------------------------------------------------------------------
 # CLI & Reporting
 # ---------------------------------------------------------------------------
-def detect_changed_folders() -> list[str]:
-    """Use git diff to find dataset folders changed in the current PR."""
+def detect_changes() -> ChangeSet | None:
+    """Use git diff to find the files changed in the current PR."""
     try:
         result = subprocess.run(
-            ["git", "diff", "--name-only", "origin/main...HEAD"],
+            ["git", "diff", "--name-status", "-z", "origin/main...HEAD"],
             capture_output=True,
             text=True,
             cwd=REPO_ROOT,
         )
         if result.returncode != 0:
             print(f"WARNING: git diff failed: {result.stderr.strip()}")
-            return []
-
-        changed_files = result.stdout.strip().split("\n")
-        folders = set()
-        for f in changed_files:
-            parts = f.split("/")
-            if parts and parts[0] not in IGNORED_FOLDERS and (REPO_ROOT / parts[0]).is_dir():
-                folders.add(parts[0])
-        return sorted(folders)
+            return None
     except FileNotFoundError:
         print("WARNING: git not found — cannot detect changed folders.")
-        return []
+        return None
+
+    diff: dict[str, str] = {}
+    fields = result.stdout.split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in "RC":
+            if status == "R":
+                diff[fields[i + 1]] = "D"
+            diff[fields[i + 2]] = "A"
+            i += 3
+        else:
+            diff[fields[i + 1]] = status
+            i += 2
+    return ChangeSet(diff)
 
 
 def detect_all_folders() -> list[str]:
@@ -802,9 +2087,14 @@ def print_report(collectors: list[ResultCollector]) -> bool:
 
 
 def _build_summary_markdown(
-    collectors: list[ResultCollector], any_errors: bool
+    collectors: list[ResultCollector], any_errors: bool, with_metrics: bool = False
 ) -> str:
-    """Build a rich markdown summary string."""
+    """Build a rich markdown summary string.
+
+    Wall-clock figures differ between runs, so the per-module metrics are
+    only added *with_metrics* (for the step summary); the report itself is
+    the same for serial and ``--jobs`` runs.
+    """
     lines: list[str] = []
 
     # Header
@@ -850,11 +2140,55 @@ def _build_summary_markdown(
                 lines.append(f"- **[{r.module}]** {r.message}")
             lines.append("\n</details>\n")
 
+    # Per-module resource usage
+    if with_metrics and any(rc.metrics for rc in collectors):
+        lines.append("<details>")
+        lines.append("<summary>⏱️ Validator performance</summary>\n")
+        lines.append("| Dataset | Module | Time (s) | Read (MB) | Rows/lines | Peak RSS (MB) |")
+        lines.append("|---------|--------|----------|-----------|------------|---------------|")
+        for rc in collectors:
+            for m in rc.metrics:
+                module = f"{m.module} (cached)" if m.cached else m.module
+                peak = f"{m.peak_rss / 1e6:,.1f}" if m.peak_rss is not None else "n/a"
+                lines.append(
+                    f"| `{rc.folder_name}` | {module} | {m.seconds:.2f} | "
+                    f"{m.bytes_read / 1e6:,.1f} | {m.rows:,} | {peak} |"
+                )
+        lines.append("\n</details>\n")
+
     return "\n".join(lines)
 
 
+def build_metrics_json(collectors: list[ResultCollector]) -> dict:
+    """Machine-readable per-folder, per-module metrics of a validation run."""
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "folders": [
+            {
+                "folder": rc.folder_name,
+                "errors": rc.error_count,
+                "warnings": rc.warning_count,
+                "seconds": round(sum(m.seconds for m in rc.metrics), 4),
+                "modules": [m.to_dict() for m in rc.metrics],
+            }
+            for rc in collectors
+        ],
+    }
+
+
+def write_metrics_json(collectors: list[ResultCollector], path: Path):
+    try:
+        with open(path, "w") as f:
+            json.dump(build_metrics_json(collectors), f, indent=1)
+            f.write("\n")
+    except Exception:
+        pass
+
+
 def _write_job_summary(collectors: list[ResultCollector], any_errors: bool):
-    """Write markdown summary to $GITHUB_STEP_SUMMARY and validation_summary.md."""
+    """Write markdown summary to $GITHUB_STEP_SUMMARY and validation_summary.md,
+    plus the metrics sidecar validation_metrics.json. Timings go only to the
+    step summary and the sidecar."""
     md = _build_summary_markdown(collectors, any_errors)
 
     # Write to $GITHUB_STEP_SUMMARY (rendered on the Actions Summary tab)
@@ -862,7 +2196,7 @@ def _write_job_summary(collectors: list[ResultCollector], any_errors: bool):
     if summary_path:
         try:
             with open(summary_path, "a") as f:
-                f.write(md + "\n")
+                f.write(_build_summary_markdown(collectors, any_errors, with_metrics=True) + "\n")
         except Exception:
             pass
 
@@ -873,44 +2207,308 @@ def _write_job_summary(collectors: list[ResultCollector], any_errors: bool):
     except Exception:
         pass
 
+    # Machine-readable sidecar for tracking validator performance over time
+    write_metrics_json(collectors, REPO_ROOT / "validation_metrics.json")
+
+
+# ---------------------------------------------------------------------------
+# Corpus coverage (README "Current coverage" line)
+# ---------------------------------------------------------------------------
+def _participant_ids(path: Path) -> set[str]:
+    """Distinct values of the participant_id column of a CSV (empty if absent)."""
+    if is_lfs_pointer(path):
+        raise ValueError(f"{path.name} is a Git LFS pointer file (not actual data).")
+    delimiter = _sniff_delimiter(path)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        columns = [h.strip() for h in next(reader, None) or []]
+        if "participant_id" not in columns:
+            return set()
+        col_idx = columns.index("participant_id")
+        return {row[col_idx] for row in reader if col_idx < len(row) and row[col_idx].strip()}
+
+
+def corpus_coverage(folder_names: list[str]) -> dict[str, int | list[str]]:
+    """Count studies, participants and data points (processed rows) of the corpus.
+
+    Row counts come from each folder's :class:`RowCountIndex`. Files that
+    cannot be read (e.g. unsmudged LFS pointers) are listed under
+    ``"unavailable"`` and left out of the totals.
+    """
+    studies = participants = data_points = 0
+    unavailable: list[str] = []
+    for name in folder_names:
+        index = RowCountIndex(REPO_ROOT / name)
+        csvs = index.processed_csvs()
+        if not csvs:
+            continue
+        studies += 1
+        for csv_path in csvs:
+            n_rows = index.get(csv_path)
+            if n_rows is None:
+                unavailable.append(f"{name}/processed_data/{csv_path.name}")
+                continue
+            data_points += n_rows
+            try:
+                participants += len(_participant_ids(csv_path))
+            except Exception:
+                unavailable.append(f"{name}/processed_data/{csv_path.name}")
+    return {
+        "studies": studies,
+        "participants": participants,
+        "data_points": data_points,
+        "unavailable": unavailable,
+    }
+
+
+def print_coverage(folder_names: list[str]):
+    """Print the README coverage line for *folder_names*."""
+    coverage = corpus_coverage(folder_names)
+    print(
+        f"> *{coverage['studies']}* studies | *{coverage['participants']:,}* participants "
+        f"| *{coverage['data_points']:,}* data points"
+    )
+    if coverage["unavailable"]:
+        print(
+            f"\nWARNING: {len(coverage['unavailable'])} file(s) could not be read "
+            f"and are not counted: {coverage['unavailable']}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Parallel execution
+# ---------------------------------------------------------------------------
+# Default upper bound on the summed data size of folders validated at once
+DEFAULT_MEMORY_BUDGET_MB = 3072
+
+
+def folder_weight(folder: Path) -> int:
+    """Estimate the memory/IO cost of validating *folder* in bytes.
+
+    Sums the (LFS-declared) size of every file the data and prompt modules
+    read, so it is available even before LFS content has been smudged.
+    """
+    paths = list((folder / "processed_data").glob("*.csv"))
+    paths += list((folder / "original_data").glob("*.csv"))
+    paths.append(folder / "prompts.jsonl.zip")
+    total = 0
+    for path in paths:
+        try:
+            total += file_size(path)
+        except OSError:
+            continue
+    return total
+
+
+def _validate_folder_job(
+    folder: Path, main_columns: set[str], cache: ResultCache | None, options: dict
+) -> tuple[ResultCollector, str]:
+    """Worker entry point: validate one folder, capturing its console output."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        rc = validate_folder(folder, main_columns, cache, **options)
+    return rc, buffer.getvalue()
+
+
+def validate_folders_parallel(
+    folders: list[Path],
+    main_columns: set[str],
+    jobs: int,
+    memory_budget: int,
+    cache: ResultCache | None = None,
+    options: dict | None = None,
+) -> list[ResultCollector]:
+    """Validate *folders* in a process pool.
+
+    Folders are started largest-first, but never while the summed weight of
+    running folders would exceed *memory_budget* bytes, so the multi-GB
+    datasets do not run side by side (an oversized folder still runs, alone).
+    Progress output and collectors are returned in the order of *folders*,
+    which keeps the report identical to a serial run. *options* holds extra
+    keyword arguments for :func:`validate_folder`.
+    """
+    options = options or {}
+    weights = {folder: folder_weight(folder) for folder in folders}
+    order = {folder: i for i, folder in enumerate(folders)}
+    pending = sorted(folders, key=lambda f: (-weights[f], order[f]))
+
+    done: dict[int, tuple[ResultCollector, str]] = {}
+    next_to_print = 0
+    in_flight: dict[concurrent.futures.Future, Path] = {}
+    in_flight_weight = 0
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or in_flight:
+            # Start as many folders as the worker count and budget allow
+            while pending and len(in_flight) < jobs:
+                room = memory_budget - in_flight_weight
+                folder = next((f for f in pending if weights[f] <= room), None)
+                if folder is None:
+                    if in_flight:
+                        break
+                    folder = pending[0]
+                pending.remove(folder)
+                future = pool.submit(_validate_folder_job, folder, main_columns, cache, options)
+                in_flight[future] = folder
+                in_flight_weight += weights[folder]
+
+            finished, _ = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in finished:
+                folder = in_flight.pop(future)
+                in_flight_weight -= weights[folder]
+                done[order[folder]] = future.result()
+
+            # Flush output in submission order as soon as it is contiguous
+            while next_to_print in done:
+                sys.stdout.write(done[next_to_print][1])
+                sys.stdout.flush()
+                next_to_print += 1
+
+    return [done[i][0] for i in range(len(folders))]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Validate PsychLing-101 dataset folder contributions.",
+    )
+    parser.add_argument("folders", nargs="*", help="dataset folders to validate")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--changed", action="store_true", help="auto-detect changed folders from git diff"
+    )
+    selection.add_argument(
+        "--all", action="store_true", help="validate every dataset folder"
+    )
+    parser.add_argument(
+        "--coverage", action="store_true",
+        help="print the README coverage line (studies, participants, data points) "
+             "for the given folders, or for every dataset folder, and exit",
+    )
+    parser.add_argument(
+        "--write-manifest", action="store_true",
+        help=f"write {MANIFEST_NAME} (stats bound to LFS oids, so CI can validate "
+             "without downloading the data) for the given folders and exit",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="validate folders in N worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--memory-budget", type=int, default=DEFAULT_MEMORY_BUDGET_MB, metavar="MB",
+        help="max summed data size of folders validated concurrently with --jobs "
+             f"(default: {DEFAULT_MEMORY_BUDGET_MB})",
+    )
+    parser.add_argument(
+        "--full-prompts", action="store_true",
+        help="check every line of prompts.jsonl instead of a random sample, "
+             "parsing blocks of the file in parallel worker processes",
+    )
+    parser.add_argument(
+        "--metrics-json", type=Path, metavar="PATH",
+        help="also write per-module timing and memory metrics as JSON to PATH "
+             "(CI runs always write validation_metrics.json)",
+    )
+    parser.add_argument(
+        "--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, metavar="DIR",
+        help="where per-module results are cached between runs, outside the repository "
+             f"(default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="ignore and do not update the result cache"
+    )
+    args = parser.parse_args(argv)
+    if (args.changed or args.all) and args.folders:
+        parser.error("folder names cannot be combined with --changed or --all")
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    return args
+
 
 def main():
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
 
+    args = parse_args(sys.argv[1:])
+
+    if args.coverage:
+        print_coverage(args.folders or detect_all_folders())
+        sys.exit(0)
+
+    if args.write_manifest:
+        if not args.folders:
+            print("--write-manifest needs the dataset folder(s) to summarise.")
+            sys.exit(1)
+        for name in args.folders:
+            path = write_manifest(REPO_ROOT / name, os.cpu_count() or 1)
+            print(f"Wrote {path.relative_to(REPO_ROOT)}")
+        sys.exit(0)
+
     # Determine which folders to validate
-    if sys.argv[1] == "--changed":
-        folder_names = detect_changed_folders()
+    changes = None
+    if args.changed:
+        changes = detect_changes()
+        folder_names = changes.folders() if changes is not None else []
         if not folder_names:
             print("No dataset folders changed in this PR. Nothing to validate.")
             sys.exit(0)
-    elif sys.argv[1] == "--all":
+    elif args.all:
         folder_names = detect_all_folders()
         if not folder_names:
             print("No dataset folders found in the repository.")
             sys.exit(0)
     else:
-        folder_names = sys.argv[1:]
+        folder_names = args.folders
 
     print(f"Folders to validate: {folder_names}")
 
-
+    jobs = args.jobs or os.cpu_count() or 1
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    if cache is not None:
+        tracked = tracked_files_under(args.cache_dir)
+        if tracked:
+            print(
+                f"ERROR: the result cache {args.cache_dir} holds {len(tracked)} file(s) tracked by git "
+                f"(e.g. {tracked[0]}). Cached results must not come from the repository; "
+                "remove them or pass another --cache-dir."
+            )
+            sys.exit(1)
+    # Full prompt checks share the CPUs with the folder-level workers
+    options = {
+        "full_prompts": args.full_prompts,
+        "prompt_workers": max(1, (os.cpu_count() or 1) // jobs),
+    }
 
     # Load the main CODEBOOK for cross-referencing
     main_columns = load_main_codebook()
     if not main_columns:
         print("WARNING: Could not load main CODEBOOK.csv — column cross-checks will be limited.")
+    options["schema"] = load_codebook_schema()
 
     # Run validation
     collectors = []
-    for name in folder_names:
-        folder = REPO_ROOT / name
-        if not folder.is_dir():
-            print(f"\nWARNING: '{name}' is not a directory — skipping.")
-            continue
-        rc = validate_folder(folder, main_columns)
-        collectors.append(rc)
+    if jobs > 1:
+        folders = []
+        for name in folder_names:
+            folder = REPO_ROOT / name
+            if not folder.is_dir():
+                print(f"\nWARNING: '{name}' is not a directory — skipping.")
+                continue
+            folders.append(folder)
+        if folders:
+            collectors = validate_folders_parallel(
+                folders, main_columns, jobs, args.memory_budget * 1024 * 1024, cache, options
+            )
+    else:
+        for name in folder_names:
+            folder = REPO_ROOT / name
+            if not folder.is_dir():
+                print(f"\nWARNING: '{name}' is not a directory — skipping.")
+                continue
+            rc = validate_folder(folder, main_columns, cache, **options)
+            collectors.append(rc)
 
     if not collectors:
         print("No valid dataset folders to validate.")
@@ -918,8 +2516,10 @@ def main():
 
     # Report
     has_errors = print_report(collectors)
+    if args.metrics_json:
+        write_metrics_json(collectors, args.metrics_json)
     sys.exit(1 if has_errors else 0)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,11 +8,10 @@ Expected input:
     processed_data/exp1.csv
 
 Expected output:
-    prompts.jsonl
     prompts.jsonl.zip
     prompt_generation_report.csv
 
-Each line in prompts.jsonl is one participant session and contains at least:
+Each line of prompts.jsonl (inside prompts.jsonl.zip) is one participant session and contains at least:
     text
     experiment
     participant_id
@@ -33,16 +32,18 @@ from __future__ import annotations
 
 import argparse
 import csv
-import json
 import math
+import os
 import re
 import sys
-import zipfile
 from pathlib import Path
 from typing import Any, Iterable
 
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+
 
 # ---------------------------------------------------------------------
 # Configuration
@@ -384,19 +385,24 @@ def validate_dataset(exp: pd.DataFrame, expected_n: int | None, allow_non177: bo
         )
 
 
-def write_jsonl(records: list[dict[str, Any]], output_path: Path) -> None:
-    with output_path.open("w", encoding="utf-8", newline="\n") as f:
-        for record in records:
-            # allow_nan=False prevents non-standard JSON values such as NaN.
-            f.write(json.dumps(record, ensure_ascii=False, allow_nan=False) + "\n")
-
-
-def write_zip(jsonl_path: Path, zip_path: Path) -> None:
-    with zipfile.ZipFile(zip_path, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        zf.write(jsonl_path, arcname=jsonl_path.name)
+def report_row(record: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "participant_id": record.get("participant_id"),
+        "experiment": record.get("experiment"),
+        "source_file": record.get("source_file"),
+        "n_trials": record.get("n_trials"),
+        "n_complete_association_trials": record.get("n_complete_association_trials"),
+        "text_n_chars": len(record.get("text", "")),
+        "age": record.get("age"),
+        "gender": record.get("gender"),
+        "nationality": record.get("nationality"),
+        "first_language": record.get("first_language"),
+        "occupation": record.get("occupation"),
+        "stem_background": record.get("stem_background"),
+    }
 
 
-def write_report(records: list[dict[str, Any]], report_path: Path) -> None:
+def write_report(rows: list[dict[str, Any]], report_path: Path) -> None:
     fieldnames = [
         "participant_id",
         "experiment",
@@ -415,21 +421,7 @@ def write_report(records: list[dict[str, Any]], report_path: Path) -> None:
     with report_path.open("w", encoding="utf-8", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
         writer.writeheader()
-        for record in records:
-            writer.writerow({
-                "participant_id": record.get("participant_id"),
-                "experiment": record.get("experiment"),
-                "source_file": record.get("source_file"),
-                "n_trials": record.get("n_trials"),
-                "n_complete_association_trials": record.get("n_complete_association_trials"),
-                "text_n_chars": len(record.get("text", "")),
-                "age": record.get("age"),
-                "gender": record.get("gender"),
-                "nationality": record.get("nationality"),
-                "first_language": record.get("first_language"),
-                "occupation": record.get("occupation"),
-                "stem_background": record.get("stem_background"),
-            })
+        writer.writerows(rows)
 
 
 # ---------------------------------------------------------------------
@@ -455,7 +447,16 @@ def main() -> None:
         "--output",
         type=Path,
         default=None,
-        help="Path for prompts.jsonl. Defaults to BASE_DIR/prompts.jsonl.",
+        help=(
+            "Name of the prompts file; the archive is written to this path plus .zip. "
+            "Defaults to BASE_DIR/prompts.jsonl."
+        ),
+    )
+    parser.add_argument(
+        "--compress-workers",
+        type=int,
+        default=1,
+        help="Threads used to compress the archive. Defaults to 1.",
     )
     parser.add_argument(
         "--expected-participants",
@@ -484,31 +485,31 @@ def main() -> None:
     exp = read_standardized_data(csv_paths)
     validate_dataset(exp, expected_n=args.expected_participants, allow_non177=args.allow_non177)
 
-    records: list[dict[str, Any]] = []
+    report_rows: list[dict[str, Any]] = []
 
     # One line per participant per standardized experiment file. With the current
     # dataset this is simply 177 lines from exp1.csv.
     grouped = exp.groupby(["experiment_file", "participant_id"], sort=True, dropna=False)
 
-    for (experiment_file, participant_id), participant_df in grouped:
-        participant_id = clean_word(participant_id) or str(participant_id)
-        text, metadata = build_prompt_for_participant(participant_id, participant_df)
-
-        record = {
-            "text": text,
-            "experiment": args.experiment,
-            "participant_id": participant_id,
-            **metadata,
-            "experiment_file": experiment_file,
-        }
-        records.append(record)
-
-    write_jsonl(records, output_jsonl)
-    write_zip(output_jsonl, output_zip)
-    write_report(records, report_path)
-
-    print(f"Wrote {len(records)} participant-level prompts to {output_jsonl}")
-    print(f"Wrote zipped prompts to {output_zip}")
+    # allow_nan=False prevents non-standard JSON values such as NaN.
+    with PromptArchiveWriter(output_zip, allow_nan=False, workers=args.compress_workers) as writer:
+        for (experiment_file, participant_id), participant_df in grouped:
+            participant_id = clean_word(participant_id) or str(participant_id)
+            text, metadata = build_prompt_for_participant(participant_id, participant_df)
+
+            record = {
+                "text": text,
+                "experiment": args.experiment,
+                "participant_id": participant_id,
+                **metadata,
+                "experiment_file": experiment_file,
+            }
+            writer.write(record)
+            report_rows.append(report_row(record))
+
+    write_report(report_rows, report_path)
+
+    print(f"Wrote {writer.n_records} participant-level prompts to {output_zip}")
     print(f"Wrote audit report to {report_path}")
 
 
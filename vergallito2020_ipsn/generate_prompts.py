@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import csv
-import hashlib
-import json
-import random
+import os
 import string
-import zipfile
+import sys
 from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.archive import PromptArchiveWriter
+from psychling.keys import participant_rng
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -18,7 +20,6 @@ RATINGS_INPUT = PROCESSED_DIR / "exp1.csv"
 LEXICAL_DECISION_INPUT = PROCESSED_DIR / "exp2.csv"
 NAMING_INPUT = PROCESSED_DIR / "exp3.csv"
 
-JSONL_OUTPUT = BASE_DIR / "prompts.jsonl"
 ZIP_OUTPUT = BASE_DIR / "prompts.jsonl.zip"
 
 # PsychLing-101 requires prompts to remain below 32K tokens.
@@ -124,15 +125,13 @@ def validate_prompt(record: dict[str, Any]) -> None:
         )
 
 
-def generate_perceptual_rating_prompts() -> list[dict[str, Any]]:
+def generate_perceptual_rating_prompts() -> Iterator[dict[str, Any]]:
     rows = read_csv(RATINGS_INPUT)
     grouped: dict[str, list[dict[str, str]]] = defaultdict(list)
 
     for row in rows:
         grouped[row["participant_id"]].append(row)
 
-    records: list[dict[str, Any]] = []
-
     for participant_id, participant_rows in grouped.items():
         lines = [EXP1_INSTRUCTIONS, ORDER_NOTE]
 
@@ -158,9 +157,7 @@ def generate_perceptual_rating_prompts() -> list[dict[str, Any]]:
         }
         add_optional_metadata(record, participant_rows, ["age", "gender"])
         validate_prompt(record)
-        records.append(record)
-
-    return records
+        yield record
 
 
 def participant_choice_options(
@@ -172,15 +169,7 @@ def participant_choice_options(
     Because the seed depends only on participant_id, the same participant
     receives the same pair in both sessions and across repeated script runs.
     """
-    seed_text = f"vergallito2020_ipsn:{participant_id}"
-    digest = hashlib.sha256(seed_text.encode("utf-8")).digest()
-    seed = int.from_bytes(
-        digest[:8],
-        byteorder="big",
-        signed=False,
-    )
-
-    rng = random.Random(seed)
+    rng = participant_rng("vergallito2020_ipsn", participant_id)
     word_key, pseudoword_key = rng.sample(
         list(string.ascii_uppercase),
         2,
@@ -217,15 +206,13 @@ def infer_lexical_decision_key(
     raise ValueError(f"Unexpected accuracy value: {accuracy}")
 
 
-def generate_lexical_decision_prompts() -> list[dict[str, Any]]:
+def generate_lexical_decision_prompts() -> Iterator[dict[str, Any]]:
     rows = read_csv(LEXICAL_DECISION_INPUT)
     grouped: dict[tuple[str, str], list[dict[str, str]]] = defaultdict(list)
 
     for row in rows:
         grouped[(row["participant_id"], row["session_id"])].append(row)
 
-    records: list[dict[str, Any]] = []
-
     for (participant_id, session_id), session_rows in grouped.items():
         word_key, pseudoword_key = participant_choice_options(
             participant_id
@@ -267,20 +254,16 @@ def generate_lexical_decision_prompts() -> list[dict[str, Any]]:
             ["age", "gender", "education", "handedness"],
         )
         validate_prompt(record)
-        records.append(record)
+        yield record
 
-    return records
 
-
-def generate_naming_prompts() -> list[dict[str, Any]]:
+def generate_naming_prompts() -> Iterator[dict[str, Any]]:
     rows = read_csv(NAMING_INPUT)
     grouped: dict[tuple[str, str], list[dict[str, str]]] = defaultdict(list)
 
     for row in rows:
         grouped[(row["participant_id"], row["session_id"])].append(row)
 
-    records: list[dict[str, Any]] = []
-
     for (participant_id, session_id), session_rows in grouped.items():
         lines = [EXP3_INSTRUCTIONS, ORDER_NOTE]
 
@@ -304,56 +287,34 @@ def generate_naming_prompts() -> list[dict[str, Any]]:
             ["age", "gender", "education", "handedness"],
         )
         validate_prompt(record)
-        records.append(record)
-
-    return records
-
-
-def write_jsonl(records: list[dict[str, Any]]) -> None:
-    with JSONL_OUTPUT.open("w", encoding="utf-8", newline="\n") as handle:
-        for record in records:
-            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-
-def write_zip() -> None:
-    with zipfile.ZipFile(
-        ZIP_OUTPUT, "w", compression=zipfile.ZIP_DEFLATED
-    ) as archive:
-        archive.write(JSONL_OUTPUT, arcname="prompts.jsonl")
+        yield record
 
 
 def main() -> None:
-    records = (
-        generate_perceptual_rating_prompts()
-        + generate_lexical_decision_prompts()
-        + generate_naming_prompts()
+    generators = (
+        generate_perceptual_rating_prompts(),
+        generate_lexical_decision_prompts(),
+        generate_naming_prompts(),
     )
+    counts = [0, 0, 0]
+    longest_prompt = 0
 
-    write_jsonl(records)
-    write_zip()
+    with PromptArchiveWriter(ZIP_OUTPUT) as writer:
+        for i, records in enumerate(generators):
+            for record in records:
+                writer.write(record)
+                counts[i] += 1
+                longest_prompt = max(longest_prompt, len(record["text"]))
 
-    prompt_lengths = [len(record["text"]) for record in records]
-    exp1_count = sum(
-        record["experiment"].endswith("exp1_perceptual_ratings")
-        for record in records
-    )
-    exp2_count = sum(
-        record["experiment"].endswith("exp2_lexical_decision")
-        for record in records
-    )
-    exp3_count = sum(
-        record["experiment"].endswith("exp3_naming")
-        for record in records
-    )
+    exp1_count, exp2_count, exp3_count = counts
 
     print("Prompt generation completed successfully.")
-    print(f"JSONL file: {JSONL_OUTPUT}")
     print(f"ZIP file:   {ZIP_OUTPUT}")
-    print(f"Total prompt records: {len(records)}")
+    print(f"Total prompt records: {writer.n_records}")
     print(f"  Experiment 1 prompts: {exp1_count}")
     print(f"  Experiment 2 prompts: {exp2_count}")
     print(f"  Experiment 3 prompts: {exp3_count}")
-    print(f"Longest prompt: {max(prompt_lengths)} characters")
+    print(f"Longest prompt: {longest_prompt} characters")
     print(f"Conservative limit: {MAX_PROMPT_CHARACTERS} characters")
     print(
         "Note: prompts follow released-file row order, "
@@ -1,9 +1,15 @@
 # Generate prompts for wang2025_lexicaldecision
 
 # Load libararies
+import os
+import sys
+
 import pandas as pd
 import jsonlines
-import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+from psychling.groups import TrialGroups
+from psychling.keys import participant_keys
 
 # Load data
 df = pd.read_csv("/Users/cyhsieh/PsychLing-101/wang2025_lexicaldecision/processed_data/exp1.csv")
@@ -12,9 +18,8 @@ df = pd.read_csv("/Users/cyhsieh/PsychLing-101/wang2025_lexicaldecision/processe
 all_prompts = []
 
 # Randomization Function
-def randomized_choice_options(num_choices):
-    choice_options = list(map(chr, range(65, 91)))
-    return np.random.choice(choice_options, num_choices, replace=False)
+def randomized_choice_options(participant, num_choices):
+    return participant_keys('wang2025_lexicaldecision', participant, num_choices)
 
 ###########################
 # Megastudy #
@@ -22,17 +27,18 @@ def randomized_choice_options(num_choices):
 
 # Generate individual prompts for participants with randomised options and batching
 
-participant_list = df['participant_id'].unique()
+# Participants in order of appearance, each with their trials sorted
+groups = TrialGroups(df, ['participant_id'], 'trial_id', sort=False)
 trial_num = range(df['trial_id'].max() + 1)
 
 max_chars = 50000
 
-for participant in participant_list:
-    exp_participant = df[df['participant_id'] == participant]
+for exp_participant in groups:
+    participant = exp_participant['participant_id'].iloc[0]
     #############################
     # Randomise options per participant
     #############################
-    choice_options = randomized_choice_options(num_choices=2)
+    choice_options = randomized_choice_options(participant, num_choices=2)
     # Assign meanings to options
     real_word_option = choice_options[0]
     fake_word_option = choice_options[1]
@@ -54,49 +60,45 @@ for participant in participant_list:
     batch_text = instruction
     batch_num = 1
     last_rt = None
-    for trial in trial_num:
-        exp_trial = exp_participant.loc[
-            exp_participant['trial_id'] == trial
-        ]
-        if not exp_trial.empty:
-            image = exp_trial['image_filename'].iloc[0]
-            response = exp_trial['response'].iloc[0]
-            trial_id = exp_trial['trial_id'].iloc[0]
-            accuracy = exp_trial['accuracy'].iloc[0]
-            rt = exp_trial['rt'].iloc[0]
-            #############################
-            # Convert original response
-            # to randomised option label
-            #############################
-            if response == 'j':
-                randomized_response = real_word_option
-            elif response == 'f':
-                randomized_response = fake_word_option
-            else:
-                randomized_response = response
-            datapoint = (
-                f'试次{trial_id}：{image}。'
-                f'你按下了 <<{randomized_response}>> 键。'
-                f'{accuracy}。'
-                f'反应时间为 {rt} 毫秒。\n'
-            )
-            #############################
-            # Check character limit
-            #############################
-            if len(batch_text) + len(datapoint) > max_chars:
-                all_prompts.append({
-                    'text': batch_text,
-                    'experiment': 'wang2025_lexicaldecision',
-                    'participant_id': participant,
-                    'batch': batch_num,
-                    'rt': last_rt
-                })
-                batch_num += 1
-                # New batch keeps same participant instruction
-                batch_text = instruction + datapoint
-            else:
-                batch_text += datapoint
-            last_rt = rt
+    for exp_trial in groups.trials(exp_participant, trial_num).itertuples():
+        image = exp_trial.image_filename
+        response = exp_trial.response
+        trial_id = exp_trial.trial_id
+        accuracy = exp_trial.accuracy
+        rt = exp_trial.rt
+        #############################
+        # Convert original response
+        # to randomised option label
+        #############################
+        if response == 'j':
+            randomized_response = real_word_option
+        elif response == 'f':
+            randomized_response = fake_word_option
+        else:
+            randomized_response = response
+        datapoint = (
+            f'试次{trial_id}：{image}。'
+            f'你按下了 <<{randomized_response}>> 键。'
+            f'{accuracy}。'
+            f'反应时间为 {rt} 毫秒。\n'
+        )
+        #############################
+        # Check character limit
+        #############################
+        if len(batch_text) + len(datapoint) > max_chars:
+            all_prompts.append({
+                'text': batch_text,
+                'experiment': 'wang2025_lexicaldecision',
+                'participant_id': participant,
+                'batch': batch_num,
+                'rt': last_rt
+            })
+            batch_num += 1
+            # New batch keeps same participant instruction
+            batch_text = instruction + datapoint
+        else:
+            batch_text += datapoint
+        last_rt = rt
     # Save final batch
     if batch_text != instruction:
         all_prompts.append({